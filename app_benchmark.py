@@ -0,0 +1,183 @@
+"""
+This module benchmarks the game engine and GUI paths.
+\nRun:      python app_benchmark.py run --output results.json [--group headless|gui|all]
+\nCompare:  python app_benchmark.py compare before.json after.json [--threshold 0.10]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tkinter as tk
+import headless
+from game_logic import SOSGameLogic, MAX_CANVAS_BOARD_DIMENSION
+
+SCAN_SIZES = (3, 8, 15, 30, MAX_CANVAS_BOARD_DIMENSION)
+GAME_SETTINGS = ((8, "Simple"), (8, "General"), (15, "General"))
+BUTTON_BOARD_SIZES = (8, 15)
+CANVAS_BOARD_SIZES = (50, MAX_CANVAS_BOARD_DIMENSION)
+
+def measure(function, setup = None, number:int = 1, repeat:int = 5) -> dict:
+    """
+        Times function() number times in a row, repeat times over, calling setup() (untimed)
+        before every run. Returns seconds per call: the best run and the mean of all runs.
+    """
+    runs = []
+    for _ in range(repeat):
+        if setup != None: setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        runs.append((time.perf_counter() - start) / number)
+    return {"seconds": min(runs), "mean_seconds": sum(runs) / len(runs), "number": number, "repeat": repeat}
+
+def half_filled_game(board_dimension:int, seed:int = 449) -> SOSGameLogic:
+    """
+        Returns a headless game whose board has a random letter in about half of the cells.
+    """
+    rng = random.Random(seed)
+    game_logic = headless.create_game(board_dimension, "General", "Human", "Human")
+    for y in range(board_dimension):
+        for x in range(board_dimension):
+            if rng.random() < 0.5:
+                game_logic.game_board.place(x, y, rng.choice("SO"))
+    return game_logic
+
+def headless_benchmarks(repeat:int) -> dict:
+    """
+        Benchmarks the rules and computer players without a display.
+    """
+    results = {}
+
+    game_logic = half_filled_game(8)
+    empty_tiles = [game_logic.gameboard_tile_instance_dict[y][x] for x, y in game_logic.game_board.empty_cells()]
+    for letter in ("S", "O"):
+        def analyse_all(letter = letter):
+            for tile in empty_tiles:
+                game_logic.move_analysis(tile, True, game_logic.game_board, letter)
+        results[f"move_analysis/{letter}/8x8"] = measure(analyse_all, number=20, repeat=repeat)
+
+    for board_dimension in SCAN_SIZES:
+        game_logic = half_filled_game(board_dimension)
+        def drop_cache(game_logic = game_logic):
+            game_logic._score_cache = None
+        results[f"possible_score_per_tile/{board_dimension}x{board_dimension}"] = measure(
+            game_logic._return_possible_score_per_tile, setup=drop_cache, repeat=repeat)
+
+    for board_dimension, match_type in GAME_SETTINGS:
+        results[f"cvc_game/{match_type}/{board_dimension}x{board_dimension}"] = measure(
+            lambda: headless.play_game(board_dimension, match_type, seed=449), repeat=repeat)
+    return results
+
+def gui_benchmarks(repeat:int) -> dict:
+    """
+        Benchmarks board construction and __disable_all_buttons under a withdrawn root.
+    """
+    import main
+    results = {}
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        app = main.MainApplication(root)
+        for use_canvas, sizes in ((False, BUTTON_BOARD_SIZES), (True, CANVAS_BOARD_SIZES)):
+            renderer = "canvas" if use_canvas else "buttons"
+            app.game_logic.config_use_canvas.set(use_canvas)
+            for board_dimension in sizes:
+                windows = []
+                def build(board_dimension = board_dimension):
+                    window = tk.Toplevel(root)
+                    windows.append(window)
+                    app._MainApplication__playing_field(window, board_dimension, 500)
+                    root.update_idletasks()
+                def close_windows():
+                    while windows: windows.pop().destroy()
+                results[f"playing_field/{renderer}/{board_dimension}x{board_dimension}"] = measure(
+                    build, setup=close_windows, repeat=repeat)
+
+                def enable_all(board_dimension = board_dimension):
+                    close_windows()
+                    build(board_dimension)
+                def disable_all():
+                    app.game_logic._SOSGameLogic__disable_all_buttons()
+                    root.update_idletasks()
+                results[f"disable_all_buttons/{renderer}/{board_dimension}x{board_dimension}"] = measure(
+                    disable_all, setup=enable_all, repeat=repeat)
+                close_windows()
+    finally:
+        root.destroy()
+    return results
+
+def run(groups:list[str], repeat:int) -> dict:
+    """
+        Runs the chosen groups. A group that cannot run here (e.g. gui without a display) is
+        listed under "skipped" with the reason.
+    """
+    report = {"python": platform.python_version(), "platform": platform.platform(),
+              "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": {}, "skipped": {}}
+    for group in groups:
+        try:
+            group_results = headless_benchmarks(repeat) if group == "headless" else gui_benchmarks(repeat)
+        except tk.TclError as error:
+            report["skipped"][group] = str(error)
+            continue
+        for name, result in group_results.items():
+            report["results"][f"{group}/{name}"] = result
+    return report
+
+def compare_results(before:dict, after:dict, threshold:float) -> list[dict]:
+    """
+        Compares the best times of two run() reports, benchmark by benchmark.
+        \nReturns [ { "name", "before", "after", "ratio", "slower" } ], where slower means the
+        new time exceeds the old one by more than threshold (0.10 = 10 %).
+    """
+    rows = []
+    for name in sorted(set(before["results"]) & set(after["results"])):
+        old, new = before["results"][name]["seconds"], after["results"][name]["seconds"]
+        ratio = new / old if old > 0 else float("inf")
+        rows.append({"name": name, "before": old, "after": new, "ratio": ratio, "slower": ratio > 1 + threshold})
+    return rows
+
+def main(argv:list[str] = None) -> int:
+    """
+        Parses the command line and runs or compares benchmarks. Returns the exit status: 1 if
+        compare found a slowdown, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(description="SOS benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON")
+    run_parser.add_argument("--group", choices=["headless", "gui", "all"], default="all")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark; the best is kept")
+    run_parser.add_argument("--output", default=None, help="JSON file to write (default: standard output)")
+    compare_parser = commands.add_parser("compare", help="compare two JSON result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="flag benchmarks slower by more than this fraction (default 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        groups = ["headless", "gui"] if args.group == "all" else [args.group]
+        report = run(groups, args.repeat)
+        text = json.dumps(report, indent=2)
+        if args.output == None:
+            print(text)
+        else:
+            with open(args.output, "w") as output_file:
+                output_file.write(text + "\n")
+        for group, reason in report["skipped"].items():
+            print(f"skipped {group}: {reason}", file=sys.stderr)
+        return 0
+
+    with open(args.before) as before_file, open(args.after) as after_file:
+        rows = compare_results(json.load(before_file), json.load(after_file), args.threshold)
+    for row in rows:
+        flag = "  SLOWER" if row["slower"] else ""
+        print(f"{row['name']:<55}{row['before'] * 1000:>11.3f} ms{row['after'] * 1000:>11.3f} ms{row['ratio']:>8.2f}x{flag}")
+    slower = [row for row in rows if row["slower"]]
+    print(f"{len(slower)} of {len(rows)} benchmarks slower by more than {args.threshold:.0%}")
+    return 1 if slower else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,21 +3,52 @@ This module tests the application using unittest.
 """
 
 import unittest
+import time
+import threading
 import tkinter as tk
 import main
-from game_logic import ComputerPlayer, Player
+from game_logic import ComputerPlayer, Player, SearchPlayer, MCTSPlayer, RandomPlayer, SOSGameLogic, Tile, GUILogic, HEATMAP_COLORS
+from game_board import GameBoard, CandidateScoreCache, GameState, PositionSnapshot
+from bitboard import BitBoard, iterate_bits
+from triple_index import TripleIndex, WindowCounters, get_triple_index, END, MIDDLE
+import headless
+from search import AlphaBetaSearch, TranspositionTable
+from mcts import MonteCarloTreeSearch, Playout
+from canvas_board import BoardCanvas
+import instrumentation
+import app_benchmark
+import io
+import os
+import tempfile
+import move_log
+from game_archive import GameArchive
+import tablebase
+import tournament
+import server
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+import random
+import pickle
+# numpy is an optional dependency (pip install numpy). Without it the game runs on its pure-Python
+# paths, and the numpy_scoring and tablebase tests are skipped.
+try:
+    import numpy_scoring
+except ImportError:
+    numpy_scoring = None
 from unittest import mock
 
 class TestFunctions(unittest.TestCase):
     """
-        Class for testing application functions against Acceptance Criteria (AC).
+        Class for testing application functions against Acceptance Criteria (AC). The games run
+        on the headless backend, with a Button per tile, so no display is needed.
     """
-    def setUp(self):
-        self.root = tk.Tk()
-        self.root.withdraw()
-
-    def tearDown(self):
-        self.root.destroy()
+    def create_game(self, board_dimension:int, match_type:str = "Simple",
+                    blue_player_type:str = "Human", red_player_type:str = "Human") -> SOSGameLogic:
+        """
+            Creates a headless game as the game window would set it up.
+        """
+        return headless.create_game(board_dimension, match_type, blue_player_type, red_player_type, buttons=True)
 
     def test_all_ac(self):
         """
@@ -76,286 +107,1325 @@ class TestFunctions(unittest.TestCase):
             print(f"AC {acceptance_criteria} not found")
 
     def __test_ac_1_1(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(10)
-        self.assertTrue(test_ma.game_logic.dimension_validate(),
+        game_logic = self.create_game(8)
+        game_logic.game_board_dimension_variable.set(10)
+        self.assertTrue(game_logic.dimension_validate(),
                          "10 should be between the allowed dimension range.")
 
     def __test_ac_1_2(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(2)
-        self.assertFalse(test_ma.game_logic.dimension_validate(),
+        game_logic = self.create_game(8)
+        game_logic.game_board_dimension_variable.set(2)
+        self.assertFalse(game_logic.dimension_validate(),
                          "2 should be smaller than the minimum allowed int: 3.")
 
     def __test_ac_1_3(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(16)
-        self.assertFalse(test_ma.game_logic.dimension_validate(),
+        game_logic = self.create_game(8)
+        game_logic.game_board_dimension_variable.set(16)
+        self.assertFalse(game_logic.dimension_validate(),
                          "16 should be larger than the maximum allowed int: 15.")
 
     def __test_ac_4_1(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(8)
-        test_ma.game_logic.board_dimension = 8
-        test_ma.game_logic.board_size = 64 
-        
-        test_ma.game_logic.create_players()
-        
-        win = test_ma.game_board(8)
-        
-        try:
-            self.assertEqual(test_ma.game_logic.current_player_number_variable.get(), 1)
-            tile_to_click = test_ma.game_logic.gameboard_tile_instance_dict[2][2]
-            test_ma.game_logic.on_tile_click(tile_to_click)
-            
-            self.assertEqual(tile_to_click.button_instance.cget("text"), "S")
-            self.assertEqual(tile_to_click.button_instance.cget("state"), tk.DISABLED)
-            self.assertEqual(test_ma.game_logic.current_player_number_variable.get(), 2)
-        finally:
-            win.destroy()
+        game_logic = self.create_game(8)
+
+        self.assertEqual(game_logic.current_player_number_variable.get(), 1)
+        tile_to_click = game_logic.gameboard_tile_instance_dict[2][2]
+        tile_to_click.button_instance.invoke()
+
+        self.assertEqual(tile_to_click.button_instance.cget("text"), "S")
+        self.assertEqual(tile_to_click.button_instance.cget("state"), tk.DISABLED)
+        self.assertEqual(game_logic.current_player_number_variable.get(), 2)
 
     def __test_ac_4_2(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(8)
-        test_ma.game_logic.board_dimension = 8
-        test_ma.game_logic.board_size = 64 
-        
-        test_ma.game_logic.create_players()
+        game_logic = self.create_game(8)
 
-        win = test_ma.game_board(8)
+        tile_to_click = game_logic.gameboard_tile_instance_dict[3][3]
+        tile_to_click.button_instance.config(text="O", state=tk.DISABLED, bg="#e94444")
+        game_logic.game_board.place(3, 3, "O", 2)
+        tile_to_click.owner = game_logic.player_dict[2]
 
-        try:
-            tile_to_click = test_ma.game_logic.gameboard_tile_instance_dict[3][3]
-            tile_to_click.button_instance.config(text="O", state=tk.DISABLED, bg="#e94444")
-            tile_to_click.owner = test_ma.game_logic.player_dict[2]
+        original_text = tile_to_click.button_instance.cget("text")
+        original_player_num = game_logic.current_player_number_variable.get()
 
-            original_text = tile_to_click.button_instance.cget("text")
-            original_player_num = test_ma.game_logic.current_player_number_variable.get()
+        game_logic.on_tile_click(tile_to_click)
 
-            test_ma.game_logic.on_tile_click(tile_to_click)
+        self.assertEqual(tile_to_click.button_instance.cget("text"), original_text)
+        self.assertEqual(game_logic.current_player_number_variable.get(), original_player_num)
 
-            self.assertEqual(tile_to_click.button_instance.cget("text"), original_text)
-            self.assertEqual(test_ma.game_logic.current_player_number_variable.get(), original_player_num)
-        finally:
-            win.destroy()
+    def __test_ac_5_1(self):
+        game_logic = self.create_game(5, "Simple")
 
-    @mock.patch('tkinter.messagebox.showinfo')
-    @mock.patch.object(tk.Toplevel, 'destroy')
-    def __test_ac_5_1(self, mock_destroy, mock_showinfo):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(5)
-        test_ma.game_logic.board_dimension = 5 
-        test_ma.game_logic.board_size = 25 
-        
-        test_ma.game_logic.create_players()
-        
-        win = test_ma.game_board(5)
-        test_ma.gui.master = win 
-
-        test_ma.game_logic.config_match_type.set("Simple")
-        
-        test_ma.game_logic.gameboard_tile_instance_dict[2][2].button_instance.config(text="S")
-        test_ma.game_logic.gameboard_tile_instance_dict[2][3].button_instance.config(text="O")
-        
-        test_ma.game_logic.current_player_number_variable.set(2)
-        test_ma.game_logic.current_player_name_variable.set(test_ma.game_logic.player_dict[2].name)
-        test_ma.game_logic.current_letter_variable.set("S")
-        
-        tile_to_click = test_ma.game_logic.gameboard_tile_instance_dict[2][4]
-        test_ma.game_logic.on_tile_click(tile_to_click)
-        
-        mock_showinfo.assert_called_once()
-        mock_destroy.assert_called_once()
-        
-        win.destroy()
-
-    @mock.patch('tkinter.messagebox.showinfo')
-    @mock.patch.object(tk.Toplevel, 'destroy')
-    def __test_ac_5_2(self, mock_destroy, mock_showinfo):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(5)
-        test_ma.game_logic.board_dimension = 5
-        test_ma.game_logic.board_size = 25 
-        
-        test_ma.game_logic.create_players()
-        
-        win = test_ma.game_board(5)
-        test_ma.gui.master = win
-        
-        test_ma.game_logic.config_match_type.set("General")
-        
-        test_ma.game_logic.gameboard_tile_instance_dict[2][2].button_instance.config(text="S")
-        test_ma.game_logic.gameboard_tile_instance_dict[2][3].button_instance.config(text="O")
-        
-        test_ma.game_logic.current_player_number_variable.set(2)
-        test_ma.game_logic.current_player_name_variable.set(test_ma.game_logic.player_dict[2].name)
-        test_ma.game_logic.current_letter_variable.set("S")
-        
-        tile_to_click = test_ma.game_logic.gameboard_tile_instance_dict[2][4]
-        test_ma.game_logic.on_tile_click(tile_to_click)
-        
-        self.assertEqual(test_ma.game_logic.player_dict[2].score, 1)
-        mock_destroy.assert_not_called()
-        
-        win.destroy()
-
-    def _fill_board_for_draw(self, test_ma):
-        board = test_ma.game_logic.gameboard_tile_instance_dict
+        game_logic.game_board.place(2, 2, "S")
+        game_logic.game_board.place(3, 2, "O")
+
+        game_logic.current_player_number_variable.set(2)
+        game_logic.current_player_name_variable.set(game_logic.player_dict[2].name)
+        game_logic.current_letter_variable.set("S")
+
+        tile_to_click = game_logic.gameboard_tile_instance_dict[2][4]
+        game_logic.on_tile_click(tile_to_click)
+
+        self.assertEqual(len(game_logic.gui.popups), 1)
+        self.assertTrue(game_logic.gui.master.destroyed)
+
+    def __test_ac_5_2(self):
+        game_logic = self.create_game(5, "General")
+
+        game_logic.game_board.place(2, 2, "S")
+        game_logic.game_board.place(3, 2, "O")
+
+        game_logic.current_player_number_variable.set(2)
+        game_logic.current_player_name_variable.set(game_logic.player_dict[2].name)
+        game_logic.current_letter_variable.set("S")
+
+        tile_to_click = game_logic.gameboard_tile_instance_dict[2][4]
+        game_logic.on_tile_click(tile_to_click)
+
+        self.assertEqual(game_logic.player_dict[2].score, 1)
+        self.assertFalse(game_logic.gui.master.destroyed)
+
+    def _fill_board_for_draw(self, game_logic):
+        board = game_logic.game_board
         pattern = ['S', 'S', 'S', 'O', 'O', 'S', 'S', 'O']
         i = 0
         for y in range(3):
             for x in range(3):
                 if y == 2 and x == 2:
                     continue
-                board[y][x].button_instance.config(text=pattern[i])
+                board.place(x, y, pattern[i])
                 i += 1
-        test_ma.game_logic.occupied_tile_count = 8
 
-    @mock.patch('tkinter.messagebox.showinfo')
-    @mock.patch.object(tk.Toplevel, 'destroy')
-    def __test_ac_5_3(self, mock_destroy, mock_showinfo):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(3)
-        test_ma.game_logic.board_dimension = 3
-        test_ma.game_logic.board_size = 9
-        
-        test_ma.game_logic.create_players()
-        
-        win = test_ma.game_board(3)
-        test_ma.gui.master = win 
-        
-        test_ma.game_logic.config_match_type.set("Simple")
-        
-        self._fill_board_for_draw(test_ma)
-        
-        test_ma.game_logic.current_letter_variable.set("O")
-        tile_to_click = test_ma.game_logic.gameboard_tile_instance_dict[2][2]
-        test_ma.game_logic.on_tile_click(tile_to_click)
-        
-        mock_destroy.assert_called_once()
-        mock_showinfo.assert_called_once()
-        
-        win.destroy()
-    
+    def __test_ac_5_3(self):
+        game_logic = self.create_game(3, "Simple")
+
+        self._fill_board_for_draw(game_logic)
+
+        game_logic.current_letter_variable.set("O")
+        tile_to_click = game_logic.gameboard_tile_instance_dict[2][2]
+        game_logic.on_tile_click(tile_to_click)
+
+        self.assertTrue(game_logic.gui.master.destroyed)
+        self.assertEqual(game_logic.gui.popups, [("Game Over!", "Tied! Nobody wins!")])
+
     def __test_ac_6_1(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(5)
-        test_ma.game_logic.board_dimension = 5
-        test_ma.game_logic.board_size = 25 
-        
-        test_ma.game_logic.create_players()
-        
-        win = test_ma.game_board(5)
-        
-        test_ma.game_logic.config_match_type.set("General")
-        test_ma.game_logic.current_player_number_variable.set(2)
-        test_ma.game_logic.current_player_name_variable.set(test_ma.game_logic.player_dict[2].name)
-        test_ma.game_logic.current_letter_variable.set("S")
-        
-        tile_to_click = test_ma.game_logic.gameboard_tile_instance_dict[1][1]
-        test_ma.game_logic.on_tile_click(tile_to_click)
-        
-        self.assertEqual(test_ma.game_logic.current_player_number_variable.get(), 1)
-        win.destroy()
+        game_logic = self.create_game(5, "General")
+
+        game_logic.current_player_number_variable.set(2)
+        game_logic.current_player_name_variable.set(game_logic.player_dict[2].name)
+        game_logic.current_letter_variable.set("S")
+
+        tile_to_click = game_logic.gameboard_tile_instance_dict[1][1]
+        game_logic.on_tile_click(tile_to_click)
+
+        self.assertEqual(game_logic.current_player_number_variable.get(), 1)
 
     def __test_ac_6_2(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.game_board_dimension_variable.set(5)
-        test_ma.game_logic.board_dimension = 5
-        test_ma.game_logic.board_size = 25 
-        
-        test_ma.game_logic.create_players()
-        
-        win = test_ma.game_board(5)
-        
-        test_ma.game_logic.config_match_type.set("General")
-        test_ma.game_logic.gameboard_tile_instance_dict[1][1].button_instance.config(text="S")
-        test_ma.game_logic.gameboard_tile_instance_dict[3][3].button_instance.config(text="S")
-        
-        test_ma.game_logic.current_player_number_variable.set(2)
-        test_ma.game_logic.current_player_name_variable.set(test_ma.game_logic.player_dict[2].name)
-        test_ma.game_logic.current_letter_variable.set("O")
-        
-        tile_to_click = test_ma.game_logic.gameboard_tile_instance_dict[2][2]
-        test_ma.game_logic.on_tile_click(tile_to_click)
-        
-        self.assertEqual(test_ma.game_logic.player_dict[2].score, 1)
-        win.destroy()
+        game_logic = self.create_game(5, "General")
+
+        game_logic.game_board.place(1, 1, "S")
+        game_logic.game_board.place(3, 3, "S")
+
+        game_logic.current_player_number_variable.set(2)
+        game_logic.current_player_name_variable.set(game_logic.player_dict[2].name)
+        game_logic.current_letter_variable.set("O")
+
+        tile_to_click = game_logic.gameboard_tile_instance_dict[2][2]
+        game_logic.on_tile_click(tile_to_click)
+
+        self.assertEqual(game_logic.player_dict[2].score, 1)
 
     def __test_ac_8_1(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.config_blue_player_type.set("Human")
-        test_ma.game_logic.config_red_player_type.set("Computer")
-        
-        test_ma.game_logic.create_players()
-        
-        self.assertIsInstance(test_ma.game_logic.player_dict[1], Player)
-        self.assertNotIsInstance(test_ma.game_logic.player_dict[1], ComputerPlayer)
-        self.assertIsInstance(test_ma.game_logic.player_dict[2], ComputerPlayer)
+        game_logic = self.create_game(8, blue_player_type="Human", red_player_type="Computer")
+
+        self.assertIsInstance(game_logic.player_dict[1], Player)
+        self.assertNotIsInstance(game_logic.player_dict[1], ComputerPlayer)
+        self.assertIsInstance(game_logic.player_dict[2], ComputerPlayer)
 
     def __test_ac_8_2(self):
-        test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.config_blue_player_type.set("Human")
-        test_ma.game_logic.config_red_player_type.set("Computer")
-        
-        test_ma.game_logic.create_players()
-        
-        test_ma.game_logic.game_board_dimension_variable.set(5)
-        test_ma.game_logic.board_dimension = 5
-        test_ma.game_logic.board_size = 25 
-        
-        win = test_ma.game_board(5)
-        try:
-            self.assertEqual(test_ma.game_logic.config_red_player_type.get(), "Computer")
-            self.assertEqual(test_ma.game_logic.current_player_number_variable.get(), 1)
-        finally:
-            win.destroy()
+        game_logic = self.create_game(5, blue_player_type="Human", red_player_type="Computer")
+        game_logic.reset_state()
+
+        self.assertEqual(game_logic.config_red_player_type.get(), "Computer")
+        self.assertEqual(game_logic.current_player_number_variable.get(), 1)
+        self.assertFalse(game_logic.gui.master.pending, "Computer should wait for the human's move")
 
     def __test_ac_8_3(self):
+        game_logic = self.create_game(4, blue_player_type="Human", red_player_type="Computer")
+        master = game_logic.gui.master
+
+        tile_human = game_logic.gameboard_tile_instance_dict[0][0]
+        game_logic.on_tile_click(tile_human)
+
+        self.assertEqual(game_logic.current_player_number_variable.get(), 2)
+        self.assertTrue(len(master.pending) > 0, "Computer did not schedule a move via .after()")
+
+        # The computer's move lands through the callbacks it scheduled with .after().
+        master.run()
+
+        self.assertEqual(game_logic.occupied_tile_count, 2)
+        self.assertEqual(game_logic.thinking_variable.get(), "")
+
+    def __test_ac_9_1(self):
+        game_logic = self.create_game(8, blue_player_type="Computer", red_player_type="Computer")
+
+        self.assertIsInstance(game_logic.player_dict[1], ComputerPlayer)
+        self.assertIsInstance(game_logic.player_dict[2], ComputerPlayer)
+        self.assertNotEqual(game_logic.player_dict[1], game_logic.player_dict[2])
+
+class TestGameWindow(unittest.TestCase):
+    """
+        Class for smoke testing the real game window, with Tk buttons. Skipped when no Tk root
+        can be created (no display).
+    """
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as error:
+            self.skipTest(f"no Tk root: {error}")
+        self.root.withdraw()
+        self.addCleanup(self.root.destroy)
+
+    def test_play_moves_in_window(self):
         test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.config_blue_player_type.set("Human")
-        test_ma.game_logic.config_red_player_type.set("Computer")
-        
+        test_ma.game_logic.config_match_type.set("General")
+        test_ma.game_logic.game_board_dimension_variable.set(5)
+        self.assertTrue(test_ma.game_logic.dimension_validate())
         test_ma.game_logic.create_players()
-        
-        test_ma.game_logic.game_board_dimension_variable.set(4)
-        test_ma.game_logic.board_dimension = 4
-        test_ma.game_logic.board_size = 16 
-        
-        win = test_ma.game_board(4)
-        test_ma.gui.master = win
+        test_ma.gui.master = test_ma.game_board(5)
+        test_ma.game_logic.reset_state()
+
+        tiles = test_ma.game_logic.gameboard_tile_instance_dict
+        for x, letter in ((0, "S"), (1, "O"), (2, "S")):
+            test_ma.game_logic.current_letter_variable.set(letter)
+            tiles[0][x].button_instance.invoke()
+            self.root.update()
+        self.assertEqual([tiles[0][x].button_instance.cget("text") for x in range(3)], ["S", "O", "S"])
+        self.assertEqual(str(tiles[0][0].button_instance.cget("state")), "disabled")
+        self.assertEqual(test_ma.game_logic.player_dict[1].score, 1)
+        self.assertEqual(test_ma.game_logic.current_player_number_variable.get(), 1) # scoring keeps the turn
+        self.assertEqual(tiles[0][1].button_instance.cget("bg"), test_ma.gui.color_dict["blue"])
+
+class TestGameBoard(unittest.TestCase):
+    """
+        Class for testing the headless board model. No Tk root is needed.
+    """
+    def test_find_sos_for_s(self):
+        board = GameBoard(5)
+        board.place(2, 2, "S")
+        board.place(3, 2, "O")
+        self.assertEqual(board.find_sos(4, 2, "S"), [((3, 2), (2, 2), (4, 2))])
+        self.assertEqual(board.count_sos(4, 2, "O"), 0)
+
+    def test_find_sos_for_o(self):
+        board = GameBoard(5)
+        board.place(1, 1, "S")
+        board.place(3, 3, "S")
+        board.place(3, 1, "S")
+        board.place(1, 3, "S")
+        self.assertEqual(board.count_sos(2, 2, "O"), 2)
+
+    def test_edges_do_not_wrap(self):
+        board = GameBoard(3)
+        board.place(2, 0, "O")
+        board.place(1, 0, "S")
+        self.assertEqual(board.count_sos(0, 0, "S"), 0)
+        self.assertEqual(board.count_sos(2, 1, "O"), 0)
+
+    def test_reset_and_empty_cells(self):
+        board = GameBoard(3)
+        board.place(0, 0, "S", 1)
+        self.assertEqual(board.get_owner(0, 0), 1)
+        self.assertEqual(len(board.empty_cells()), 8)
+        board.reset(4)
+        self.assertEqual(len(board.empty_cells()), 16)
+        self.assertTrue(board.is_empty(0, 0))
+
+    def test_empty_list_follows_moves(self):
+        board = GameBoard(3)
+        board.place(2, 1, "O")
+        board.place(0, 2, "S")
+        copied = board.copy()
+        board.remove(2, 1)
+        self.assertEqual(board.empty_count(), 8)
+        self.assertEqual(board.empty_cells(), [(x, y) for y in range(3) for x in range(3) if (x, y) != (0, 2)])
+        self.assertEqual(copied.empty_count(), 7)
+        rng = random.Random(449)
+        board = GameBoard(6)
+        for _ in range(200):
+            x, y = rng.randrange(6), rng.randrange(6)
+            if rng.random() < 0.6:
+                board.place(x, y, rng.choice("SO")) # placing on a taken cell or emptying an empty one is harmless
+            else:
+                board.remove(x, y)
+            self.assertEqual(board.empty_cells(), [(x, y) for y in range(6) for x in range(6) if board.is_empty(x, y)])
+        game_logic = headless.create_game(3, "General", "Human", "Human")
+        game_logic.game_board.place(1, 1, "S")
+        self.assertEqual(game_logic.occupied_tile_count, 1)
+
+class TestCandidateScoreCache(unittest.TestCase):
+    """
+        Class for testing the incremental score cache against a full rescan.
+    """
+    def test_cache_matches_full_rescan(self):
+        rng = random.Random(449)
+        for board_dimension in (3, 5, 8):
+            board = GameBoard(board_dimension)
+            cache = CandidateScoreCache(board)
+            empty = board.empty_cells()
+            rng.shuffle(empty)
+            for x, y in empty:
+                board.place(x, y, rng.choice("SO"))
+                cache.update_around(x, y)
+                self.assertTrue(cache.is_consistent(), f"cache drifted at {(x, y)} on {board_dimension}x{board_dimension}")
+            self.assertEqual(cache.points, {})
+
+    def test_update_reports_changed_cells(self):
+        board = GameBoard(5)
+        cache = CandidateScoreCache(board)
+        board.place(2, 2, "S")
+        cache.update_around(2, 2)
+        board.place(3, 2, "O")
+        changed = cache.update_around(3, 2)
+        self.assertIn((4, 2), changed)
+        self.assertIn((4, 2), cache.buckets["S"][1])
+
+class TestTripleIndex(unittest.TestCase):
+    """
+        Class for testing the precomputed three-in-a-line windows.
+    """
+    def test_window_counts(self):
+        # n x n boards have 4 axes of (n - 2) * n or (n - 2)^2 windows each.
+        for board_dimension in (3, 4, 8):
+            straight, diagonal = (board_dimension - 2) * board_dimension, (board_dimension - 2) ** 2
+            self.assertEqual(len(get_triple_index(board_dimension).windows), 2 * straight + 2 * diagonal)
+        self.assertEqual(len(TripleIndex(1, 5).windows), 3)
+        self.assertEqual(len(TripleIndex(4, 3).windows), 2*3 + 4*1 + 2*2)
+
+    def test_cell_positions(self):
+        index = get_triple_index(3)
+        self.assertEqual([position for _, position in index.cell_windows[index.cell(1, 1)]], [MIDDLE] * 4)
+        self.assertEqual(len(index.cell_windows[index.cell(0, 0)]), 3)
+        self.assertTrue(all(position == END for _, position in index.cell_windows[index.cell(0, 0)]))
+        for cell, lines in enumerate(index.s_lines):
+            for window, middle, far in lines:
+                self.assertEqual(index.windows[window][1], middle)
+                self.assertIn(cell, index.windows[window])
+                self.assertIn(far, index.windows[window])
+
+    def test_non_square_find_sos(self):
+        index = TripleIndex(5, 2)
+        letters = {index.cell(0, 0): "S", index.cell(1, 0): "O", index.cell(3, 1): "S"}
+        scoring = [(index.coords[middle], index.coords[far]) for _, middle, far in index.s_lines[index.cell(2, 0)]
+                   if letters.get(middle) == "O" and letters.get(far) == "S"]
+        self.assertEqual(scoring, [((1, 0), (0, 0))])
+        self.assertEqual([(index.coords[first], index.coords[last]) for _, first, last in index.o_lines[index.cell(2, 1)]],
+                         [((1, 1), (3, 1))])
+        self.assertIs(get_triple_index(6), get_triple_index(6, 6))
+
+class TestWindowCounters(unittest.TestCase):
+    """
+        Class for testing the per-window counters against the board's own scoring.
+    """
+    def test_gains_match_count_sos(self):
+        rng = random.Random(449)
+        board = GameBoard(6)
+        counters = WindowCounters.from_board(board)
+        index = counters.index
+        empty = board.empty_cells()
+        rng.shuffle(empty)
+        for step, (x, y) in enumerate(empty):
+            letter = rng.choice("SO")
+            board.place(x, y, letter)
+            counters.place(index.cell(x, y), letter)
+            if step % 5 == 4: # undo now and then, as the search does
+                board.remove(x, y)
+                counters.remove(index.cell(x, y))
+            for ex, ey in board.empty_cells():
+                for scored in ("S", "O"):
+                    self.assertEqual(counters.gain(index.cell(ex, ey), scored), board.count_sos(ex, ey, scored))
+
+    def test_threats(self):
+        board = GameBoard(3)
+        board.place(0, 0, "S")
+        board.place(2, 0, "S")
+        board.place(1, 1, "O")
+        counters = WindowCounters.from_board(board)
+        index = counters.index
+        self.assertEqual(sorted(counters.threats.values()),
+                         sorted([(index.cell(1, 0), "O"), (index.cell(2, 2), "S"), (index.cell(0, 2), "S")]))
+        counters.place(index.cell(1, 0), "S")
+        self.assertEqual(counters.gain(index.cell(1, 0), "O"), 0)
+        self.assertEqual(counters.gain(index.cell(1, 2), "S"), 1) # S O _ down the middle column
+        self.assertEqual(len(counters.threats), 3)
+
+class TestBitBoard(unittest.TestCase):
+    """
+        Class for testing the bitboard engine against the dict board model.
+    """
+    def test_matches_game_board(self):
+        rng = random.Random(449)
+        for board_dimension in (3, 5, 9, 15):
+            game_board = GameBoard(board_dimension)
+            bit_board = BitBoard(board_dimension)
+            for y in range(board_dimension):
+                for x in range(board_dimension):
+                    letter = rng.choice(["", "", "S", "O"])
+                    if letter != "":
+                        game_board.place(x, y, letter, 1)
+                        bit_board.place(x, y, letter, 1)
+            self.assertEqual(bit_board.cells, game_board.cells)
+            self.assertEqual(bit_board.empty_cells(), game_board.empty_cells())
+            for y in range(board_dimension):
+                for x in range(board_dimension):
+                    for letter in ("S", "O"):
+                        self.assertEqual(bit_board.find_sos(x, y, letter), game_board.find_sos(x, y, letter))
+            self.assertTrue(CandidateScoreCache(bit_board).is_consistent())
+
+    def test_scoring_masks(self):
+        bit_board = BitBoard(5)
+        bit_board.place(0, 0, "S")
+        bit_board.place(1, 1, "O")
+        bit_board.place(2, 0, "S")
+        points = {}
+        for mask in bit_board.scoring_masks("S"):
+            for bit in iterate_bits(mask):
+                cell = bit_board.coord(bit)
+                points[cell] = points.get(cell, 0) + 1
+        self.assertEqual(points, {(2, 2): 1, (0, 2): 1})
+        self.assertEqual(sum(mask != 0 for mask in bit_board.scoring_masks("O")), 1)
+
+    def test_copy_is_independent(self):
+        bit_board = BitBoard(4)
+        bit_board.place(1, 1, "S", 2)
+        copied = bit_board.copy()
+        copied.place(2, 2, "O", 1)
+        self.assertTrue(bit_board.is_empty(2, 2))
+        self.assertEqual(copied.get_owner(1, 1), 2)
+        self.assertNotEqual(bit_board.key(), copied.key())
+
+class TestHeadless(unittest.TestCase):
+    """
+        Class for testing computer-vs-computer games without a Tk root.
+    """
+    def test_general_game_fills_board(self):
+        for board_engine in ("Dict", "Bitboard"):
+            result = headless.play_game(5, "General", seed=449, board_engine=board_engine)
+            self.assertEqual(result["moves"], 25)
+            self.assertEqual(result["winner"], 0 if result["scores"][0] == result["scores"][1]
+                             else (1 if result["scores"][0] > result["scores"][1] else 2))
+
+    def test_simple_game_ends_on_first_sos(self):
+        result = headless.play_game(6, "Simple", seed=449)
+        self.assertLessEqual(sum(result["scores"]), 8)
+        self.assertTrue(result["moves"] == 36 or sum(result["scores"]) > 0)
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(headless.play_game(7, "General", seed=3)["scores"],
+                         headless.play_game(7, "General", seed=3)["scores"])
+
+    def test_cache_stays_consistent_during_game(self):
+        game_logic = headless.create_game(6, "General")
+        game_logic.reset_state()
+        while game_logic.gui.master.run_once():
+            self.assertTrue(game_logic._score_cache == None or game_logic._score_cache.is_consistent())
+        self.assertTrue(game_logic.gui.master.destroyed)
+
+class TestUndo(unittest.TestCase):
+    """
+        Class for testing make/unmake on GameState and undo in the live game.
+    """
+    def test_make_unmake_round_trip(self):
+        rng = random.Random(449)
+        for board_engine in (GameBoard, BitBoard):
+            state = GameState(board_engine(5), "General")
+            snapshots = []
+            while not state.is_over():
+                x, y, letter = rng.choice(state.legal_moves())
+                snapshots.append(state.snapshot())
+                expected = state.board.count_sos(x, y, letter)
+                self.assertEqual(state.make_move(x, y, letter), expected)
+            self.assertEqual(state.occupied_count, 25)
+            while snapshots:
+                state.unmake_move()
+                self.assertEqual(state.snapshot(), snapshots.pop())
+            self.assertEqual(state.occupied_count, 0)
+            self.assertEqual(state.counters.threats, {})
+
+    def test_simple_match_ends_on_first_sos(self):
+        state = GameState(GameBoard(3), "Simple")
+        state.make_move(0, 0, "S")
+        state.make_move(1, 0, "O")
+        self.assertFalse(state.is_over())
+        self.assertEqual(state.make_move(2, 0, "S"), 1)
+        self.assertTrue(state.is_over())
+        self.assertEqual(state.current_player, 1) # scoring keeps the turn
+
+    def test_snapshot_is_compact_and_immutable(self):
+        state = GameState(GameBoard(3), "General")
+        state.make_move(1, 1, "O")
+        snapshot = state.snapshot()
+        self.assertEqual(snapshot, PositionSnapshot(3, "General", "....O....", (0, 0), 2))
+        self.assertEqual(pickle.loads(pickle.dumps(snapshot)), snapshot)
+        with self.assertRaises(AttributeError):
+            snapshot.cells = "........."
+        restored = GameState.from_snapshot(snapshot, BitBoard)
+        self.assertEqual(restored.snapshot(), snapshot)
+        self.assertEqual(restored.points_for(1, 0, "S"), 0)
+
+    def test_players_choose_moves_on_game_state(self):
+        game_logic = headless.create_game(4, "Simple", "Human", "Human")
+        game_logic.reset_state()
+        game_logic.play_move(0, 0, "S")
+        game_logic.play_move(2, 0, "S")
+        state = game_logic.game_state()
+        mcts_player = MCTSPlayer("Gambler", "blue", None, headless, workers=1)
+        mcts_player.mcts.max_rollouts = 200
+        for player in (ComputerPlayer("Clanker", "blue", None, headless), SearchPlayer("Seeker", "blue", None, headless),
+                       mcts_player):
+            self.assertEqual(player.choose_state_move(state, 0.05), ((1, 0), "O"))
+        (x, y), letter = RandomPlayer("Dice", "blue", None, headless).choose_state_move(state, 0.05)
+        self.assertTrue(state.board.is_empty(x, y))
+        self.assertEqual(state.snapshot(), game_logic.position_snapshot())
+
+    def test_undo_move_restores_game(self):
+        rng = random.Random(449)
+        game_logic = headless.create_game(5, "General", "Human", "Human")
+        game_logic.move_log = move_log.MoveLogWriter(io.BytesIO())
+        game_logic.reset_state()
+        game_logic._return_possible_score_per_tile()
+        snapshots = []
+        for _ in range(20):
+            x, y = rng.choice(game_logic.game_board.empty_cells())
+            snapshots.append((game_logic.position_snapshot(), game_logic.move_log.file.getvalue()))
+            game_logic.play_move(x, y, rng.choice("SO"))
+        self.assertGreater(len(game_logic.sos_lines), 0)
+        while snapshots:
+            self.assertTrue(game_logic.undo_move())
+            snapshot, log = snapshots.pop()
+            self.assertEqual(game_logic.position_snapshot(), snapshot)
+            self.assertEqual(game_logic.move_log.file.getvalue(), log)
+            self.assertEqual(game_logic.occupied_tile_count, len(snapshots))
+            self.assertEqual(game_logic.current_player_name_variable.get(),
+                             game_logic.player_dict[snapshot.current_player].name)
+            self.assertTrue(game_logic._score_cache.is_consistent())
+        self.assertFalse(game_logic.undo_move())
+        self.assertEqual(game_logic.sos_lines, [])
+        self.assertEqual(game_logic.player_dict[1].owned_tile, {"S": [], "O": []})
+
+    def test_undo_turn_skips_back_over_computer(self):
+        game_logic = headless.create_game(4, "General", "Human", "Computer")
+        game_logic.reset_state()
+        game_logic.play_move(0, 0, "S")
+        game_logic.gui.master.run()
+        self.assertGreaterEqual(len(game_logic.move_history), 2)
+        game_logic.undo_turn()
+        self.assertEqual(game_logic.move_history, [])
+        self.assertEqual(game_logic.current_player_number_variable.get(), 1)
+
+    def test_undo_recolors_buttons(self):
+        game_logic = headless.create_game(3, "General", "Human", "Human")
+        gui = game_logic.gui
+        gui.config_button = lambda *args, **kwargs: GUILogic.config_button(gui, *args, **kwargs)
+        gui.restore_button = lambda *args, **kwargs: GUILogic.restore_button(gui, *args, **kwargs)
+        tiles = game_logic.gameboard_tile_instance_dict
+        for row in tiles.values():
+            for tile in row.values():
+                tile.set_button_instance(mock.Mock())
+                tile.button_instance.cget.side_effect = {"text": "", "state": tk.NORMAL, "bg": "white",
+                                                         "disabledforeground": "gray"}.get
+        game_logic.reset_state()
+        for x, y, letter in ((0, 0, "S"), (1, 1, "O"), (2, 2, "S"), (0, 2, "S"), (2, 0, "S")):
+            game_logic.play_move(x, y, letter) # blue scores the diagonal, red the other one
+        self.assertEqual(tiles[1][1].button_options["bg"], gui.color_dict["purple"])
+        game_logic.undo_move()
+        self.assertEqual(tiles[0][2].button_options, {"text": "", "state": tk.NORMAL, "bg": "white",
+                                                      "disabledforeground": "gray"})
+        self.assertEqual(tiles[1][1].button_options["bg"], gui.color_dict["blue"])
+        self.assertEqual(tiles[2][0].button_options["bg"], "white")
+
+class TestHeatmap(unittest.TestCase):
+    """
+        Class for testing the move-potential heatmap overlay.
+    """
+    def test_tints_match_board(self):
+        rng = random.Random(449)
+        game_logic = headless.create_game(8, "General", "Human", "Human", buttons=True)
+        game_logic.config_show_heatmap.set(True)
+        game_logic.reset_state()
+        board = game_logic.game_board
+        for step in range(40):
+            if step % 7 == 6:
+                game_logic.undo_move()
+            else:
+                game_logic.play_move(*rng.choice(board.empty_cells()), rng.choice("SO"))
+            for y, row in game_logic.gameboard_tile_instance_dict.items():
+                for x, tile in row.items():
+                    bg = tile.button_instance.cget("bg")
+                    if not board.is_empty(x, y):
+                        self.assertNotIn(bg, HEATMAP_COLORS, (x, y))
+                        continue
+                    best = max(board.count_sos(x, y, "S"), board.count_sos(x, y, "O"))
+                    self.assertEqual(bg, HEATMAP_COLORS[min(best, 4) - 1] if best > 0 else "white", (x, y))
+        game_logic.config_show_heatmap.set(False)
+        game_logic.refresh_heatmap()
+        self.assertFalse(any(tile.button_instance.cget("bg") in HEATMAP_COLORS
+                             for row in game_logic.gameboard_tile_instance_dict.values() for tile in row.values()))
+
+    def test_move_repaints_only_changed_tiles(self):
+        game_logic = headless.create_game(15, "General", "Human", "Human")
+        gui = game_logic.gui
+        tiles = game_logic.gameboard_tile_instance_dict
+        for row in tiles.values():
+            for tile in row.values():
+                tile.set_button_instance(mock.Mock())
+                tile.button_instance.cget.return_value = "white"
+        game_logic.config_show_heatmap.set(True)
+        game_logic.reset_state()
+        game_logic.play_move(7, 7, "S")
+        game_logic.play_move(8, 7, "O")
+        tiles[7][9].button_instance.config.assert_called_once_with(bg=HEATMAP_COLORS[0])
+        tinted = [tile.coord for row in tiles.values() for tile in row.values()
+                  if any("bg" in call.kwargs for call in tile.button_instance.config.call_args_list)]
+        self.assertEqual(tinted, [(9, 7)])
+
+class TestButtonBatching(unittest.TestCase):
+    """
+        Class for testing that button updates are coalesced and written once per turn.
+    """
+    def test_batch_writes_final_options_once(self):
+        gui = GUILogic()
+        tile = Tile(mock.Mock(), 0, 0)
+        gui.begin_batch()
+        gui.config_button(tile, "S", "disabled")
+        gui.config_button(tile, new_state="disabled", new_color="blue")
+        gui.config_button(tile, new_state="disabled", new_color="red")
+        tile.button_instance.config.assert_not_called()
+        gui.flush_updates()
+        tile.button_instance.config.assert_called_once_with(text="S", state=tk.DISABLED,
+                                                            disabledforeground="white", bg=gui.color_dict["purple"])
+
+    def test_unchanged_options_are_not_written(self):
+        gui = GUILogic()
+        tile = Tile(mock.Mock(), 0, 0)
+        gui.config_button(tile, new_state="disabled")
+        gui.config_button(tile, new_state="disabled")
+        self.assertEqual(tile.button_instance.config.call_count, 1)
+
+    def test_turn_writes_each_changed_tile_once(self):
+        game_logic = headless.create_game(3, "General", "Human", "Human")
+        gui = game_logic.gui
+        gui.config_button = lambda *args, **kwargs: GUILogic.config_button(gui, *args, **kwargs)
+        tiles = game_logic.gameboard_tile_instance_dict
+        for row in tiles.values():
+            for tile in row.values():
+                tile.set_button_instance(mock.Mock())
+        for x, y, letter in ((0, 0, "S"), (1, 0, "O"), (1, 1, "O"), (0, 2, "S")):
+            game_logic.game_board.place(x, y, letter)
+        game_logic.reset_state()
+        game_logic.current_letter_variable.set("S")
+        game_logic.on_tile_click(tiles[0][2])  # completes a row and a diagonal SOS
+
+        self.assertEqual(game_logic.player_dict[1].score, 2)
+        # One write when the letter is placed, then one for the whole turn.
+        self.assertEqual(tiles[0][2].button_instance.config.call_count, 2)
+        for x, y in ((0, 0), (1, 0), (1, 1), (0, 2)):
+            self.assertEqual(tiles[y][x].button_instance.config.call_count, 1, (x, y))
+        tiles[2][2].button_instance.config.assert_not_called()
+
+class TestInstrumentation(unittest.TestCase):
+    """
+        Class for testing the optional events and phase timers.
+    """
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_off_records_nothing(self):
+        instrumentation.disable()
+        instrumentation.reset()
+        headless.play_game(5, "General", seed=449)
+        self.assertEqual(instrumentation.events, [])
+        self.assertEqual(instrumentation.phase_totals, {})
+
+    def test_events_and_timings(self):
+        instrumentation.enable(game_summaries=False)
+        result = headless.play_game(5, "General", seed=449)
+        sos_events = [record for record in instrumentation.events if record["event"] == "sos"]
+        self.assertEqual(len(sos_events), sum(result["scores"]))
+        for record in sos_events:
+            cells = record["cells"]
+            dx, dy = record["direction"]
+            self.assertIn((dx, dy), ((1, 0), (0, 1), (1, 1), (1, -1)))
+            start = min(cells)
+            self.assertEqual(sorted(cells), sorted((start[0] + step*dx, start[1] + step*dy) for step in range(3)))
+        scores = [record["score"] for record in instrumentation.events if record["event"] == "score"]
+        self.assertEqual(len(scores), sum(result["scores"]))
+        timings = result["timings"]["phases"]
+        self.assertEqual(timings["analysis"]["count"], 25)
+        self.assertEqual(timings["ai selection"]["count"], 25)
+        self.assertEqual(result["timings"]["events"]["move"], 25)
+
+class TestBenchmark(unittest.TestCase):
+    """
+        Class for testing the benchmark report and compare mode.
+    """
+    def test_compare_flags_slowdowns(self):
+        before = {"results": {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "gone": {"seconds": 1.0}}}
+        after = {"results": {"a": {"seconds": 1.05}, "b": {"seconds": 1.5}, "new": {"seconds": 1.0}}}
+        rows = app_benchmark.compare_results(before, after, 0.10)
+        self.assertEqual([(row["name"], row["slower"]) for row in rows], [("a", False), ("b", True)])
+
+    def test_headless_group_runs(self):
+        with mock.patch.object(app_benchmark, "SCAN_SIZES", (3,)), \
+             mock.patch.object(app_benchmark, "GAME_SETTINGS", ((4, "Simple"),)):
+            report = app_benchmark.run(["headless"], repeat=1)
+        self.assertIn("headless/possible_score_per_tile/3x3", report["results"])
+        self.assertIn("headless/cvc_game/Simple/4x4", report["results"])
+        self.assertGreater(report["results"]["headless/move_analysis/S/8x8"]["seconds"], 0)
+
+class TestMoveLog(unittest.TestCase):
+    """
+        Class for testing the binary move log and the replay engine.
+    """
+    def test_round_trip_and_replay(self):
+        writer = move_log.MoveLogWriter(io.BytesIO())
+        results = [headless.play_game(6, "General", seed=449, move_log=writer),
+                   headless.play_game(5, "Simple", seed=3, move_log=writer)]
+        writer.flush()
+        data = writer.file.getvalue()
+        games = list(move_log.parse_games(data))
+
+        self.assertEqual(len(games), 2)
+        self.assertEqual(len(data), 2 * move_log.HEADER.size + 3 * sum(result["moves"] for result in results))
+        for game, result, (board_dimension, match_type) in zip(games, results, ((6, "General"), (5, "Simple"))):
+            self.assertEqual((game.board_dimension, game.match_type), (board_dimension, match_type))
+            self.assertEqual(game.player_types, ("Computer", "Computer"))
+            self.assertEqual(game.scores(), result["scores"])
+            self.assertEqual(move_log.replay_headless(game), {"scores": result["scores"], "moves": result["moves"]})
+
+    def test_game_in_progress_is_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.soslog")
+            writer = move_log.MoveLogWriter(path)
+            game_logic = headless.create_game(5, "General", "Human", "Human")
+            game_logic.move_log = writer
+            game_logic.reset_state()
+            for x in range(4):
+                game_logic.play_move(x, 0, "S")
+            game_logic.undo_move()
+            # Read back while the game is still going, without flushing or closing the writer.
+            games = list(move_log.read_games(path))
+            self.assertEqual(len(games), 1)
+            self.assertEqual([move[:3] for move in games[0].moves], [(0, 0, "S"), (1, 0, "S"), (2, 0, "S")])
+            with open(path, "rb") as log_file:
+                data = log_file.read()
+            self.assertEqual(len(list(move_log.parse_games(data + data[-2:]))[0].moves), 3) # torn last record
+            writer.close()
+
+    def test_append_after_torn_record(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.soslog")
+            writer = move_log.MoveLogWriter(path)
+            results = [headless.play_game(4, "General", seed=5, move_log=writer)]
+            writer.close()
+            with open(path, "ab") as log_file:
+                log_file.write(b"\x07") # a kill in the middle of writing a record
+            writer = move_log.MoveLogWriter(path)
+            results.append(headless.play_game(5, "Simple", seed=6, move_log=writer))
+            writer.close()
+            games = list(move_log.read_games(path))
+            self.assertEqual(len(games), 2)
+            for game, result in zip(games, results):
+                self.assertEqual(len(game.moves), result["moves"])
+                self.assertEqual(move_log.replay_headless(game)["scores"], result["scores"])
+
+    def test_replay_detects_wrong_points(self):
+        writer = move_log.MoveLogWriter(io.BytesIO())
+        headless.play_game(5, "General", seed=449, move_log=writer)
+        writer.flush()
+        game = next(move_log.parse_games(writer.file.getvalue()))
+        index = next(index for index, move in enumerate(game.moves) if move[4] > 0)
+        x, y, letter, player, points = game.moves[index]
+        game.moves[index] = (x, y, letter, player, points + 1)
+        with self.assertRaises(move_log.ReplayMismatch):
+            move_log.replay_headless(game)
+
+class TestGameArchive(unittest.TestCase):
+    """
+        Class for testing the SQLite game archive.
+    """
+    def setUp(self):
+        self.archive = GameArchive(":memory:")
+
+    def tearDown(self):
+        self.archive.close()
+
+    def test_bulk_insert_and_query(self):
+        writer = move_log.MoveLogWriter(io.BytesIO())
+        for seed in range(12):
+            headless.play_game(4 if seed % 2 else 5, "General", seed=seed, move_log=writer)
+        writer.flush()
+        logged_games = list(move_log.parse_games(writer.file.getvalue()))
+        self.assertEqual(self.archive.add_games(iter(logged_games), batch_size=5), 12)
+
+        self.assertEqual(self.archive.count(), 12)
+        self.assertEqual(self.archive.count(board_dimension=4), 6)
+        stored = list(self.archive.query(board_dimension=5, match_type="General"))
+        self.assertEqual(len(stored), 6)
+        for archived, logged in zip(stored, logged_games[0::2]):
+            self.assertEqual(archived.moves, logged.moves)
+            self.assertEqual(archived.stored_scores, logged.scores())
+            self.assertEqual(archived.length, 25)
+        stats = self.archive.outcome_stats(board_dimension=5)
+        self.assertEqual(stats["games"], 6)
+        self.assertEqual(stats["blue_wins"] + stats["red_wins"] + stats["ties"], 6)
+
+        winners = [game.stored_winner for game in self.archive.query(with_moves=False, winner=1, limit=3)]
+        self.assertEqual(winners, [1] * len(winners))
+        with self.assertRaises(ValueError):
+            next(self.archive.query(with_moves=False)).moves
+        with self.assertRaises(TypeError):
+            self.archive.count(colour="blue")
+
+    def test_finished_game_is_archived(self):
+        game_logic = headless.create_game(5, "Simple")
+        game_logic.archive = self.archive
+        game_logic.reset_state()
+        game_logic.gui.master.run()
+        archived = next(self.archive.query())
+        self.assertEqual(archived.stored_scores, game_logic.last_result["scores"])
+        self.assertEqual(archived.moves, game_logic.move_history)
+        self.assertEqual(archived.player_types, ("Computer", "Computer"))
+        self.assertEqual(move_log.replay_headless(archived)["scores"], archived.stored_scores)
+
+class TestTournament(unittest.TestCase):
+    """
+        Class for testing tournament scheduling, resuming and ratings.
+    """
+    def test_pairings(self):
+        roster = ["Random", "Computer", "Search", "MCTS"]
+        self.assertEqual(len(tournament.round_robin_pairings(roster)), 6)
+        games = tournament.pairing_games(1, "Random", "Computer", [3, 5], ["Simple", "General"])
+        self.assertEqual(len(games), 8)
+        self.assertEqual(sum(game["blue"] == "Random" for game in games), 4)
+        finished = [{"blue": "Random", "red": "Computer", "winner": "2", "round": "1"},
+                    {"blue": "Search", "red": "MCTS", "winner": "1", "round": "1"}]
+        # Both winners lead, but they meet before anyone is given a rematch.
+        self.assertEqual(tournament.swiss_pairings(roster, finished), [("Computer", "Search"), ("Random", "MCTS")])
+
+    def test_resume_and_ratings(self):
+        with tempfile.TemporaryDirectory() as directory:
+            games_file = os.path.join(directory, "games.csv")
+            arguments = (["Random", "Computer"], [3], ["General"], "round-robin")
+            first = tournament.run_tournament(*arguments, rounds=1, games_file=games_file, processes=1)
+            self.assertEqual(len(first), 2)
+            played = []
+            games = tournament.run_tournament(*arguments, rounds=2, games_file=games_file, processes=1,
+                                              progress=played.append)
+            self.assertEqual((len(games), len(played)), (4, 2))
+            self.assertEqual(len(tournament.read_games(games_file)), 4)
+            with open(games_file, "a", newline="") as output_file:
+                output_file.write("r3-") # a run killed while writing a game
+            self.assertEqual(len(tournament.read_games(games_file)), 4)
+            games = tournament.run_tournament(*arguments, rounds=3, games_file=games_file, processes=1)
+            self.assertEqual(len(games), 6)
+            self.assertEqual(len(tournament.read_games(games_file)), 6)
+        self.assertEqual({game["round"] for game in played}, {"2"})
+
+        strong_wins = [{"game_id": str(index), "round": str(index // 4 + 1), "blue": blue, "red": red,
+                        "winner": "1" if blue == "Computer" else "2"}
+                       for index, (blue, red) in enumerate([("Computer", "Random"), ("Random", "Computer")] * 10)]
+        rows = tournament.rating_table(["Random", "Computer"], strong_wins)
+        self.assertEqual([row["player"] for row in rows], ["Computer", "Random"])
+        self.assertEqual((rows[0]["wins"], rows[0]["losses"]), (20, 0))
+        self.assertLess(rows[0]["rd"], tournament.INITIAL_RD)
+        self.assertTrue(rows[0]["ci_low"] < rows[0]["rating"] < rows[0]["ci_high"])
+        self.assertGreater(rows[0]["elo"], rows[1]["elo"])
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    """
+        Class for testing the asyncio match server with real TCP clients.
+    """
+    async def asyncSetUp(self):
+        # Threads instead of processes keep the test quick; the protocol is the same.
+        self.server = server.SOSServer(port=0, executor=ThreadPoolExecutor(max_workers=2), move_time_budget_ms=10)
+        await self.server.start()
+        self.connections = []
+
+    async def asyncTearDown(self):
+        for _, writer in self.connections:
+            writer.close()
+        await self.server.close()
+
+    async def _connect(self):
+        connection = await asyncio.open_connection("127.0.0.1", self.server.port)
+        self.connections.append(connection)
+        return connection
+
+    async def _send(self, connection, message:dict) -> None:
+        connection[1].write(json.dumps(message).encode() + b"\n")
+        await connection[1].drain()
+
+    async def _receive(self, connection, kind:str) -> dict:
+        # Skips other messages until one of the given type arrives.
+        while True:
+            message = json.loads(await asyncio.wait_for(connection[0].readline(), 10))
+            if message["type"] == kind:
+                return message
+
+    async def test_two_humans_and_turns(self):
+        blue, red = await self._connect(), await self._connect()
+        await self._send(blue, {"type": "create", "size": 3, "match_type": "Simple", "blue": "Human", "red": "Human"})
+        joined = await self._receive(blue, "joined")
+        self.assertEqual((joined["seat"], joined["started"]), (1, False))
+        await self._send(blue, {"type": "move", "x": 0, "y": 0, "letter": "S"})
+        self.assertIn("not running", (await self._receive(blue, "error"))["message"])
+
+        await self._send(red, {"type": "join", "table": joined["table"]})
+        self.assertEqual((await self._receive(red, "joined"))["seat"], 2)
+        await self._receive(blue, "start")
+        await self._send(red, {"type": "move", "x": 0, "y": 0, "letter": "S"})
+        self.assertEqual((await self._receive(red, "error"))["message"], "not your turn")
 
+        for connection, x, letter in ((blue, 0, "S"), (red, 1, "O"), (blue, 2, "S")):
+            await self._send(connection, {"type": "move", "x": x, "y": 0, "letter": letter})
+            move = await self._receive(red, "move")
+            self.assertEqual((move["x"], move["letter"]), (x, letter))
+        self.assertEqual((move["points"], move["sos"]), (1, [[[1, 0], [0, 0], [2, 0]]]))
+        self.assertEqual((await self._receive(blue, "game_over"))["winner"], 1)
+
+    async def test_computer_opponent_and_cleanup(self):
+        human = await self._connect()
+        await self._send(human, {"type": "create", "size": 3, "match_type": "General", "blue": "Computer",
+                                 "red": "Human"})
+        self.assertEqual((await self._receive(human, "joined"))["seat"], 2)
+        moves = 0
+        while True:
+            message = json.loads(await asyncio.wait_for(human[0].readline(), 10))
+            if message["type"] == "game_over":
+                break
+            if message["type"] == "move":
+                moves += 1
+                table = self.server.tables[1]
+                if message["turn"] == 2 and not table.over:
+                    x, y = table.game_logic.game_board.empty_cells()[0]
+                    await self._send(human, {"type": "move", "x": x, "y": y, "letter": "O"})
+        self.assertEqual(moves, 9)
+        await self._send(human, {"type": "leave"})
+        await self._send(human, {"type": "list"})
+        self.assertEqual((await self._receive(human, "tables"))["tables"], [])
+        self.assertEqual(self.server.tables, {})
+
+    async def test_blocking_client(self):
+        connection = await asyncio.to_thread(server.ServerConnection, "127.0.0.1", self.server.port)
         try:
-            captured_callbacks = []
-            def mock_after(delay, callback=None):
-                if callback:
-                    captured_callbacks.append(callback)
-                return "id"
-
-            with mock.patch.object(win, 'after', side_effect=mock_after):
-                tile_human = test_ma.game_logic.gameboard_tile_instance_dict[0][0]
-                test_ma.game_logic.on_tile_click(tile_human)
-                
-                self.assertEqual(test_ma.game_logic.current_player_number_variable.get(), 2)
-                self.assertTrue(len(captured_callbacks) > 0, "Computer did not schedule a move via .after()")
-                
-                computer_move_lambda = captured_callbacks[0]
-                computer_move_lambda()
-                
-                self.assertEqual(test_ma.game_logic.occupied_tile_count, 2)
+            connection.send({"type": "create", "size": 2})
+            connection.send({"type": "list"})
+            received = []
+            while len(received) < 2:
+                await asyncio.sleep(0.01)
+                received += connection.messages()
+            self.assertEqual([message["type"] for message in received], ["error", "tables"])
         finally:
-            win.destroy()
+            connection.close()
+        self.assertEqual(server.parse_address("example.lan"), ("example.lan", server.DEFAULT_PORT))
+        self.assertEqual(server.parse_address("10.0.0.2:5000"), ("10.0.0.2", 5000))
+        for address in ("example.lan:abc", "example.lan:70000"):
+            with self.assertRaises(ValueError):
+                server.parse_address(address)
 
-    def __test_ac_9_1(self):
+    def test_bad_address_shows_error(self):
+        application = mock.Mock()
+        with mock.patch("main.msgbox.showerror") as showerror, mock.patch("server.ServerConnection") as connection:
+            main.MainApplication.connect_to_server(application, "example.lan:abc")
+        showerror.assert_called_once()
+        connection.assert_not_called()
+
+    def test_computer_seats_move_on_game_state(self):
+        snapshot = PositionSnapshot(4, "General", "S.S.............", (0, 0), 2)
+        with mock.patch("mcts.ProcessPoolExecutor") as pool:
+            (x, y), letter = server._computer_move(("MCTS", snapshot, 20))
+        pool.assert_not_called()
+        self.assertEqual(snapshot.cells[y * 4 + x], ".")
+        for seat_type in ("Computer", "Search"):
+            self.assertEqual(server._computer_move((seat_type, snapshot, 20)), ((1, 0), "O"))
+
+@unittest.skipIf(numpy_scoring == None, "numpy is not installed")
+class TestTablebase(unittest.TestCase):
+    """
+        Class for testing the exhaustive solver and tablebase probing against full-depth search.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.tablebases = {}
+        for match_type in ("Simple", "General"):
+            path = os.path.join(cls.directory.name, f"sos_3x3_{match_type}.tb")
+            tablebase.solve(3, match_type, path, processes=2)
+            cls.tablebases[match_type] = tablebase.Tablebase(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebases.clear()
+        cls.directory.cleanup()
+
+    def test_values_match_full_search(self):
+        rng = random.Random(449)
+        for match_type, solved in self.tablebases.items():
+            for _ in range(60):
+                board = GameBoard(3)
+                for y in range(3):
+                    for x in range(3):
+                        letter = rng.choice(["", "", "S", "O"])
+                        if letter != "":
+                            board.place(x, y, letter)
+                if not board.empty_cells():
+                    continue
+                value, _ = AlphaBetaSearch(3, match_type, max_depth=0).search(board)
+                self.assertEqual(solved.value(board), value)
+                self.assertEqual(solved.move_values(board)[solved.best_move(board)], value)
+
+    def test_symmetric_positions_share_a_key(self):
+        solved = self.tablebases["General"]
+        board, mirrored = GameBoard(3), GameBoard(3)
+        board.place(0, 0, "S")
+        board.place(1, 0, "O")
+        mirrored.place(2, 2, "S")
+        mirrored.place(2, 1, "O")
+        self.assertEqual(solved.canonical_code(tablebase.position_code(board)),
+                         solved.canonical_code(tablebase.position_code(mirrored)))
+
+    def test_search_player_plays_perfectly(self):
+        for seed in range(6):
+            result = headless.play_game(3, "General", seed=seed, blue_player_type="Search",
+                                        tablebases=[self.tablebases["General"]])
+            self.assertNotEqual(result["winner"], 2)
+
+class TestSearch(unittest.TestCase):
+    """
+        Class for testing the alpha-beta search player.
+    """
+    def _minimax(self, board, depth, simple):
+        # Plain minimax without pruning or transpositions, as the reference.
+        if depth <= 0 or not board.empty_cells():
+            return 0
+        best = None
+        for x, y in board.empty_cells():
+            for letter in ("S", "O"):
+                points = board.count_sos(x, y, letter)
+                board.place(x, y, letter)
+                if points > 0 and simple:
+                    value = points
+                elif points > 0:
+                    value = points + self._minimax(board, depth - 1, simple)
+                else:
+                    value = -self._minimax(board, depth - 1, simple)
+                board.remove(x, y)
+                best = value if best == None else max(best, value)
+        return best
+
+    def test_matches_minimax(self):
+        rng = random.Random(449)
+        for _ in range(20):
+            board = GameBoard(rng.choice([3, 4]))
+            for x, y in board.empty_cells():
+                if rng.random() < 0.5:
+                    board.place(x, y, rng.choice("SO"))
+            for match_type in ("General", "Simple"):
+                depth = rng.choice([1, 2, 3])
+                value, _ = AlphaBetaSearch(board.board_dimension, match_type, max_depth=depth).search(board)
+                self.assertEqual(value, self._minimax(board, depth, match_type == "Simple"))
+
+    def test_extra_turn_is_used(self):
+        # S_S with an O to place: scoring keeps the turn, so the follow-up S..S line counts too.
+        board = GameBoard(3)
+        board.place(0, 0, "S")
+        board.place(2, 0, "S")
+        board.place(0, 2, "S")
+        value, move = AlphaBetaSearch(3, "General", max_depth=2).search(board)
+        self.assertEqual(value, 2)
+        self.assertEqual(move[2], "O")
+
+    def test_time_budget_is_honoured(self):
+        search = AlphaBetaSearch(12, "General", max_depth=0)
+        start = time.perf_counter()
+        _, move = search.search(GameBoard(12), time_budget=0.05)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreaterEqual(search.completed_depth, 1)
+        self.assertIsNotNone(move)
+
+    def test_iterative_deepening_reaches_max_depth(self):
+        board = GameBoard(3)
+        board.place(0, 0, "S")
+        search = AlphaBetaSearch(3, "General", max_depth=3)
+        search.search(board)
+        self.assertEqual(search.completed_depth, 3)
+
+    def test_table_keeps_deepest_entry(self):
+        table = TranspositionTable(size_bits=2)
+        table.store(1, 5, 10, TranspositionTable.EXACT, None)
+        table.store(5, 1, 20, TranspositionTable.EXACT, None)
+        self.assertEqual(table.probe(1)[2], 10)
+        self.assertEqual(table.probe(5)[2], 20)
+        table.store(9, 1, 30, TranspositionTable.EXACT, None)
+        self.assertEqual(table.probe(1)[2], 10)
+        self.assertIsNone(table.probe(5))
+
+    def test_search_player_plays_headless(self):
+        game_logic = headless.create_game(5, "General", "Search", "Computer")
+        self.assertIsInstance(game_logic.player_dict[1], SearchPlayer)
+        game_logic.reset_state()
+        game_logic.gui.master.run()
+        self.assertEqual(game_logic.occupied_tile_count, 25)
+
+class TestMCTS(unittest.TestCase):
+    """
+        Class for testing the Monte Carlo Tree Search player.
+    """
+    def _snapshot(self, board, match_type, scores = (0, 0), player_to_move = 1):
+        bit_board = BitBoard.from_board(board)
+        return (board.board_dimension, bit_board.s_mask, bit_board.o_mask, scores, player_to_move, match_type)
+
+    def test_finds_winning_move_in_simple(self):
+        board = GameBoard(4)
+        board.place(0, 0, "S")
+        board.place(2, 0, "S")
+        mcts = MonteCarloTreeSearch(time_budget=None, max_rollouts=600, workers=1, seed=449)
+        bit, letter = mcts.search(self._snapshot(board, "Simple"))
+        self.assertEqual((BitBoard(4).coord(bit), letter), ((1, 0), "O"))
+        self.assertEqual(mcts.last_stats["rollouts"], 600)
+        self.assertGreater(mcts.last_stats["tree_size"], 1)
+
+    def test_seeded_search_is_reproducible(self):
+        snapshot = self._snapshot(GameBoard(5), "General")
+        first = MonteCarloTreeSearch(time_budget=None, max_rollouts=100, workers=1, seed=7).search(snapshot)
+        second = MonteCarloTreeSearch(time_budget=None, max_rollouts=100, workers=1, seed=7).search(snapshot)
+        self.assertEqual(first, second)
+
+    def test_stop_event_ends_search(self):
+        snapshot = self._snapshot(GameBoard(6), "General")
+        for workers in (1, 2):
+            mcts = MonteCarloTreeSearch(time_budget=30, workers=workers, seed=7)
+            mcts.stop_event = threading.Event()
+            threading.Timer(0.2, mcts.stop_event.set).start()
+            start = time.perf_counter()
+            bit, letter = mcts.search(snapshot)
+            mcts.close()
+            self.assertLess(time.perf_counter() - start, 5)
+            self.assertIn(letter, ("S", "O"))
+            self.assertEqual(mcts.last_stats["workers"], workers)
+
+    def test_playout_keeps_turn_after_scoring(self):
+        board = GameBoard(3)
+        board.place(0, 0, "S")
+        board.place(2, 0, "S")
+        playout = Playout.from_snapshot(self._snapshot(board, "General"))
+        playout.play(BitBoard(3).bit_index(1, 0), "O")
+        self.assertEqual((playout.scores, playout.player_to_move), ([1, 0], 1))
+        playout.play(BitBoard(3).bit_index(1, 1), "O")
+        self.assertEqual(playout.player_to_move, 2)
+
+    def test_mcts_player_plays_headless(self):
+        game_logic = headless.create_game(4, "General", "MCTS", "Computer")
+        self.assertIsInstance(game_logic.player_dict[1], MCTSPlayer)
+        game_logic.player_dict[1].mcts.time_budget = None
+        game_logic.player_dict[1].mcts.max_rollouts = 20
+        game_logic.player_dict[1].mcts.workers = 1
+        game_logic.reset_state()
+        game_logic.gui.master.run()
+        self.assertEqual(game_logic.occupied_tile_count, 16)
+        self.assertEqual(game_logic.player_dict[1].last_stats["rollouts"], 20)
+
+    def test_replaced_player_closes_its_pool(self):
+        game_logic = headless.create_game(3, "General", "MCTS", "Human")
+        replaced = game_logic.player_dict[1]
+        replaced.mcts.close = mock.Mock()
+        game_logic.create_players()
+        replaced.mcts.close.assert_called_once_with()
+
+    def test_players_are_closed_at_game_over(self):
+        game_logic = headless.create_game(3, "General", "Human", "Human")
+        for player in game_logic.player_dict.values():
+            player.close = mock.Mock()
+        game_logic.reset_state()
+        game_logic.current_letter_variable.set("O")
+        for y in range(3):
+            for x in range(3):
+                game_logic.on_tile_click(game_logic.gameboard_tile_instance_dict[y][x])
+        self.assertTrue(game_logic.gui.master.destroyed)
+        for player in game_logic.player_dict.values():
+            player.close.assert_called_once_with()
+
+class TestWorkerThinking(unittest.TestCase):
+    """
+        Class for testing computer moves worked out off the Tk loop.
+    """
+    def _game_with_polled_worker(self):
+        # A headless game whose GUI uses the real threaded run_in_worker from GUILogic.
+        game_logic = headless.create_game(5, "General", "Human", "Search")
+        gui = game_logic.gui
+        gui.run_in_worker = lambda task, on_done: GUILogic.run_in_worker(gui, task, on_done)
+        return game_logic
+
+    def _pump(self, game_logic, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            if not game_logic.gui.master.run_once():
+                time.sleep(0.005)
+
+    def test_move_is_posted_back(self):
+        game_logic = self._game_with_polled_worker()
+        game_logic.reset_state()
+        game_logic.on_tile_click(game_logic.gameboard_tile_instance_dict[0][0])
+        game_logic.gui.master.run_once()
+        self.assertEqual(game_logic.thinking_variable.get(), "thinking…")
+        self._pump(game_logic, lambda: game_logic.occupied_tile_count == 2)
+        self.assertEqual(game_logic.occupied_tile_count, 2)
+        self.assertEqual(game_logic.thinking_variable.get(), "")
+
+    def test_reset_cancels_pending_move(self):
+        game_logic = self._game_with_polled_worker()
+        game_logic.reset_state()
+        game_logic.on_tile_click(game_logic.gameboard_tile_instance_dict[0][0])
+        game_logic.gui.master.run_once()
+        cancel_event = game_logic.gui.cancel_event
+        game_logic.gui.cancel_pending_work()
+        self.assertTrue(cancel_event.is_set())
+        self._pump(game_logic, lambda: not game_logic.gui.master.pending)
+        self.assertEqual(game_logic.occupied_tile_count, 1)
+
+@unittest.skipIf(numpy_scoring is None, "numpy is not installed")
+class TestNumpyScoring(unittest.TestCase):
+    """
+        Class for testing the vectorized scoring path against move_analysis.
+    """
+    def test_matches_move_analysis(self):
+        rng = random.Random(449)
+        for board_dimension in (3, 4, 8, 15):
+            game_logic = SOSGameLogic(backend=headless)
+            game_logic.reset_board(board_dimension)
+            for y in range(board_dimension):
+                for x in range(board_dimension):
+                    letter = rng.choice(["", "", "S", "O"])
+                    if letter != "":
+                        game_logic.game_board.place(x, y, letter)
+
+            s_gain, o_gain = numpy_scoring.score_all_moves(numpy_scoring.board_to_array(game_logic.game_board))
+            for y in range(board_dimension):
+                for x in range(board_dimension):
+                    if not game_logic.game_board.is_empty(x, y):
+                        self.assertEqual((s_gain[y, x], o_gain[y, x]), (0, 0))
+                        continue
+                    tile = Tile(x_coord=x, y_coord=y)
+                    for letter, gain in (("S", s_gain), ("O", o_gain)):
+                        _, points = game_logic.move_analysis(tile, True, game_logic.game_board, letter)
+                        self.assertEqual(gain[y, x], points, f"{letter} at {(x, y)} on {board_dimension}x{board_dimension}")
+
+    def test_vectorized_window_counts(self):
+        rng = random.Random(449)
+        for board in (GameBoard(20), BitBoard(17)):
+            cells = [(x, y) for y in range(board.board_dimension) for x in range(board.board_dimension)]
+            for x, y in rng.sample(cells, len(cells) // 2):
+                board.place(x, y, rng.choice("SO"))
+            placed = WindowCounters(board.triple_index)
+            for y, row in enumerate(board.cells):
+                for x, letter in enumerate(row):
+                    if letter != "":
+                        placed.place(placed.index.cell(x, y), letter)
+            counted = WindowCounters.from_board(board) # wide enough for numpy_scoring.count_windows
+            for field in ("letters", "s_count", "o_count", "empty_count", "threats", "gains"):
+                self.assertEqual(getattr(counted, field), getattr(placed, field), field)
+            # The counters keep updating one placement at a time after being counted at once.
+            cell = counted.letters.index("")
+            counted.place(cell, "O")
+            placed.place(cell, "O")
+            self.assertEqual((counted.threats, counted.gains), (placed.threats, placed.gains))
+
+    def test_batch_scores(self):
+        rng = random.Random(449)
+        states = []
+        for _ in range(50):
+            state = GameState(GameBoard(6), "General", current_player=rng.choice((1, 2)))
+            for _ in range(rng.randrange(37)):
+                state.make_move(*rng.choice(state.legal_moves()))
+            states.append(state)
+        positions, side_to_move = numpy_scoring.snapshots_to_array(state.snapshot() for state in states)
+        result = numpy_scoring.score_positions(positions, side_to_move, chunk_size=7)
+        self.assertEqual(result.s_gain.shape, (50, 6, 6))
+        for index, state in enumerate(states):
+            s_gain, o_gain = numpy_scoring.score_all_moves(positions[index])
+            self.assertTrue((result.s_gain[index] == s_gain).all() and (result.o_gain[index] == o_gain).all())
+            if state.board.empty_count() == 0:
+                self.assertEqual((result.best_cell[index], result.best_points[index]), (-1, 0))
+                continue
+            x, y = result.best_cell[index] % 6, result.best_cell[index] // 6
+            letter = "S" if result.best_letter[index] == numpy_scoring.S else "O"
+            self.assertTrue(state.board.is_empty(x, y))
+            self.assertEqual(state.points_for(x, y, letter), result.best_points[index])
+            self.assertEqual(result.best_points[index], max(max(s_gain.max(), o_gain.max()), 0))
+            expected_next = state.current_player if result.best_points[index] > 0 else 3 - state.current_player
+            self.assertEqual(result.next_player[index], expected_next)
+        whole = numpy_scoring.score_positions(positions, side_to_move, chunk_size=4096)
+        for chunked, unchunked in zip(result, whole):
+            self.assertTrue((chunked == unchunked).all())
+        with self.assertRaises(ValueError):
+            numpy_scoring.score_positions(positions[0], 1)
+
+class TestBoardCanvas(unittest.TestCase):
+    """
+        Class for testing the single-canvas board renderer. Only the tests drawing on a real
+        canvas create a Tk root, and they are skipped when none can be created (no display).
+    """
+    def create_root(self) -> tk.Tk:
+        """
+            Creates a hidden Tk root, destroyed when the test ends. Skips the test without a display.
+        """
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as error:
+            self.skipTest(f"no Tk root: {error}")
+        self.root.withdraw()
+        self.addCleanup(self.root.destroy)
+        return self.root
+
+    def test_dimension_limit(self):
+        game_logic = headless.create_game(8)
+        game_logic.game_board_dimension_variable.set(100)
+        self.assertFalse(game_logic.dimension_validate())
+        game_logic.config_use_canvas.set(True)
+        self.assertTrue(game_logic.dimension_validate())
+        game_logic.game_board_dimension_variable.set(101)
+        self.assertFalse(game_logic.dimension_validate())
+
+    def test_hit_testing(self):
+        self.create_root()
+        clicks = []
+        board_canvas = BoardCanvas(self.root, 100, 500, "Times New Roman", lambda x, y: clicks.append((x, y)))
+        self.assertEqual(board_canvas.cell_at(0, 0).coord, (0, 0))
+        self.assertEqual(board_canvas.cell_at(12, 499).coord, (2, 99))
+        self.assertIsNone(board_canvas.cell_at(500, 3))
+        board_canvas.cells[(3, 4)].config(text="S", state=tk.DISABLED)
+        self.assertEqual(board_canvas.itemcget(board_canvas.cells[(3, 4)].text_id, "text"), "S")
+
+    def test_game_on_canvas(self):
+        self.create_root()
         test_ma = main.MainApplication(self.root)
-        test_ma.game_logic.config_blue_player_type.set("Computer")
-        test_ma.game_logic.config_red_player_type.set("Computer")
-        
+        test_ma.game_logic.config_use_canvas.set(True)
+        test_ma.game_logic.config_match_type.set("General")
+        test_ma.game_logic.game_board_dimension_variable.set(30)
+        self.assertTrue(test_ma.game_logic.dimension_validate())
         test_ma.game_logic.create_players()
-        
-        self.assertIsInstance(test_ma.game_logic.player_dict[1], ComputerPlayer)
-        self.assertIsInstance(test_ma.game_logic.player_dict[2], ComputerPlayer)
-        self.assertNotEqual(test_ma.game_logic.player_dict[1], test_ma.game_logic.player_dict[2])
+        test_ma.gui.master = test_ma.game_board(30)
+        test_ma.game_logic.reset_state()
+
+        tiles = test_ma.game_logic.gameboard_tile_instance_dict
+        for x, letter in ((0, "S"), (1, "O"), (2, "S")):
+            test_ma.game_logic.current_letter_variable.set(letter)
+            test_ma.game_logic.on_tile_click(tiles[0][x])
+        board_canvas = test_ma.gui.board_canvas
+        self.assertEqual(test_ma.game_logic.player_dict[1].score, 1)
+        self.assertEqual(test_ma.game_logic.player_dict[2].score, 0)
+        self.assertEqual(len(board_canvas.sos_line_ids), 1)
+        self.assertEqual(tiles[0][1].button_instance.cget("bg"), test_ma.gui.color_dict["blue"])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+    Bitboard implementation of the SOS board model. A position is two Python integers, one bit
+    per cell for S and one for O, so copying and hashing a position is cheap.
+"""
+
+from triple_index import S_DIRECTIONS, O_DIRECTIONS, get_triple_index
+
+class BitBoard:
+    """
+        Drop-in alternative to GameBoard that stores the letters as bitmasks.
+        \nEach row is board_dimension + 2 bits wide and two empty rows pad the top and bottom, so
+        every neighbour up to two steps away maps to a bit that is zero when it is off the board.
+        Shifts therefore never wrap into a real cell and no edge checks are needed.
+    """
+    def __init__(self, board_dimension:int = 8):
+        self.board_dimension = board_dimension
+        self.s_mask = 0
+        self.o_mask = 0
+        self.owner_masks = {1: 0, 2: 0}
+        self.reset(board_dimension)
+
+    def reset(self, board_dimension:int = None) -> None:
+        """
+            Empties the board, optionally resizing it to board_dimension.
+        """
+        if board_dimension != None:
+            self.board_dimension = board_dimension
+        self.stride = self.board_dimension + 2
+        self.s_mask = 0
+        self.o_mask = 0
+        self.owner_masks = {1: 0, 2: 0}
+        self.board_mask = 0
+        for y in range(self.board_dimension):
+            for x in range(self.board_dimension):
+                self.board_mask |= 1 << self.bit_index(x, y)
+        stride = self.stride
+        self.s_offsets = tuple(dy*stride + dx for dx, dy in S_DIRECTIONS)
+        self.o_offsets = tuple(dy*stride + dx for dx, dy in O_DIRECTIONS)
+        self.triple_index = get_triple_index(self.board_dimension)
+
+    def bit_index(self, x:int, y:int) -> int:
+        """
+            Returns the bit that holds cell (x, y).
+        """
+        return (y + 2) * self.stride + x + 2
+
+    def coord(self, bit:int) -> tuple[int,int]:
+        """
+            Returns the (x, y) cell held by bit.
+        """
+        row, column = divmod(bit, self.stride)
+        return column - 2, row - 2
+
+    @classmethod
+    def from_board(cls, board) -> "BitBoard":
+        """
+            Builds a BitBoard holding the same letters and owners as any other board model.
+        """
+        new_board = cls(board.board_dimension)
+        for y in range(board.board_dimension):
+            for x in range(board.board_dimension):
+                letter = board.get_letter(x, y)
+                if letter != "":
+                    new_board.place(x, y, letter, board.get_owner(x, y))
+        return new_board
+
+    def copy(self) -> "BitBoard":
+        """
+            Returns an independent copy of this position.
+        """
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.__dict__.update(self.__dict__)
+        new_board.owner_masks = dict(self.owner_masks)
+        return new_board
+
+    def key(self) -> tuple[int,int,int]:
+        """
+            Returns a hashable key identifying the letters on the board (ownership excluded).
+        """
+        return self.board_dimension, self.s_mask, self.o_mask
+
+    @property
+    def cells(self) -> list[list[str]]:
+        """
+            The board as a cells[y][x] grid of "", "S" and "O", like GameBoard.cells.
+        """
+        return [[self.get_letter(x, y) for x in range(self.board_dimension)] for y in range(self.board_dimension)]
+
+    def in_bounds(self, x:int, y:int) -> bool:
+        """
+            Returns whether (x, y) is on the board.
+        """
+        return 0 <= x < self.board_dimension and 0 <= y < self.board_dimension
+
+    def get_letter(self, x:int, y:int) -> str:
+        """
+            Returns the letter in the cell, or "" if it is empty.
+        """
+        bit = 1 << self.bit_index(x, y)
+        if self.s_mask & bit: return "S"
+        if self.o_mask & bit: return "O"
+        return ""
+
+    def get_owner(self, x:int, y:int):
+        """
+            Returns the owner of the cell (the player number that placed the letter), or None.
+        """
+        bit = 1 << self.bit_index(x, y)
+        for owner, mask in self.owner_masks.items():
+            if mask & bit: return owner
+        return None
+
+    def is_empty(self, x:int, y:int) -> bool:
+        """
+            Returns whether nobody has placed a letter in the cell yet.
+        """
+        return not ((self.s_mask | self.o_mask) >> self.bit_index(x, y)) & 1
+
+    def place(self, x:int, y:int, letter:str, owner = None) -> None:
+        """
+            Places letter ("S" or "O") in the cell and records its owner.
+        """
+        bit = 1 << self.bit_index(x, y)
+        if letter == "S":
+            self.s_mask |= bit
+        else:
+            self.o_mask |= bit
+        if owner in self.owner_masks:
+            self.owner_masks[owner] |= bit
+
+    def remove(self, x:int, y:int) -> None:
+        """
+            Empties the cell again, forgetting its letter and owner.
+        """
+        self.clear_bit(self.bit_index(x, y))
+
+    def place_bit(self, bit:int, letter:str) -> None:
+        """
+            Places letter at a bit index without recording an owner. Used by search code.
+        """
+        if letter == "S":
+            self.s_mask |= 1 << bit
+        else:
+            self.o_mask |= 1 << bit
+
+    def clear_bit(self, bit:int) -> None:
+        """
+            Empties the cell at a bit index.
+        """
+        keep = ~(1 << bit)
+        self.s_mask &= keep
+        self.o_mask &= keep
+        for owner in self.owner_masks:
+            self.owner_masks[owner] &= keep
+
+    def find_sos(self, x:int, y:int, letter:str) -> list[tuple]:
+        """
+            Finds every SOS that placing letter at (x, y) completes, in the same order and
+            format as GameBoard.find_sos: ((x1, y1), (x2, y2), (x, y)).
+        """
+        index = self.bit_index(x, y)
+        s_mask, o_mask = self.s_mask, self.o_mask
+        found = []
+        if letter == "S":
+            for (dx, dy), offset in zip(S_DIRECTIONS, self.s_offsets):
+                if (o_mask >> (index + offset)) & (s_mask >> (index + 2*offset)) & 1:
+                    found.append(((x+dx, y+dy), (x+2*dx, y+2*dy), (x, y)))
+        elif letter == "O":
+            for (dx, dy), offset in zip(O_DIRECTIONS, self.o_offsets):
+                if (s_mask >> (index - offset)) & (s_mask >> (index + offset)) & 1:
+                    found.append(((x-dx, y-dy), (x+dx, y+dy), (x, y)))
+        return found
+
+    def count_sos(self, x:int, y:int, letter:str) -> int:
+        """
+            Returns how many SOS placing letter at (x, y) would complete.
+        """
+        return self.count_sos_at(self.bit_index(x, y), letter)
+
+    def count_sos_at(self, index:int, letter:str) -> int:
+        """
+            Same as count_sos, but for a bit index.
+        """
+        s_mask, o_mask = self.s_mask, self.o_mask
+        points = 0
+        if letter == "S":
+            for offset in self.s_offsets:
+                points += (o_mask >> (index + offset)) & (s_mask >> (index + 2*offset)) & 1
+        elif letter == "O":
+            for offset in self.o_offsets:
+                points += (s_mask >> (index - offset)) & (s_mask >> (index + offset)) & 1
+        return points
+
+    def empty_mask(self) -> int:
+        """
+            Returns the bitmask of empty cells, ~(S | O) limited to the board.
+        """
+        return self.board_mask & ~(self.s_mask | self.o_mask)
+
+    def empty_cells(self) -> list[tuple[int,int]]:
+        """
+            Returns the coordinates of every empty cell, row by row.
+        """
+        return [self.coord(bit) for bit in iterate_bits(self.empty_mask())]
+
+    def empty_count(self) -> int:
+        """
+            Returns how many cells are still empty.
+        """
+        return self.empty_mask().bit_count()
+
+    def scoring_masks(self, letter:str) -> list[int]:
+        """
+            Returns one bitmask per direction of the empty cells where placing letter completes an
+            SOS in that direction. A cell's points are the number of masks it appears in.
+        """
+        empty = self.empty_mask()
+        s_mask, o_mask = self.s_mask, self.o_mask
+        if letter == "S":
+            return [empty & _shift(o_mask, offset) & _shift(s_mask, 2*offset) for offset in self.s_offsets]
+        return [empty & _shift(s_mask, -offset) & _shift(s_mask, offset) for offset in self.o_offsets]
+
+def _shift(mask:int, offset:int) -> int:
+    # Moves every bit down by offset, so bit i of the result is bit i + offset of mask.
+    return mask >> offset if offset >= 0 else mask << -offset
+
+def iterate_bits(mask:int):
+    """
+        Yields the index of every set bit in mask, lowest first.
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
@@ -0,0 +1,110 @@
+"""
+    Canvas renderer for the SOS board. The whole board is drawn on a single tk.Canvas instead of
+    one tk.Button per tile, so boards much larger than the button grid allows stay quick to build.
+"""
+
+import tkinter as tk
+
+class CanvasCell:
+    """
+        Button-like handle for one cell of a BoardCanvas. It understands the config() and cget()
+        options GUILogic.config_button uses (text, state, bg, disabledforeground), so a Tile can
+        hold one as its button_instance.
+    """
+    def __init__(self, board_canvas:"BoardCanvas", rectangle_id:int, x:int, y:int):
+        self.board_canvas = board_canvas
+        self.rectangle_id = rectangle_id
+        self.text_id = None
+        self.coord = (x, y)
+        self.options = {"text": "", "state": tk.NORMAL, "bg": "white", "disabledforeground": "gray40"}
+
+    def config(self, **options) -> None:
+        """
+            Updates the cell's options and redraws its canvas items.
+        """
+        self.options.update(options)
+        self.board_canvas.redraw_cell(self)
+
+    configure = config
+
+    def cget(self, option:str):
+        """
+            Returns the current value of an option.
+        """
+        return self.options[option]
+
+class BoardCanvas(tk.Canvas):
+    """
+        Draws a board_dimension x board_dimension board on one canvas: a rectangle item per cell,
+        a text item per placed letter (created on first use) and a line item per SOS.
+        \nClicks are hit-tested from the pointer coordinates, and on_click(x, y) is called for
+        cells that are not disabled.
+    """
+    def __init__(self, master, board_dimension:int, side_length:int, font_family:str, on_click):
+        super().__init__(master, width=side_length, height=side_length, bg="white", highlightthickness=0)
+        self.board_dimension = board_dimension
+        self.cell_size = side_length / board_dimension
+        # A negative font size is in pixels, so letters scale with the cells.
+        self.font = (font_family, -max(1, int(self.cell_size * 0.7)))
+        self.on_click = on_click
+        self.cells = {}
+        self.sos_line_ids = []
+        for y in range(board_dimension):
+            for x in range(board_dimension):
+                left, top = x * self.cell_size, y * self.cell_size
+                rectangle_id = self.create_rectangle(left, top, left + self.cell_size, top + self.cell_size,
+                                                     fill="white", outline="gray70")
+                self.cells[(x, y)] = CanvasCell(self, rectangle_id, x, y)
+        self.bind("<Button-1>", self.__on_click)
+
+    def cell_at(self, pixel_x:float, pixel_y:float) -> CanvasCell:
+        """
+            Returns the cell under a canvas coordinate, or None if it is outside the board.
+        """
+        x, y = int(pixel_x // self.cell_size), int(pixel_y // self.cell_size)
+        return self.cells.get((x, y))
+
+    def cell_center(self, x:int, y:int) -> tuple[float,float]:
+        """
+            Returns the canvas coordinate of the middle of cell (x, y).
+        """
+        return (x + 0.5) * self.cell_size, (y + 0.5) * self.cell_size
+
+    def __on_click(self, event) -> None:
+        cell = self.cell_at(event.x, event.y)
+        if cell == None or cell.options["state"] == tk.DISABLED:
+            return
+        self.on_click(*cell.coord)
+
+    def redraw_cell(self, cell:CanvasCell) -> None:
+        """
+            Brings the canvas items of a cell up to date with its options.
+        """
+        options = cell.options
+        self.itemconfigure(cell.rectangle_id, fill=options["bg"])
+        if options["text"] == "" and cell.text_id == None:
+            return
+        fill = options["disabledforeground"] if options["state"] == tk.DISABLED else "black"
+        if cell.text_id == None:
+            # Letters only appear on empty cells, which no SOS line crosses, so stacking is fine.
+            cell.text_id = self.create_text(*self.cell_center(*cell.coord), text=options["text"],
+                                            font=self.font, fill=fill)
+        else:
+            self.itemconfigure(cell.text_id, text=options["text"], fill=fill)
+
+    def draw_sos_line(self, coords, color:str) -> None:
+        """
+            Draws a line through the three cells of an SOS. coords are the three (x, y) cells in
+            any order; being in a line, the lowest and highest are its ends.
+        """
+        start, end = min(coords), max(coords)
+        line_id = self.create_line(*self.cell_center(*start), *self.cell_center(*end),
+                                   fill=color, width=max(1, int(self.cell_size / 8)), capstyle=tk.ROUND)
+        self.sos_line_ids.append(line_id)
+
+    def remove_last_sos_lines(self, count:int) -> None:
+        """
+            Deletes the count most recently drawn SOS lines.
+        """
+        for _ in range(min(count, len(self.sos_line_ids))):
+            self.delete(self.sos_line_ids.pop())
@@ -0,0 +1,222 @@
+"""
+    SQLite archive of finished SOS games. Each game is one row with its outcome in indexed
+    columns and its moves as zlib-compressed move log records, so millions of games stay small
+    and can be filtered without decoding any moves.
+    \nUsage: python game_archive.py games.db import games.soslog
+    \n       python game_archive.py games.db stats --size 8 --match-type General
+"""
+
+import argparse
+import sqlite3
+import time
+import zlib
+from move_log import LoggedGame, encode_moves, decode_moves, read_games
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id                  INTEGER PRIMARY KEY,
+    board_dimension     INTEGER NOT NULL,
+    match_type          TEXT    NOT NULL,
+    blue_player_type    TEXT    NOT NULL,
+    red_player_type     TEXT    NOT NULL,
+    winner              INTEGER NOT NULL,
+    blue_score          INTEGER NOT NULL,
+    red_score           INTEGER NOT NULL,
+    length              INTEGER NOT NULL,
+    recorded_at         REAL    NOT NULL,
+    moves               BLOB    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_setup   ON games (board_dimension, match_type, blue_player_type, red_player_type);
+CREATE INDEX IF NOT EXISTS games_by_players ON games (blue_player_type, red_player_type);
+CREATE INDEX IF NOT EXISTS games_by_winner  ON games (winner);
+CREATE INDEX IF NOT EXISTS games_by_score   ON games (blue_score, red_score);
+CREATE INDEX IF NOT EXISTS games_by_length  ON games (length);
+"""
+
+# Query keyword -> SQL condition. Conditions are only ever built from this table.
+FILTERS = {
+    "board_dimension":  "board_dimension = ?",
+    "match_type":       "match_type = ?",
+    "blue_player_type": "blue_player_type = ?",
+    "red_player_type":  "red_player_type = ?",
+    "winner":           "winner = ?",
+    "blue_score":       "blue_score = ?",
+    "red_score":        "red_score = ?",
+    "min_length":       "length >= ?",
+    "max_length":       "length <= ?",
+}
+
+class ArchivedGame(LoggedGame):
+    """
+        A LoggedGame read back from the archive, with its row id and stored outcome. The moves
+        are only decompressed when first used.
+    """
+    def __init__(self, game_id:int, board_dimension:int, match_type:str, player_types:tuple[str,str],
+                 winner:int, scores:tuple[int,int], length:int, compressed_moves:bytes = None):
+        super().__init__(board_dimension, match_type, player_types, None)
+        self.id = game_id
+        self.stored_winner = winner
+        self.stored_scores = scores
+        self.length = length
+        self.compressed_moves = compressed_moves
+
+    @property
+    def moves(self) -> list[tuple]:
+        if self._moves == None:
+            if self.compressed_moves == None:
+                raise ValueError("the game was queried without its moves")
+            self._moves = decode_moves(self.board_dimension, zlib.decompress(self.compressed_moves))
+        return self._moves
+
+    @moves.setter
+    def moves(self, moves:list[tuple]) -> None:
+        self._moves = moves
+
+class GameArchive:
+    """
+        Opens (creating if needed) an archive file. Use as a context manager or call close().
+    """
+    def __init__(self, path:str):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self) -> None:
+        """
+            Commits and closes the archive.
+        """
+        self.connection.commit()
+        self.connection.close()
+
+    @staticmethod
+    def __row(game:LoggedGame, recorded_at:float) -> tuple:
+        blue_score, red_score = game.scores()
+        return (game.board_dimension, game.match_type, *game.player_types, game.winner(), blue_score, red_score,
+                len(game.moves), recorded_at, zlib.compress(encode_moves(game.board_dimension, game.moves)))
+
+    def add_game(self, game:LoggedGame) -> int:
+        """
+            Stores one finished game and commits. Returns its id.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO games (board_dimension, match_type, blue_player_type, red_player_type, winner,"
+                " blue_score, red_score, length, recorded_at, moves) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self.__row(game, time.time()))
+        return cursor.lastrowid
+
+    def add_games(self, games, batch_size:int = 5000) -> int:
+        """
+            Stores any iterable of LoggedGames (e.g. read_games() of a self-play log), one
+            transaction per batch_size games, so the input is never held in memory at once.
+            Returns how many games were added.
+        """
+        added = 0
+        batch = []
+        recorded_at = time.time()
+        for game in games:
+            batch.append(self.__row(game, recorded_at))
+            if len(batch) >= batch_size:
+                added += self.__insert_batch(batch)
+                batch = []
+        if batch:
+            added += self.__insert_batch(batch)
+        return added
+
+    def __insert_batch(self, rows:list[tuple]) -> int:
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO games (board_dimension, match_type, blue_player_type, red_player_type, winner,"
+                " blue_score, red_score, length, recorded_at, moves) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    @staticmethod
+    def __where(filters:dict) -> tuple[str, list]:
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise TypeError(f"unknown archive filter(s): {', '.join(sorted(unknown))}")
+        conditions = [FILTERS[name] for name, value in filters.items() if value != None]
+        values = [value for value in filters.values() if value != None]
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), values
+
+    def query(self, with_moves:bool = True, limit:int = None, batch_size:int = 1000, **filters):
+        """
+            Yields the matching games as ArchivedGames, oldest first, fetching batch_size rows at
+            a time. filters are the keys of FILTERS, e.g. board_dimension=8, winner=1,
+            min_length=20; None means no filter. Without with_moves the compressed moves are not
+            even read.
+        """
+        where, values = self.__where(filters)
+        columns = "id, board_dimension, match_type, blue_player_type, red_player_type, winner, blue_score," \
+                  " red_score, length" + (", moves" if with_moves else "")
+        sql = f"SELECT {columns} FROM games{where} ORDER BY id"
+        if limit != None:
+            sql += " LIMIT ?"
+            values.append(limit)
+        cursor = self.connection.execute(sql, values)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield ArchivedGame(row[0], row[1], row[2], (row[3], row[4]), row[5], (row[6], row[7]), row[8],
+                                       row[9] if with_moves else None)
+        finally:
+            cursor.close()
+
+    def count(self, **filters) -> int:
+        """
+            Returns how many games match the filters (see query).
+        """
+        where, values = self.__where(filters)
+        return self.connection.execute(f"SELECT COUNT(*) FROM games{where}", values).fetchone()[0]
+
+    def outcome_stats(self, **filters) -> dict:
+        """
+            Aggregates the matching games in SQL:
+            { "games", "blue_wins", "red_wins", "ties", "mean_blue_score", "mean_red_score", "mean_length" }.
+        """
+        where, values = self.__where(filters)
+        row = self.connection.execute(
+            "SELECT COUNT(*), SUM(winner = 1), SUM(winner = 2), SUM(winner = 0),"
+            f" AVG(blue_score), AVG(red_score), AVG(length) FROM games{where}", values).fetchone()
+        keys = ("games", "blue_wins", "red_wins", "ties", "mean_blue_score", "mean_red_score", "mean_length")
+        return {key: (value if value != None else 0) for key, value in zip(keys, row)}
+
+def main(argv:list[str] = None) -> None:
+    """
+        Imports move logs into an archive, or prints outcome statistics.
+    """
+    parser = argparse.ArgumentParser(description="SOS game archive.")
+    parser.add_argument("archive", help="archive file (created if missing)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="add every game of move logs")
+    import_parser.add_argument("logs", nargs="+")
+    stats_parser = commands.add_parser("stats", help="print outcome statistics")
+    stats_parser.add_argument("--size", type=int, default=None)
+    stats_parser.add_argument("--match-type", choices=["Simple", "General"], default=None)
+    stats_parser.add_argument("--blue", default=None, help="blue player type")
+    stats_parser.add_argument("--red", default=None, help="red player type")
+    args = parser.parse_args(argv)
+
+    with GameArchive(args.archive) as archive:
+        if args.command == "import":
+            for log_path in args.logs:
+                print(f"{log_path}: {archive.add_games(read_games(log_path))} games added")
+            return
+        stats = archive.outcome_stats(board_dimension=args.size, match_type=args.match_type,
+                                      blue_player_type=args.blue, red_player_type=args.red)
+        for key, value in stats.items():
+            print(f"{key:<16}{value:.2f}" if isinstance(value, float) else f"{key:<16}{value}")
+
+if __name__ == "__main__":
+    main()
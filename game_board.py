@@ -0,0 +1,363 @@
+"""
+    Contains the pure-Python board model for the SOS game. Nothing in here touches tkinter,
+    so the rules can be evaluated without a display.
+"""
+
+import bisect
+from typing import NamedTuple
+from triple_index import get_triple_index, WindowCounters
+
+class GameBoard:
+    """
+        Owns the contents and ownership of every cell on the board. The GUI only mirrors it.
+        \nCells are addressed as (x, y), x being the column and y being the row. empty holds the
+        triple index numbers (y * board_dimension + x) of the empty cells in ascending order, kept
+        up to date by place and remove, so move generation never walks or sorts the whole board.
+    """
+    def __init__(self, board_dimension:int = 8):
+        self.board_dimension = board_dimension
+        self.cells = []
+        self.owners = []
+        self.empty = []
+        self.reset(board_dimension)
+
+    def reset(self, board_dimension:int = None) -> None:
+        """
+            Empties the board, optionally resizing it to board_dimension.
+        """
+        if board_dimension != None:
+            self.board_dimension = board_dimension
+        self.cells = [[""] * self.board_dimension for _ in range(self.board_dimension)]
+        self.owners = [[None] * self.board_dimension for _ in range(self.board_dimension)]
+        self.triple_index = get_triple_index(self.board_dimension)
+        self.empty = list(range(self.board_dimension * self.board_dimension))
+
+    def copy(self) -> "GameBoard":
+        """
+            Returns an independent copy of this board.
+        """
+        new_board = GameBoard.__new__(GameBoard)
+        new_board.board_dimension = self.board_dimension
+        new_board.cells = [row[:] for row in self.cells]
+        new_board.owners = [row[:] for row in self.owners]
+        new_board.triple_index = self.triple_index
+        new_board.empty = self.empty[:]
+        return new_board
+
+    def in_bounds(self, x:int, y:int) -> bool:
+        """
+            Returns whether (x, y) is on the board.
+        """
+        return 0 <= x < self.board_dimension and 0 <= y < self.board_dimension
+
+    def get_letter(self, x:int, y:int) -> str:
+        """
+            Returns the letter in the cell, or "" if it is empty.
+        """
+        return self.cells[y][x]
+
+    def get_owner(self, x:int, y:int):
+        """
+            Returns the owner of the cell (the player number that placed the letter), or None.
+        """
+        return self.owners[y][x]
+
+    def is_empty(self, x:int, y:int) -> bool:
+        """
+            Returns whether nobody has placed a letter in the cell yet.
+        """
+        return self.cells[y][x] == ""
+
+    def place(self, x:int, y:int, letter:str, owner = None) -> None:
+        """
+            Places letter ("S" or "O") in the cell and records its owner.
+        """
+        self.cells[y][x] = letter
+        self.owners[y][x] = owner
+        cell = y * self.board_dimension + x
+        position = bisect.bisect_left(self.empty, cell)
+        if position < len(self.empty) and self.empty[position] == cell:
+            del self.empty[position]
+
+    def remove(self, x:int, y:int) -> None:
+        """
+            Empties the cell again, forgetting its letter and owner.
+        """
+        self.cells[y][x] = ""
+        self.owners[y][x] = None
+        cell = y * self.board_dimension + x
+        position = bisect.bisect_left(self.empty, cell)
+        if position == len(self.empty) or self.empty[position] != cell:
+            self.empty.insert(position, cell)
+
+    def find_sos(self, x:int, y:int, letter:str) -> list[tuple]:
+        """
+            Finds every SOS that placing letter at (x, y) completes. The cell itself is not read,
+            so this works both before and after the letter is placed.
+            \nReturns a list of coordinate triples: ((x1, y1), (x2, y2), (x, y)).
+        """
+        cells = self.cells
+        index = self.triple_index
+        coords = index.coords
+        found = []
+        if letter == "S":
+            for _, middle, far in index.s_lines[index.cell(x, y)]:
+                (x1, y1), (x2, y2) = coords[middle], coords[far]
+                if cells[y1][x1] == "O" and cells[y2][x2] == "S":
+                    found.append(((x1, y1), (x2, y2), (x, y)))
+        elif letter == "O":
+            for _, first, last in index.o_lines[index.cell(x, y)]:
+                (x1, y1), (x2, y2) = coords[first], coords[last]
+                if cells[y1][x1] == "S" and cells[y2][x2] == "S":
+                    found.append(((x1, y1), (x2, y2), (x, y)))
+        return found
+
+    def count_sos(self, x:int, y:int, letter:str) -> int:
+        """
+            Returns how many SOS placing letter at (x, y) would complete.
+        """
+        return len(self.find_sos(x, y, letter))
+
+    def empty_cells(self) -> list[tuple[int,int]]:
+        """
+            Returns the coordinates of every empty cell, row by row.
+        """
+        coords = self.triple_index.coords
+        return [coords[cell] for cell in self.empty]
+
+    def empty_count(self) -> int:
+        """
+            Returns how many cells are still empty.
+        """
+        return len(self.empty)
+
+class CandidateScoreCache:
+    """
+        Keeps the points possible for S and for O in every empty cell of a GameBoard, bucketed
+        the same way SOSGameLogic._return_possible_score_per_tile reports them:
+        { letter: { points possible: [ cell ] } }.
+        \nThe points come from a WindowCounters kept alongside the board. After a letter is placed,
+        only the cells sharing a window of the board's TripleIndex with it are looked up again.
+        cell_lookup maps (x, y) to the object stored in the buckets, e.g. a Tile.
+    """
+    MAX_POINTS = 8
+
+    def __init__(self, board:GameBoard, cell_lookup = None):
+        self.board = board
+        self.cell_lookup = cell_lookup if cell_lookup != None else (lambda x, y: (x, y))
+        self.buckets = {}
+        self.points = {}
+        self.__items = {}
+        self.__index = {}
+        self.counters = None
+        self.rebuild()
+
+    def __empty_buckets(self) -> dict[str,dict[int,list]]:
+        return {letter: {points: [] for points in range(self.MAX_POINTS + 1)} for letter in ("S", "O")}
+
+    def rebuild(self) -> None:
+        """
+            Recomputes every empty cell from scratch.
+        """
+        self.buckets = self.__empty_buckets()
+        self.points = {}
+        self.__items = {}
+        self.__index = {"S": {}, "O": {}}
+        self.counters = WindowCounters.from_board(self.board)
+        index = self.counters.index
+        for x, y in self.board.empty_cells():
+            self.__items[(x, y)] = self.cell_lookup(x, y)
+            self.points[(x, y)] = {}
+            for letter in ("S", "O"):
+                self.__insert(x, y, letter, self.counters.gain(index.cell(x, y), letter))
+
+    def __insert(self, x:int, y:int, letter:str, points:int) -> None:
+        item = self.__items[(x, y)]
+        bucket = self.buckets[letter][points]
+        self.__index[letter][item] = len(bucket)
+        bucket.append(item)
+        self.points[(x, y)][letter] = points
+
+    def __remove(self, x:int, y:int, letter:str) -> None:
+        # Swap-remove keeps every bucket operation O(1).
+        item = self.__items[(x, y)]
+        bucket = self.buckets[letter][self.points[(x, y)][letter]]
+        index = self.__index[letter].pop(item)
+        last_item = bucket.pop()
+        if last_item is not item:
+            bucket[index] = last_item
+            self.__index[letter][last_item] = index
+
+    def update_around(self, x:int, y:int) -> list[tuple[int,int]]:
+        """
+            Updates the cache after a letter has been placed at (x, y).
+            \nReturns the cells whose points changed, the placed cell included.
+        """
+        counters = self.counters
+        index = counters.index
+        changed = []
+        if (x, y) in self.points:
+            for letter in ("S", "O"):
+                self.__remove(x, y, letter)
+            del self.points[(x, y)]
+            del self.__items[(x, y)]
+            counters.place(index.cell(x, y), self.board.get_letter(x, y))
+            changed.append((x, y))
+        return changed + self.__refresh_neighbours(x, y)
+
+    def update_after_removal(self, x:int, y:int) -> list[tuple[int,int]]:
+        """
+            Updates the cache after the letter at (x, y) has been removed again (an undo).
+            \nReturns the cells whose points changed, the emptied cell included.
+        """
+        counters = self.counters
+        index = counters.index
+        if (x, y) in self.points:
+            return []
+        cell = index.cell(x, y)
+        counters.remove(cell)
+        self.__items[(x, y)] = self.cell_lookup(x, y)
+        self.points[(x, y)] = {}
+        for letter in ("S", "O"):
+            self.__insert(x, y, letter, counters.gain(cell, letter))
+        return [(x, y)] + self.__refresh_neighbours(x, y)
+
+    def __refresh_neighbours(self, x:int, y:int) -> list[tuple[int,int]]:
+        counters = self.counters
+        index = counters.index
+        changed = []
+        for neighbour in index.neighbours[index.cell(x, y)]:
+            nx, ny = index.coords[neighbour]
+            if (nx, ny) not in self.points:
+                continue
+            cell_changed = False
+            for letter in ("S", "O"):
+                new_points = counters.gain(neighbour, letter)
+                if new_points != self.points[(nx, ny)][letter]:
+                    self.__remove(nx, ny, letter)
+                    self.__insert(nx, ny, letter, new_points)
+                    cell_changed = True
+            if cell_changed:
+                changed.append((nx, ny))
+        return changed
+
+    def full_rescan(self) -> dict[str,dict[int,list]]:
+        """
+            Returns freshly computed buckets for the whole board, without touching the cache.
+        """
+        output = self.__empty_buckets()
+        for x, y in self.board.empty_cells():
+            for letter in ("S", "O"):
+                output[letter][self.board.count_sos(x, y, letter)].append(self.cell_lookup(x, y))
+        return output
+
+    def is_consistent(self) -> bool:
+        """
+            Checks the cache against a full rescan of the board. Bucket order is ignored.
+        """
+        rescan = self.full_rescan()
+        for letter in ("S", "O"):
+            for points in range(self.MAX_POINTS + 1):
+                cached = self.buckets[letter][points]
+                if len(cached) != len(rescan[letter][points]):
+                    return False
+                if set(cached) != set(rescan[letter][points]):
+                    return False
+        return True
+
+class PositionSnapshot(NamedTuple):
+    """
+        Immutable, picklable copy of a position, small enough to hand to another thread or
+        process. cells holds one character per cell, row by row: "S", "O" or "." for empty.
+    """
+    board_dimension: int
+    match_type: str
+    cells: str
+    scores: tuple[int,int]
+    current_player: int
+
+class GameState:
+    """
+        A position with the game's rules and a move stack, for looking ahead without copying
+        boards: make_move plays a move and unmake_move takes the last one back, restoring the
+        cells, the scores, the player to move and the occupied count exactly.
+        \nThe rules match SOSGameLogic.process_turn_and_switch: scoring keeps the turn, and in
+        a Simple match the first SOS ends the game. Points come from WindowCounters, so a move
+        costs a handful of window updates whatever the board size.
+    """
+    def __init__(self, board, match_type:str = "General", scores:tuple[int,int] = (0, 0), current_player:int = 1):
+        self.board = board
+        self.match_type = match_type
+        self.scores = list(scores)
+        self.current_player = current_player
+        self.moves = []
+        self.counters = WindowCounters.from_board(board)
+
+    @classmethod
+    def from_snapshot(cls, snapshot:PositionSnapshot, board_engine = GameBoard) -> "GameState":
+        """
+            Builds a GameState on a new board_engine board holding the snapshot's position.
+        """
+        board = board_engine(snapshot.board_dimension)
+        for cell, letter in enumerate(snapshot.cells):
+            if letter != ".":
+                board.place(cell % snapshot.board_dimension, cell // snapshot.board_dimension, letter)
+        return cls(board, snapshot.match_type, snapshot.scores, snapshot.current_player)
+
+    def snapshot(self) -> PositionSnapshot:
+        """
+            Returns the current position as a PositionSnapshot.
+        """
+        return PositionSnapshot(self.board.board_dimension, self.match_type,
+                                "".join(letter or "." for row in self.board.cells for letter in row),
+                                tuple(self.scores), self.current_player)
+
+    @property
+    def occupied_count(self) -> int:
+        return self.board.board_dimension ** 2 - self.board.empty_count()
+
+    def is_over(self) -> bool:
+        """
+            Returns whether the board is full, or a Simple match has had its SOS.
+        """
+        return self.board.empty_count() == 0 or (self.match_type == "Simple" and sum(self.scores) > 0)
+
+    def legal_moves(self) -> list[tuple[int,int,str]]:
+        """
+            Returns every move as (x, y, letter), row by row, S before O.
+        """
+        return [(x, y, letter) for x, y in self.board.empty_cells() for letter in ("S", "O")]
+
+    def points_for(self, x:int, y:int, letter:str) -> int:
+        """
+            Returns the points letter at the empty cell (x, y) would score.
+        """
+        return self.counters.gain(self.counters.index.cell(x, y), letter)
+
+    def make_move(self, x:int, y:int, letter:str) -> int:
+        """
+            Plays letter at the empty cell (x, y) for the player to move and pushes it on the
+            move stack. Returns the points it scored.
+        """
+        player = self.current_player
+        cell = self.counters.index.cell(x, y)
+        points = self.counters.gain(cell, letter)
+        self.board.place(x, y, letter, player)
+        self.counters.place(cell, letter)
+        self.scores[player - 1] += points
+        if points == 0:
+            self.current_player = 2 if player == 1 else 1
+        self.moves.append((x, y, letter, player, points))
+        return points
+
+    def unmake_move(self) -> tuple[int,int,str,int,int]:
+        """
+            Takes back the last move. Returns it as (x, y, letter, player, points).
+        """
+        move = self.moves.pop()
+        x, y, _, player, points = move
+        self.board.remove(x, y)
+        self.counters.remove(self.counters.index.cell(x, y))
+        self.scores[player - 1] -= points
+        self.current_player = player
+        return move
@@ -5,17 +5,38 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox as msgbox
+from concurrent.futures import ThreadPoolExecutor
 import random
-from abc import abstractmethod
+import threading
+from game_board import GameBoard, CandidateScoreCache, GameState, PositionSnapshot
+from bitboard import BitBoard
+from search import AlphaBetaSearch
+from mcts import MonteCarloTreeSearch
+import instrumentation
+from move_log import LoggedGame
+
+# Board models that can back SOSGameLogic. Both share the same scoring interface.
+BOARD_ENGINES = {"Dict": GameBoard, "Bitboard": BitBoard}
+
+# Largest board each renderer can show: a grid of buttons, or the single-canvas renderer.
+MAX_BUTTON_BOARD_DIMENSION = 15
+MAX_CANVAS_BOARD_DIMENSION = 100
+
+# Heatmap tints for empty tiles whose best move scores 1, 2, 3, and 4 or more points.
+HEATMAP_COLORS = ("#d8f3dc", "#95d5b2", "#52b788", "#2d6a4f")
 
 class Tile:
     """
         Tile type containing the button's instance, coordinates, and the ownwer
         of the tile (the player that placed a letter there), to be used on a gameboard.
+        button_options holds the options GUILogic last wrote to the button, and default_options
+        the values those options had before GUILogic first changed them.
     """
     def __init__(self, button_instance:ttk.Button = None,
                  x_coord:int  = None, y_coord:int = None):
         self.button_instance = button_instance
+        self.button_options = {}
+        self.default_options = {}
         self.owner = None
         self.coord = (x_coord,y_coord)
 
@@ -24,6 +45,8 @@ class Tile:
             Sets the button_instance variable to the new_button.
         """
         self.button_instance = new_button
+        self.button_options = {}
+        self.default_options = {}
     
     def debug_print_all_info(self):
         """
@@ -37,12 +60,12 @@ class Player:
     """
         Contains player-specific information and functions.
     """
-    def __init__(self, player_name:str, color:str, gui):
+    def __init__(self, player_name:str, color:str, gui, backend = tk):
         self.name = player_name
         self.color = color
         self.owned_tile = {"S":[], "O":[]}
         self.score = 0
-        self.score_variable = tk.IntVar()
+        self.score_variable = backend.IntVar()
         self.gui = gui
 
     def set_name(self, new_name:str) -> None:
@@ -57,13 +80,26 @@ class Player:
         """
         self.owned_tile[letter].append(tile)
 
+    def remove_owned_tile(self, letter:str, tile:Tile) -> None:
+        """
+            Takes back a Tile this player owns, when its move is undone.
+        """
+        self.owned_tile[letter].remove(tile)
+
     def add_one_score(self) -> None:
         """
             Adds one score to this player.
         """
         self.score += 1
         self.score_variable.set(self.score)
-        print("added score to", self.name)
+        if instrumentation.enabled: instrumentation.event("score", player=self.name, score=self.score)
+
+    def remove_score(self, points:int) -> None:
+        """
+            Takes points back from this player's score, when a scoring move is undone.
+        """
+        self.score -= points
+        self.score_variable.set(self.score)
 
     def reset_score(self) -> None:
         """
@@ -78,14 +114,65 @@ class Player:
     def take_turn(self, game_logic) -> None:
         pass
 
+    def close(self) -> None:
+        """
+            Releases what the player holds (e.g. worker processes) once its game is over or it is
+            replaced. Nothing for a human.
+        """
+        pass
+
 class ComputerPlayer(Player):
-    def __init__(self, player_name:str, color:str, gui):
-        super().__init__(player_name, color, gui)
+    def __init__(self, player_name:str, color:str, gui, backend = tk):
+        super().__init__(player_name, color, gui, backend)
 
     def take_turn(self, game_logic) -> None:
-        game_logic.gui.master.after(82, lambda: self._computer_move_logic(game_logic))
+        # No artificial delay: how long a move takes is set by the move time budget.
+        game_logic.gui.master.after(0, lambda: self._computer_move_logic(game_logic))
 
     def _computer_move_logic(self, game_logic) -> None:
+        """
+            Snapshots the position on the Tk loop, picks the move on the GUI's worker thread, and
+            plays it back on the Tk loop once it is ready.
+        """
+        snapshot = self.snapshot_position(game_logic)
+        game_logic.thinking_variable.set("thinking…")
+        game_logic.gui.run_in_worker(lambda: self._timed_select_move(snapshot),
+                                     lambda move: self._play_move(game_logic, move))
+
+    def _play_move(self, game_logic, move:tuple) -> None:
+        game_logic.thinking_variable.set("")
+        (x, y), letter_chosen = move
+        tile_chosen = game_logic.gameboard_tile_instance_dict[y][x]
+        self.make_move(tile_chosen, letter_chosen)
+        game_logic.process_turn_and_switch(tile_chosen, letter_chosen)
+
+    def choose_move(self, game_logic) -> tuple[Tile, str]:
+        """
+            Picks a move right away, on the calling thread.
+            \nReturns a tuple: (tile, letter).
+        """
+        (x, y), letter_chosen = self._timed_select_move(self.snapshot_position(game_logic))
+        return game_logic.gameboard_tile_instance_dict[y][x], letter_chosen
+
+    def choose_state_move(self, state:GameState, time_budget:float) -> tuple[tuple[int,int], str]:
+        """
+            Picks a move for a GameState instead of a live game, on the calling thread, taking
+            up to time_budget seconds. Nothing but the state is needed, so a worker process can
+            move without building a game around the position.
+            \nReturns a tuple: ((x, y), letter).
+        """
+        return self._timed_select_move(self.snapshot_state(state, time_budget))
+
+    def _timed_select_move(self, snapshot) -> tuple[tuple[int,int], str]:
+        with instrumentation.phase("ai selection"):
+            return self.select_move(snapshot)
+
+    def snapshot_position(self, game_logic):
+        """
+            Copies what select_move needs out of the live game. Runs on the Tk loop; the result
+            must not share anything the game keeps changing.
+            \nReturns the highest scoring tiles per letter: { letter: (points possible, [ tile ]) }.
+        """
         available_moves = game_logic._return_possible_score_per_tile()
 
         # Determine which letters will result in more points.
@@ -97,6 +184,32 @@ class ComputerPlayer(Player):
         for points_possible, tiles in available_moves["O"].items():
             highest_point_o = points_possible if len(tiles) > 0 else highest_point_o
 
+        return {"S": (highest_point_s, list(available_moves["S"][highest_point_s])),
+                "O": (highest_point_o, list(available_moves["O"][highest_point_o]))}
+
+    def snapshot_state(self, state:GameState, time_budget:float):
+        """
+            Like snapshot_position, for a GameState: its points come from the state's window
+            counters instead of the game's score cache.
+        """
+        best = {"S": (0, []), "O": (0, [])}
+        for x, y, letter in state.legal_moves():
+            points = state.points_for(x, y, letter)
+            if points > best[letter][0]:
+                best[letter] = (points, [(x, y)])
+            elif points == best[letter][0]:
+                best[letter][1].append((x, y))
+        return {letter: (points, [Tile(x_coord = x, y_coord = y) for x, y in cells])
+                for letter, (points, cells) in best.items()}
+
+    def select_move(self, snapshot) -> tuple[tuple[int,int], str]:
+        """
+            Picks the letter and tile giving the most points right now, breaking ties randomly.
+            Safe to run on a worker thread.
+            \nReturns a tuple: ((x, y), letter).
+        """
+        highest_point_s, highest_point_o = snapshot["S"][0], snapshot["O"][0]
+
         # Choose the letter based on the findings above.
         letter_chosen = "S" # Default letter
         if highest_point_s == highest_point_o:
@@ -105,66 +218,254 @@ class ComputerPlayer(Player):
             letter_chosen = "S" if highest_point_s > highest_point_o else "O"
 
         # Pick a random tile from the highest scoring tiles list to place the chosen letter in.
-        tile_chosen = random.choice(available_moves[letter_chosen][highest_point_s if letter_chosen == "S" else highest_point_o])
-        
-        super().make_move(tile_chosen, letter_chosen)
-        game_logic.process_turn_and_switch(tile_chosen, letter_chosen)
+        tile_chosen = random.choice(snapshot[letter_chosen][1])
+        return tile_chosen.coord, letter_chosen
+
+class RandomPlayer(ComputerPlayer):
+    """
+        Computer player that places a random letter in a random empty tile. Used as the
+        weakest baseline in tournaments.
+    """
+    def __init__(self, player_name:str, color:str, gui, backend = tk):
+        super().__init__(player_name, color, gui, backend)
+
+    def snapshot_position(self, game_logic):
+        return game_logic.game_board.empty_cells()
+
+    def snapshot_state(self, state:GameState, time_budget:float):
+        return state.board.empty_cells()
+
+    def select_move(self, snapshot) -> tuple[tuple[int,int], str]:
+        return random.choice(snapshot), random.choice(["S", "O"])
+
+class SearchPlayer(ComputerPlayer):
+    """
+        Computer player that looks ahead with alpha-beta search instead of taking the best
+        immediate move. It deepens the search until the move time budget runs out; depth and
+        node limits are read from the game logic's settings too.
+        \nIf the game logic has a tablebase for the board size and match type, the player
+        plays perfectly from it instead of searching.
+    """
+    def __init__(self, player_name:str, color:str, gui, backend = tk):
+        super().__init__(player_name, color, gui, backend)
+        self.search = None
+
+    def __prepare_search(self, board_dimension:int, match_type:str) -> None:
+        if (self.search == None or self.search.board_dimension != board_dimension
+                or self.search.match_type != match_type):
+            # The transposition table stays valid between moves of the same game setup.
+            self.search = AlphaBetaSearch(board_dimension, match_type)
+
+    def snapshot_position(self, game_logic):
+        board = game_logic.game_board
+        match_type = game_logic.config_match_type.get()
+        self.__prepare_search(board.board_dimension, match_type)
+        node_limit = game_logic.config_search_node_limit.get()
+        time_budget = game_logic.config_move_time_budget.get() / 1000
+        self.search.max_depth = max(0, game_logic.config_search_depth.get())
+        self.search.max_nodes = node_limit if node_limit > 0 else None
+        if self.search.max_depth == 0 and self.search.max_nodes == None and time_budget <= 0:
+            self.search.max_depth = 2 # nothing else would stop the search
+        self.search.stop_event = game_logic.gui.cancel_event
+        tablebase = game_logic.tablebases.get((board.board_dimension, match_type))
+        return BitBoard.from_board(board), time_budget, tablebase
+
+    def snapshot_state(self, state:GameState, time_budget:float):
+        # Without the game's settings the search is only limited by time.
+        self.__prepare_search(state.board.board_dimension, state.match_type)
+        self.search.max_depth = 0 if time_budget > 0 else 2
+        self.search.max_nodes = None
+        self.search.stop_event = None
+        return BitBoard.from_board(state.board), time_budget, None
+
+    def select_move(self, snapshot) -> tuple[tuple[int,int], str]:
+        board, time_budget, tablebase = snapshot
+        if tablebase != None:
+            return tablebase.best_move(board)
+        _, (x, y, letter) = self.search.search(board, time_budget if time_budget > 0 else None)
+        return (x, y), letter
+
+class MCTSPlayer(ComputerPlayer):
+    """
+        Computer player that picks moves with Monte Carlo Tree Search, spreading the playouts
+        over all cores (or over workers processes; 1 searches in-process) for a fixed time per
+        move. Search statistics of the last move are kept in last_stats.
+    """
+    def __init__(self, player_name:str, color:str, gui, backend = tk, workers:int = None):
+        super().__init__(player_name, color, gui, backend)
+        self.mcts = MonteCarloTreeSearch(workers=workers, seed=random.randrange(2**31))
+
+    @property
+    def last_stats(self) -> dict:
+        return self.mcts.last_stats
+
+    def snapshot_position(self, game_logic):
+        time_budget = game_logic.config_move_time_budget.get() / 1000
+        if time_budget > 0:
+            self.mcts.time_budget = time_budget
+        self.mcts.stop_event = game_logic.gui.cancel_event
+        board = BitBoard.from_board(game_logic.game_board)
+        return (board.board_dimension, board.s_mask, board.o_mask,
+                (game_logic.player_dict[1].score, game_logic.player_dict[2].score),
+                game_logic.current_player_number_variable.get(),
+                game_logic.config_match_type.get())
+
+    def snapshot_state(self, state:GameState, time_budget:float):
+        if time_budget > 0:
+            self.mcts.time_budget = time_budget
+        self.mcts.stop_event = None
+        board = BitBoard.from_board(state.board)
+        return (board.board_dimension, board.s_mask, board.o_mask, tuple(state.scores), state.current_player,
+                state.match_type)
+
+    def select_move(self, snapshot) -> tuple[tuple[int,int], str]:
+        bit, letter = self.mcts.search(snapshot)
+        return BitBoard(snapshot[0]).coord(bit), letter
+
+    def close(self) -> None:
+        """
+            Shuts down the search's worker processes. They are started again if it moves again.
+        """
+        self.mcts.close()
 
 class SOSGameLogic:
     """
         Includes functions and logic for the SOS game board.
+        \nbackend provides IntVar, StringVar and BooleanVar. It is tkinter by default; pass the
+        headless module to run the game without a display.
+        \nIf move_log is set (a move_log.MoveLogWriter), every game and move is recorded in it.
+        move_history holds the current game's moves as (x, y, letter, player, points), and
+        last_result the outcome of the last finished game; if archive is set (a
+        game_archive.GameArchive), finished games are stored in it.
+        \nundo_move takes the last move back; sos_lines holds every SOS scored so far as
+        (coords, player), so undoing can recolor the tiles and remove the lines. game_state()
+        copies the position into a GameState, which plays and unplays moves on its own board;
+        computer players can pick a move for one with choose_state_move.
+        \nWith config_show_heatmap set, every empty tile is tinted by the most points a letter
+        placed there would score. The tints follow the incremental score cache, so a move only
+        repaints the tiles whose points it changed.
+        \nIf remote is set (a server.ServerConnection), the game mirrors a match on a server:
+        clicks on the local player's turn are sent to the server instead of played, and the
+        moves the server reports are played with play_move.
     """
-    def __init__(self):
+    def __init__(self, backend = tk):
+        self.backend = backend
         self.gui = None
         self.master = None
         self.gameboard_tile_instance_dict = {}
         self.board_dimension = 8
         self.board_size = self.board_dimension * self.board_dimension
+        self.game_board = GameBoard(self.board_dimension)
+        self._score_cache = None
         self.player_dict = {} 
-        self.occupied_tile_count = 0
         self.gained_point = False
+        self.move_log = None
+        self.archive = None
+        self.move_history = []
+        self.sos_lines = []
+        self.last_result = None
+        self.tablebases = {}
+        self.remote = None
         
-        self.game_board_dimension_variable = tk.IntVar(value=self.board_dimension)
-        self.current_player_number_variable = tk.IntVar(value=1)
-        self.current_player_name_variable = tk.StringVar()
-        self.current_letter_variable = tk.StringVar(value="S")
+        self.game_board_dimension_variable = backend.IntVar(value=self.board_dimension)
+        self.current_player_number_variable = backend.IntVar(value=1)
+        self.current_player_name_variable = backend.StringVar()
+        self.current_letter_variable = backend.StringVar(value="S")
+        self.thinking_variable = backend.StringVar(value="")
         
-        self.config_match_type = tk.StringVar(value="Simple")
-        self.config_do_random_size = tk.BooleanVar()
-        self.config_do_clickhold = tk.BooleanVar()
-        self.config_blue_player_type = tk.StringVar(value="Human")
-        self.config_red_player_type = tk.StringVar(value="Human")
+        self.config_match_type = backend.StringVar(value="Simple")
+        self.config_do_random_size = backend.BooleanVar()
+        self.config_do_clickhold = backend.BooleanVar()
+        self.config_blue_player_type = backend.StringVar(value="Human")
+        self.config_red_player_type = backend.StringVar(value="Human")
+        self.config_board_engine = backend.StringVar(value="Dict")
+        self.config_search_depth = backend.IntVar(value=0)
+        self.config_search_node_limit = backend.IntVar(value=0)
+        self.config_move_time_budget = backend.IntVar(value=500)
+        self.config_mcts_workers = backend.IntVar(value=0) # 0: one per core
+        self.config_use_canvas = backend.BooleanVar()
+        self.config_show_heatmap = backend.BooleanVar()
+
+    @property
+    def occupied_tile_count(self) -> int:
+        """
+            How many tiles hold a letter, derived from the board model's empty cells.
+        """
+        return self.game_board.board_dimension ** 2 - self.game_board.empty_count()
+
+    def add_tablebase(self, tablebase) -> None:
+        """
+            Makes search players play perfectly from a tablebase.Tablebase on its board size
+            and match type.
+        """
+        self.tablebases[(tablebase.board_dimension, tablebase.match_type)] = tablebase
 
     def dimension_validate(self) -> bool:
         """
             Validate the dimensions the user has chosen to be within expected ranges.
-            Expected range: 3 to 15, integer.
+            Expected range: 3 to 15, integer, or 3 to 100 with the canvas renderer.
         """
         board_dimension = self.game_board_dimension_variable.get()
-        if board_dimension < 3 or board_dimension > 15:
+        max_dimension = MAX_CANVAS_BOARD_DIMENSION if self.config_use_canvas.get() else MAX_BUTTON_BOARD_DIMENSION
+        if board_dimension < 3 or board_dimension > max_dimension:
             return False
         self.__update_board_size_information(board_dimension)
         return True
 
     def create_players(self) -> None:
         """
-            Initialize computer / human players PER COLOR based on user's choice.
+            Initialize computer / human players PER COLOR based on user's choice. The players
+            being replaced are closed first.
         """
+        self.close_players()
         if self.config_blue_player_type.get() == "Computer":
-            self.player_dict[1] = ComputerPlayer("Blue Clanker", "blue", self.gui)
+            self.player_dict[1] = ComputerPlayer("Blue Clanker", "blue", self.gui, self.backend)
+        elif self.config_blue_player_type.get() == "Search":
+            self.player_dict[1] = SearchPlayer("Blue Seeker", "blue", self.gui, self.backend)
+        elif self.config_blue_player_type.get() == "MCTS":
+            self.player_dict[1] = MCTSPlayer("Blue Gambler", "blue", self.gui, self.backend,
+                                            self.config_mcts_workers.get() or None)
+        elif self.config_blue_player_type.get() == "Random":
+            self.player_dict[1] = RandomPlayer("Blue Dice", "blue", self.gui, self.backend)
         else:
-            self.player_dict[1] = Player("Blue One", "blue", self.gui)
+            self.player_dict[1] = Player("Blue One", "blue", self.gui, self.backend)
 
         if self.config_red_player_type.get() == "Computer":
-            self.player_dict[2] = ComputerPlayer("Red Clanker", "red", self.gui)
+            self.player_dict[2] = ComputerPlayer("Red Clanker", "red", self.gui, self.backend)
+        elif self.config_red_player_type.get() == "Search":
+            self.player_dict[2] = SearchPlayer("Red Seeker", "red", self.gui, self.backend)
+        elif self.config_red_player_type.get() == "MCTS":
+            self.player_dict[2] = MCTSPlayer("Red Gambler", "red", self.gui, self.backend,
+                                            self.config_mcts_workers.get() or None)
+        elif self.config_red_player_type.get() == "Random":
+            self.player_dict[2] = RandomPlayer("Red Dice", "red", self.gui, self.backend)
         else:
-            self.player_dict[2] = Player("Red Two", "red", self.gui)
+            self.player_dict[2] = Player("Red Two", "red", self.gui, self.backend)
             
         self.current_player_name_variable.set(self.player_dict[1].name)
 
+    def close_players(self) -> None:
+        """
+            Closes both players, shutting down any worker processes they started.
+        """
+        for player in self.player_dict.values():
+            player.close()
+
     def __update_board_size_information(self, board_dimension) -> None:
         self.board_dimension = board_dimension
         self.board_size = board_dimension * board_dimension
+        self.reset_board(board_dimension)
+
+    def reset_board(self, board_dimension:int) -> None:
+        """
+            Empties the board model and drops the cached scores, resizing to board_dimension.
+            Switches the model to the one named by config_board_engine if it has changed.
+        """
+        board_engine = BOARD_ENGINES[self.config_board_engine.get()]
+        if type(self.game_board) is not board_engine:
+            self.game_board = board_engine(board_dimension)
+        self.game_board.reset(board_dimension)
+        self._score_cache = None
 
     def on_tile_click(self, tile:Tile) -> None:
         """
@@ -176,22 +477,150 @@ class SOSGameLogic:
             3. Then switch turn to the next player, by updating the current player to the
                next player.
         """
-        if tile.button_instance.cget("text") != "": return # just in case
+        if not self.game_board.is_empty(*tile.coord): return # just in case
         if isinstance(self.__get_current_player(), ComputerPlayer): return # also just in case
         current_letter = self.current_letter_variable.get()
+        if self.remote != None:
+            if self.current_player_number_variable.get() == self.remote.seat:
+                self.remote.send_move(*tile.coord, current_letter)
+            return
         self.__get_current_player().make_move(tile, current_letter)
         self.process_turn_and_switch(tile, current_letter)
 
+    def play_move(self, x:int, y:int, letter:str) -> None:
+        """
+            Plays letter at (x, y) for the player whose turn it is, as if it had been clicked.
+        """
+        tile = self.gameboard_tile_instance_dict[y][x]
+        self.__get_current_player().make_move(tile, letter)
+        self.process_turn_and_switch(tile, letter)
+
+    def undo_move(self) -> bool:
+        """
+            Takes back the last move: the letter, the points and SOS lines it scored, and the
+            turn, so the player who made it is to move again. Returns False if there is nothing
+            to undo (or the game mirrors a server match).
+        """
+        if not self.move_history or self.remote != None:
+            return False
+        x, y, letter, player_number, points = self.move_history.pop()
+        tile = self.gameboard_tile_instance_dict[y][x]
+        player = self.player_dict[player_number]
+        self.game_board.remove(x, y)
+        changed = self._score_cache.update_after_removal(x, y) if self._score_cache != None else None
+        if self.move_log != None:
+            self.move_log.unrecord()
+        if instrumentation.enabled: instrumentation.event("undo", player=player_number, cell=(x, y), letter=letter)
+
+        undone_lines = self.sos_lines[len(self.sos_lines) - points:] if points > 0 else []
+        del self.sos_lines[len(self.sos_lines) - len(undone_lines):]
+        player.remove_owned_tile(letter, tile)
+        player.remove_score(points)
+
+        self.gui.begin_batch()
+        try:
+            self.gui.restore_button(tile, "", [])
+            recolored = {coord for coords, _ in undone_lines for coord in coords if coord != (x, y)}
+            for coord in recolored:
+                colors = [self.player_dict[owner].color for coords, owner in self.sos_lines if coord in coords]
+                self.gui.restore_button(self.gameboard_tile_instance_dict[coord[1]][coord[0]],
+                                        self.game_board.get_letter(*coord), colors)
+            self.gui.remove_sos_lines(len(undone_lines))
+            if self.config_show_heatmap.get():
+                self.refresh_heatmap(changed)
+        finally:
+            self.gui.flush_updates()
+
+        self.current_player_number_variable.set(player_number)
+        self.current_player_name_variable.set(player.name)
+        self.gained_point = False
+        return True
+
+    def undo_turn(self) -> None:
+        """
+            Undo for the Undo button: cancels any computer move being worked out, takes back the
+            last move, and keeps going back while a computer is to move, so a human playing a
+            computer gets their own last move back. Then the player to move takes their turn.
+        """
+        if not self.move_history or self.remote != None:
+            return
+        self.gui.cancel_pending_work()
+        self.thinking_variable.set("")
+        has_human = any(not isinstance(player, ComputerPlayer) for player in self.player_dict.values())
+        self.undo_move()
+        while self.move_history and has_human and isinstance(self.__get_current_player(), ComputerPlayer):
+            self.undo_move()
+        self.__get_current_player().take_turn(self)
+
+    def position_snapshot(self) -> PositionSnapshot:
+        """
+            Returns the live position as an immutable PositionSnapshot.
+        """
+        return PositionSnapshot(self.game_board.board_dimension, self.config_match_type.get(),
+                                "".join(letter or "." for row in self.game_board.cells for letter in row),
+                                (self.player_dict[1].score, self.player_dict[2].score),
+                                self.current_player_number_variable.get())
+
+    def game_state(self) -> GameState:
+        """
+            Returns a GameState of the live position on its own board model, for trying out
+            moves with make_move / unmake_move without touching the game.
+        """
+        return GameState.from_snapshot(self.position_snapshot(), BOARD_ENGINES[self.config_board_engine.get()])
+
+    def refresh_heatmap(self, cells:list[tuple[int,int]] = None) -> None:
+        """
+            Brings the heatmap tints of cells up to date with the score cache, or of every tile
+            if cells is None (e.g. when the heatmap is switched on or off). Tiles holding a
+            letter lose their tint; their colors belong to the SOS they are part of.
+        """
+        points = {}
+        if self.config_show_heatmap.get():
+            self._return_possible_score_per_tile() # builds the cache if there is none yet
+            points = self._score_cache.points
+        if cells == None:
+            cells = [(x, y) for y, row in self.gameboard_tile_instance_dict.items() for x in row]
+        self.gui.begin_batch()
+        try:
+            for x, y in cells:
+                tile = self.gameboard_tile_instance_dict[y][x]
+                best = max(points[(x, y)].values()) if (x, y) in points else 0
+                color = HEATMAP_COLORS[min(best, len(HEATMAP_COLORS)) - 1] if best > 0 else None
+                if color != None or tile.button_options.get("bg") in HEATMAP_COLORS:
+                    self.gui.tint_button(tile, color)
+        finally:
+            self.gui.flush_updates()
+
     def process_turn_and_switch(self, tile:Tile, letter:str) -> None:
-        self.occupied_tile_count += 1
-        
-        # Point gain check.
-        bool_gained_point, num_points = self.move_analysis(tile, False, self.gameboard_tile_instance_dict, letter)
-        self.player_dict[self.current_player_number_variable.get()].add_owned_tile(letter, tile)
-        if bool_gained_point:               self.__update_point(num_points)
-        
+        # Button updates made while working out the turn are written once, at the end.
+        self.gui.begin_batch()
+        try:
+            self.game_board.place(*tile.coord, letter, self.current_player_number_variable.get())
+            if instrumentation.enabled:
+                instrumentation.event("move", player=self.current_player_number_variable.get(),
+                                      cell=tile.coord, letter=letter)
+            if self._score_cache != None:
+                with instrumentation.phase("move scan"):
+                    changed = self._score_cache.update_around(*tile.coord)
+                if self.config_show_heatmap.get():
+                    self.refresh_heatmap(changed)
+            elif self.config_show_heatmap.get():
+                self.refresh_heatmap()
+
+            # Point gain check.
+            with instrumentation.phase("analysis"):
+                bool_gained_point, num_points = self.move_analysis(tile, False, self.game_board, letter)
+            self.player_dict[self.current_player_number_variable.get()].add_owned_tile(letter, tile)
+            if bool_gained_point:               self.__update_point(num_points)
+            self.move_history.append((*tile.coord, letter, self.current_player_number_variable.get(), num_points))
+            if self.move_log != None:
+                self.move_log.record(*tile.coord, letter, self.current_player_number_variable.get(), num_points)
+            bool_game_over = self.__bool_check_game_over()
+        finally:
+            self.gui.flush_updates()
+
         # Game over check.
-        if self.__bool_check_game_over():   self.__game_over()
+        if bool_game_over:                  self.__game_over()
         else:
             if not bool_gained_point:
                 current = self.current_player_number_variable.get()
@@ -208,8 +637,8 @@ class SOSGameLogic:
                                    new_state="disabled",
                                    new_color=self.__get_current_player().color
                                    )
-            print("painted",str(coord), end=" ")
-        print()
+        self.sos_lines.append((tuple(coord_array), self.current_player_number_variable.get()))
+        self.gui.draw_sos_line(coord_array, self.__get_current_player().color)
     
     def __get_current_player(self) -> Player:
         return self.player_dict[self.current_player_number_variable.get()]
@@ -224,11 +653,18 @@ class SOSGameLogic:
         if self.config_match_type.get() == "Simple":
             if self.gained_point:
                 return True
-        return self.board_size == self.occupied_tile_count
+        return self.game_board.empty_count() == 0
 
     def __game_over(self) -> None:
         self.__disable_all_buttons()
         player_dict = self.player_dict
+        if self.move_log != None: self.move_log.flush()
+        self.close_players()
+        self.__record_result()
+        if instrumentation.enabled:
+            instrumentation.event("game over", scores=(player_dict[1].score, player_dict[2].score),
+                                  moves=self.occupied_tile_count)
+            instrumentation.dump_summary()
         if player_dict[1].score > player_dict[2].score:
             self.gui.create_popup("Game Over!", f"{player_dict[1].name} won the game!")
         elif player_dict[2].score > player_dict[1].score:
@@ -237,216 +673,103 @@ class SOSGameLogic:
             self.gui.create_popup("Game Over!", "Tied! Nobody wins!")
         self.gui.master.destroy()
 
+    def __record_result(self) -> None:
+        blue_score, red_score = self.player_dict[1].score, self.player_dict[2].score
+        self.last_result = {"winner": 0 if blue_score == red_score else (1 if blue_score > red_score else 2),
+                            "scores": (blue_score, red_score), "moves": len(self.move_history)}
+        if self.archive != None:
+            self.archive.add_game(LoggedGame(self.board_dimension, self.config_match_type.get(),
+                                             (self.config_blue_player_type.get(), self.config_red_player_type.get()),
+                                             list(self.move_history)))
+
     def reset_state(self) -> None:
         """
-            Resets the current data to the default state.
+            Resets the current data to the default state. Any computer move still being
+            worked out is cancelled.
         """
+        self.gui.cancel_pending_work()
+        if instrumentation.enabled: instrumentation.reset()
+        self.thinking_variable.set("")
         self.player_dict[1].reset_score()
         self.player_dict[2].reset_score()
         self.current_player_number_variable.set(1)
         self.current_player_name_variable.set(self.player_dict[1].name)
         self.gained_point = False
-        self.occupied_tile_count = 0
+        self.move_history = []
+        self.sos_lines = []
+        if self.config_show_heatmap.get():
+            self.refresh_heatmap()
+        if self.move_log != None:
+            self.move_log.start_game(self.board_dimension, self.config_match_type.get(),
+                                     self.config_blue_player_type.get(), self.config_red_player_type.get())
         self.__get_current_player().take_turn(self)
 
     def __disable_all_buttons(self) -> None:
+        self.gui.begin_batch()
         for y, row in self.gameboard_tile_instance_dict.items():
             for x, tile in row.items():
                 self.gui.config_button(tile, new_state="disabled")
+        self.gui.flush_updates()
 
     def _return_possible_score_per_tile(self) -> dict[str,dict[int,list]]:
         """
             Returns the scores possible for the currently available tiles, excluding the
-            non-empty tiles.
+            non-empty tiles. The result is the live incremental cache and must not be modified.
             \nReturn format is { letter: { points possible: [ tile ] } }.
         """
+        if self._score_cache == None:
+            with instrumentation.phase("move scan"):
+                self._score_cache = CandidateScoreCache(self.game_board,
+                                                        lambda x, y: self.gameboard_tile_instance_dict[y][x])
+        return self._score_cache.buckets
+
+    def _rescan_possible_score_per_tile(self) -> dict[str,dict[int,list]]:
+        """
+            Same as _return_possible_score_per_tile, but rescans every tile with move_analysis.
+        """
         output = {"S":{0:[],1:[],2:[],3:[],4:[],5:[],6:[],7:[],8:[]},
                   "O":{0:[],1:[],2:[],3:[],4:[],5:[],6:[],7:[],8:[]}}
-        for y, row in self.gameboard_tile_instance_dict.items():
-            for x, tile in row.items():
-                if tile.button_instance.cget("text") == "":
-                    for letter in ["S","O"]:
-                        result = self.move_analysis(tile, True, self.gameboard_tile_instance_dict, letter)
-                        output[letter][result[1]].append(tile)
+        for x, y in self.game_board.empty_cells():
+            tile = self.gameboard_tile_instance_dict[y][x]
+            for letter in ["S","O"]:
+                result = self.move_analysis(tile, True, self.game_board, letter)
+                output[letter][result[1]].append(tile)
         return output
 
-    def move_analysis(self, tile:Tile, analysis_only:bool, board:dict, curr_letter:str = "") -> tuple[bool, int]:
+    def move_analysis(self, tile:Tile, analysis_only:bool, board:GameBoard | BitBoard, curr_letter:str = "") -> tuple[bool, int]:
         """
             Calcultes the point gained from the most recent move, then adds points to the player accordingly.
+            The letters are read from the board model, never from the buttons.
             \nReturns a tuple: (bool, number of points gained).
         """
         # Get the details of the current tile and game state.
         x,y = tile.coord
         letter = self.current_letter_variable.get() if curr_letter == "" else curr_letter
-        board_dimension = self.board_dimension - 1
-        points_gained = 0
-
-        # Below are SOS checking in 8 directions for each letter. Notation: - means tiles being checked, x is the current tile.
-        if letter == "S":
-            #   -   <- above2
-            #   -   <- above1
-            #   x
-            # Check if it is near the edge and therefore impossible 
-            if y > 1:
-                above1 = board[y-1][x].button_instance.cget("text")
-                above2 = board[y-2][x].button_instance.cget("text")
-                pattern = "S" + above1 + above2
-                if pattern == "SOS":
-                    print("-\n-\nx")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x,y-1),(x,y-2),(x,y)])
-
-            # -     <- above2
-            #  -    <- above1
-            #   x
-            if y > 1 and x > 1:
-                above1 = board[y-1][x-1].button_instance.cget("text")
-                above2 = board[y-2][x-2].button_instance.cget("text")
-                pattern = "S" + above1 + above2
-                if pattern == "SOS":
-                    print("-\n -\n  x")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x-1,y-1),(x-2,y-2),(x,y)])
-            
-            # v  left2
-            #  v  left1
-            # --x
-            if x > 1:
-                left1 = board[y][x-1].button_instance.cget("text")
-                left2 = board[y][x-2].button_instance.cget("text")
-                pattern = "S" + left1 + left2
-                if pattern == "SOS":
-                    print("--x")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x-1,y),(x-2,y),(x,y)])
-            
-            #   x   
-            #  -    <- below1
-            # -     <- below2
-            if y < board_dimension - 1 and x > 1:
-                below1 = board[y+1][x-1].button_instance.cget("text")
-                below2 = board[y+2][x-2].button_instance.cget("text")
-                pattern = "S" + below1 + below2
-                if pattern == "SOS":
-                    print("  x\n -\n-")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x-1,y+1),(x-2,y+2),(x,y)])
-            
-            #   x   
-            #   -   <- below1
-            #   -   <- below2
-            if y < board_dimension - 1:
-                below1 = board[y+1][x].button_instance.cget("text")
-                below2 = board[y+2][x].button_instance.cget("text")
-                pattern = "S" + below1 + below2
-                if pattern == "SOS":
-                    print("x\n-\n-")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x,y+1),(x,y+2),(x,y)])
-            
-            #   x   
-            #    -  <- below1
-            #     - <- below2
-            if y < board_dimension - 1 and x < board_dimension - 1:
-                below1 = board[y+1][x+1].button_instance.cget("text")
-                below2 = board[y+2][x+2].button_instance.cget("text")
-                pattern = "S" + below1 + below2
-                if pattern == "SOS":
-                    print("x\n -\n  -")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x+1,y+1),(x+2,y+2),(x,y)])
-            
-            #     v  right2
-            #    v  right1
-            #   x--
-            if x < board_dimension - 1:
-                right1 = board[y][x+1].button_instance.cget("text")
-                right2 = board[y][x+2].button_instance.cget("text")
-                pattern = "S" + right1 + right2
-                if pattern == "SOS":
-                    print("x--")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x+1,y),(x+2,y),(x,y)])
-            
-            #     - <- above2
-            #    -  <- above1
-            #   x  
-            if y > 1 and x < board_dimension - 1:
-                above1 = board[y-1][x+1].button_instance.cget("text")
-                above2 = board[y-2][x+2].button_instance.cget("text")
-                pattern = "S" + above1 + above2
-                if pattern == "SOS":
-                    print("  -\n -\nx")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x+1,y-1),(x+2,y-2),(x,y)])
-        
-        if letter == "O":
-            #   -   <- above1
-            #   x   
-            #   -   <- below1
-            # Check if it is near the edge and therefore impossible 
-            if y > 0 and y < board_dimension:
-                above1 = board[y-1][x].button_instance.cget("text")
-                below1 = board[y+1][x].button_instance.cget("text")
-                pattern = above1 + "O" + below1
-                if pattern == "SOS":
-                    print("-\nx\n-")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x,y-1),(x,y+1),(x,y)])
-
-            # -     <- above1
-            #  x    
-            #   -   <- below1
-            if (y > 0 and y < board_dimension) and (x > 0 and x < board_dimension):
-                above1 = board[y-1][x-1].button_instance.cget("text")
-                below1 = board[y+1][x+1].button_instance.cget("text")
-                pattern = above1 + "O" + below1
-                if pattern == "SOS":
-                    print("-\n x\n  -")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x-1,y-1),(x+1,y+1),(x,y)])
-            
-            # v  left1
-            # -x-   
-            #   ^  right1
-            if x > 0 and x < board_dimension:
-                left1  = board[y][x-1].button_instance.cget("text")
-                right1 = board[y][x+1].button_instance.cget("text")
-                pattern = left1 + "O" + right1
-                if pattern == "SOS":
-                    print("-x-")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x-1,y),(x+1,y),(x,y)])
-            
-            #   -   <- above1
-            #  x    
-            # -     <- below1
-            if (y > 0 and y < board_dimension) and (x > 0 and x < board_dimension):
-                above1 = board[y-1][x+1].button_instance.cget("text")
-                below1 = board[y+1][x-1].button_instance.cget("text")
-                pattern = above1 + "O" + below1
-                if pattern == "SOS":
-                    print("  -\n x\n-")
-                    points_gained += 1
-                    if not analysis_only: 
-                        self.__update_SOS_buttons([(x+1,y-1),(x-1,y+1),(x,y)])
+
+        # The board model checks every direction around the tile; each result is one SOS.
+        sos_found = board.find_sos(x, y, letter)
+        for sos_coords in sos_found:
+            if not analysis_only:
+                if instrumentation.enabled:
+                    start, end = min(sos_coords), max(sos_coords)
+                    instrumentation.event("sos", player=self.current_player_number_variable.get(),
+                                          letter=letter, cells=list(sos_coords),
+                                          direction=((end[0] - start[0]) // 2, (end[1] - start[1]) // 2))
+                self.__update_SOS_buttons(list(sos_coords))
+        points_gained = len(sos_found)
 
         return (points_gained != 0), points_gained
 
 class GUILogic:
     def __init__(self):
             self.master = None
+            self.board_canvas = None
+            self.worker_poll_ms = 15
+            self.cancel_event = threading.Event()
+            self.__worker_generation = 0
+            self.__worker_executor = None
+            self.__batch_depth = 0
+            self.__pending_updates = {}
             self.color_dict = {"blue": "#70b8fa", "red": "#e94444", "purple": "#ca80e2"}
             
             self.default_font =     "Times New Roman"
@@ -461,26 +784,133 @@ class GUILogic:
     def create_popup(self, title, message) -> None:
         msgbox.showinfo(parent=self.master, title=title, message=message)
 
+    def run_in_worker(self, task, on_done) -> None:
+        """
+            Runs task() on a worker thread so the window keeps redrawing, then calls
+            on_done(result) on the Tk loop. The worker is polled with master.after, since Tk
+            must only be touched from its own thread.
+        """
+        if self.__worker_executor == None:
+            self.__worker_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sos-ai")
+        future = self.__worker_executor.submit(task)
+        generation = self.__worker_generation
+        self.master.after(self.worker_poll_ms, lambda: self.__poll_worker(future, on_done, generation))
+
+    def __poll_worker(self, future, on_done, generation:int) -> None:
+        if generation != self.__worker_generation:
+            return # cancelled
+        if not future.done():
+            self.master.after(self.worker_poll_ms, lambda: self.__poll_worker(future, on_done, generation))
+            return
+        on_done(future.result())
+
+    def cancel_pending_work(self) -> None:
+        """
+            Drops the result of any task still running in the worker and signals cancel_event so
+            searches that watch it stop early.
+        """
+        self.__worker_generation += 1
+        self.cancel_event.set()
+        self.cancel_event = threading.Event()
+
+    def begin_batch(self) -> None:
+        """
+            Starts collecting button updates instead of writing them. Batches nest; the updates
+            are written when the outermost batch is flushed.
+        """
+        self.__batch_depth += 1
+
+    def flush_updates(self) -> None:
+        """
+            Ends a batch. When the outermost batch ends, every changed tile gets one config call
+            with its final options.
+        """
+        self.__batch_depth = max(0, self.__batch_depth - 1)
+        if self.__batch_depth > 0:
+            return
+        pending_updates, self.__pending_updates = self.__pending_updates, {}
+        if not pending_updates:
+            return
+        with instrumentation.phase("rendering"):
+            for tile, options in pending_updates.items():
+                tile.button_instance.config(**options)
+
     def config_button(self, tile:Tile, letter:str = None, new_state = None, new_color= None) -> None:
         """
             letter: "S" or "O".
             new_state: "disabled" or "active"
+            \nOptions the button already has are not written again, and inside a batch the
+            write waits for flush_updates().
         """
-        if letter != None: tile.button_instance.config(text=letter)
+        options = {}
+        if letter != None: options["text"] = letter
 
         if new_state != None:
             if new_state == "disabled":
-                tile.button_instance.config(state=tk.DISABLED)
+                options["state"] = tk.DISABLED
             elif new_state == "active":
-                tile.button_instance.config(state=tk.ACTIVE)
+                options["state"] = tk.ACTIVE
         
         if new_color != None:
-            curr_color = tile.button_instance.cget("bg")
+            curr_color = tile.button_options.get("bg", "white")
+            options["disabledforeground"] = "white"
             if (curr_color != self.color_dict[new_color]) and (curr_color != "white"):
-                tile.button_instance.config(disabledforeground="white", bg=self.color_dict["purple"])
+                options["bg"] = self.color_dict["purple"]
             else:
-                tile.button_instance.config(disabledforeground="white", bg=self.color_dict[new_color])
-        
+                options["bg"] = self.color_dict[new_color]
+
+        self.__write_options(tile, options)
+
+    def restore_button(self, tile:Tile, letter:str, colors:list[str]) -> None:
+        """
+            Puts a button back the way it looks with letter on it ("" for an empty, clickable
+            tile) and colors, the player colors of the SOS lines still through it. Used by undo.
+        """
+        options = {"text": letter, "state": tk.DISABLED if letter != "" else tk.NORMAL}
+        if not colors:
+            for option in ("bg", "disabledforeground"):
+                if option in tile.default_options:
+                    options[option] = tile.default_options[option]
+        else:
+            options["disabledforeground"] = "white"
+            options["bg"] = self.color_dict[colors[0] if len(set(colors)) == 1 else "purple"]
+        self.__write_options(tile, options)
+
+    def tint_button(self, tile:Tile, color:str = None) -> None:
+        """
+            Sets the background of a tile to color, or back to its default if color is None.
+            Used for the heatmap.
+        """
+        self.__write_options(tile, {"bg": color if color != None else tile.default_options.get("bg", "white")})
+
+    def __write_options(self, tile:Tile, options:dict) -> None:
+        changed = {option: value for option, value in options.items() if tile.button_options.get(option) != value}
+        if not changed:
+            return
+        for option in changed:
+            if option not in tile.default_options and option not in tile.button_options:
+                tile.default_options[option] = tile.button_instance.cget(option)
+        tile.button_options.update(changed)
+        if self.__batch_depth > 0:
+            self.__pending_updates.setdefault(tile, {}).update(changed)
+        else:
+            tile.button_instance.config(**changed)
+
+    def draw_sos_line(self, coords, color:str) -> None:
+        """
+            Draws a line through an SOS when the board is drawn on a canvas. Button boards show
+            an SOS through the button colors only.
+        """
+        if self.board_canvas != None:
+            self.board_canvas.draw_sos_line(coords, color)
+
+    def remove_sos_lines(self, count:int) -> None:
+        """
+            Removes the count most recently drawn SOS lines, when their moves are undone.
+        """
+        if self.board_canvas != None and count > 0:
+            self.board_canvas.remove_last_sos_lines(count)
+
     def create_check_buttons(self, master:tk.Frame, pad:int, label_text:str, check_buttons_content:list[dict]) -> tk.Frame:
         """
             Creates check buttons. Check buttons content should be [ { text: str, variable: xVar() } ]
@@ -0,0 +1,185 @@
+"""
+    In-memory replacements for the tkinter pieces SOSGameLogic uses, so whole games can be played
+    without a display. Pass this module as the backend: SOSGameLogic(backend=headless).
+    \nNothing here touches Tk, so tests built on create_game need no display and can run in
+    parallel, e.g. python -m pytest -n auto app_unittest.py with pytest-xdist.
+"""
+
+import collections
+import random
+import sys
+import time
+import instrumentation
+from game_logic import SOSGameLogic, GUILogic, Tile
+
+class Variable:
+    """
+        Stand-in for tk.Variable that simply holds a value.
+    """
+    default_value = ""
+
+    def __init__(self, master = None, value = None, name:str = None):
+        self.value = self.default_value if value == None else value
+
+    def get(self):
+        return self.value
+
+    def set(self, value) -> None:
+        self.value = value
+
+class IntVar(Variable):
+    default_value = 0
+
+class StringVar(Variable):
+    default_value = ""
+
+class BooleanVar(Variable):
+    default_value = False
+
+class Button:
+    """
+        Stand-in for a tile's tk.Button. It keeps the options GUILogic writes (text, state, bg,
+        disabledforeground) and invoke() calls command like a click on an enabled button.
+    """
+    def __init__(self, master = None, command = None, **options):
+        self.options = {"text": "", "state": "normal", "bg": "white", "disabledforeground": "gray40"}
+        self.options.update(options)
+        self.command = command
+
+    def config(self, **options) -> None:
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, option:str):
+        return self.options[option]
+
+    def invoke(self) -> None:
+        if self.options["state"] != "disabled" and self.command != None:
+            self.command()
+
+class HeadlessMaster:
+    """
+        Stand-in for the game board window. after() queues the callback instead of waiting, and
+        run() calls the queued callbacks in order until the queue is empty or the window is
+        destroyed. Queuing keeps long computer-vs-computer games from recursing.
+    """
+    def __init__(self):
+        self.pending = collections.deque()
+        self.destroyed = False
+
+    def after(self, delay_ms:int, callback = None, *args) -> str:
+        self.pending.append((callback, args))
+        return f"after#{len(self.pending)}"
+
+    def destroy(self) -> None:
+        self.destroyed = True
+
+    def run_once(self) -> bool:
+        """
+            Runs the oldest queued callback. Returns False if there was nothing to run.
+        """
+        if not self.pending or self.destroyed:
+            return False
+        callback, args = self.pending.popleft()
+        callback(*args)
+        return True
+
+    def run(self) -> None:
+        """
+            Runs queued callbacks until nothing is left or the game is over.
+        """
+        while self.run_once():
+            pass
+
+class HeadlessGUI(GUILogic):
+    """
+        GUILogic without widgets: popups are recorded and worker tasks run right away on the
+        calling thread. Button updates are written to tiles that have a Button and dropped for
+        tiles that have none.
+    """
+    def __init__(self):
+        super().__init__()
+        self.master = HeadlessMaster()
+        self.popups = []
+
+    def create_popup(self, title, message) -> None:
+        self.popups.append((title, message))
+
+    def run_in_worker(self, task, on_done) -> None:
+        on_done(task())
+
+    def config_button(self, tile:Tile, letter:str = None, new_state = None, new_color = None) -> None:
+        if tile.button_instance != None:
+            super().config_button(tile, letter, new_state, new_color)
+
+    def restore_button(self, tile:Tile, letter:str, colors:list[str]) -> None:
+        if tile.button_instance != None:
+            super().restore_button(tile, letter, colors)
+
+    def tint_button(self, tile:Tile, color:str = None) -> None:
+        if tile.button_instance != None:
+            super().tint_button(tile, color)
+
+def create_game(board_dimension:int, match_type:str = "Simple", blue_player_type:str = "Computer",
+                red_player_type:str = "Computer", board_engine:str = "Dict",
+                move_time_budget_ms:int = None, tablebases:list = (), buttons:bool = False) -> SOSGameLogic:
+    """
+        Creates a headless SOSGameLogic with an empty board of Tiles. Players are created but
+        the first turn is not started. move_time_budget_ms overrides the per-move time budget
+        setting, and search players play from any of tablebases that fits the game.
+        \nWith buttons, every Tile gets a Button wired to on_tile_click, as the game window does;
+        without, the Tiles have none and button updates cost nothing.
+    """
+    game_logic = SOSGameLogic(backend=sys.modules[__name__])
+    game_logic.gui = HeadlessGUI()
+    game_logic.config_match_type.set(match_type)
+    game_logic.config_blue_player_type.set(blue_player_type)
+    game_logic.config_red_player_type.set(red_player_type)
+    game_logic.config_board_engine.set(board_engine)
+    for tablebase in tablebases:
+        game_logic.add_tablebase(tablebase)
+    if move_time_budget_ms != None:
+        game_logic.config_move_time_budget.set(move_time_budget_ms)
+    game_logic.game_board_dimension_variable.set(board_dimension)
+    game_logic.board_dimension = board_dimension
+    game_logic.board_size = board_dimension * board_dimension
+    game_logic.reset_board(board_dimension)
+    for y in range(board_dimension):
+        game_logic.gameboard_tile_instance_dict[y] = {}
+        for x in range(board_dimension):
+            tile = Tile(x_coord = x, y_coord = y)
+            if buttons:
+                tile.set_button_instance(Button(command=lambda tile = tile: game_logic.on_tile_click(tile)))
+            game_logic.gameboard_tile_instance_dict[y][x] = tile
+    game_logic.create_players()
+    return game_logic
+
+def play_game(board_dimension:int, match_type:str = "Simple", seed:int = None,
+              blue_player_type:str = "Computer", red_player_type:str = "Computer",
+              board_engine:str = "Dict", move_time_budget_ms:int = None, move_log = None,
+              tablebases:list = ()) -> dict:
+    """
+        Plays one full game headlessly and returns its result:
+        { "winner": 0 (tie), 1 or 2, "scores": (blue, red), "moves": int, "seconds": float }.
+        With instrumentation enabled the result also holds "timings", the game's
+        instrumentation.summary(). If move_log (a move_log.MoveLogWriter) is given, the game
+        is recorded in it.
+    """
+    if seed != None:
+        random.seed(seed)
+    game_logic = create_game(board_dimension, match_type, blue_player_type, red_player_type,
+                             board_engine, move_time_budget_ms, tablebases)
+    game_logic.move_log = move_log
+    start = time.perf_counter()
+    game_logic.reset_state()
+    game_logic.gui.master.run()
+    seconds = time.perf_counter() - start
+
+    blue_score, red_score = game_logic.player_dict[1].score, game_logic.player_dict[2].score
+    winner = 0 if blue_score == red_score else (1 if blue_score > red_score else 2)
+    result = {"winner": winner, "scores": (blue_score, red_score),
+              "moves": game_logic.occupied_tile_count, "seconds": seconds}
+    if instrumentation.enabled:
+        result["timings"] = instrumentation.summary()
+    return result
@@ -0,0 +1,142 @@
+"""
+    Optional instrumentation for the SOS game: structured events (SOS formed, score changes, ...)
+    and per-phase timers. It is off by default and then costs one flag check per call site.
+    \nTurn it on with enable(), the --instrument flag of main.py and simulate.py, or the
+    SOS_INSTRUMENT environment variable (any value other than "" or "0").
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+# Phases timed by the game. Timers for other names work too; these are just always reported.
+PHASES = ("move scan", "analysis", "rendering", "ai selection")
+
+enabled = os.environ.get("SOS_INSTRUMENT", "") not in ("", "0")
+events = []
+phase_totals = {}
+event_stream = None
+dump_game_summaries = True
+_lock = threading.Lock()
+
+class _PhaseTimer:
+    """
+        Context manager adding the time spent inside it to phase_totals[name].
+    """
+    def __init__(self, name:str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullTimer:
+    """
+        Context manager that does nothing, handed out while instrumentation is off.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def enable(stream = None, game_summaries:bool = True) -> None:
+    """
+        Turns instrumentation on. If stream is given, every event is also written to it as one
+        line of JSON. game_summaries chooses whether dump_summary() writes anything, so bulk
+        runs can collect summary() results instead.
+    """
+    global enabled, event_stream, dump_game_summaries
+    enabled = True
+    event_stream = stream
+    dump_game_summaries = game_summaries
+
+def disable() -> None:
+    """
+        Turns instrumentation off. Recorded events and timings are kept until reset().
+    """
+    global enabled, event_stream
+    enabled = False
+    event_stream = None
+
+def reset() -> None:
+    """
+        Forgets the recorded events and timings, e.g. at the start of a game.
+    """
+    with _lock:
+        events.clear()
+        phase_totals.clear()
+
+def event(kind:str, **fields) -> None:
+    """
+        Records a structured event: { "event": kind, "time": perf_counter(), **fields }.
+        Call sites should check enabled first so building the fields costs nothing while off.
+    """
+    if not enabled:
+        return
+    record = {"event": kind, "time": time.perf_counter(), **fields}
+    with _lock:
+        events.append(record)
+    if event_stream != None:
+        event_stream.write(json.dumps(record) + "\n")
+
+def phase(name:str):
+    """
+        Returns a context manager timing one run of a phase; a shared no-op one while off.
+        \nUsage: with instrumentation.phase("analysis"): ...
+    """
+    return _PhaseTimer(name) if enabled else _NULL_TIMER
+
+def add_time(name:str, seconds:float) -> None:
+    """
+        Adds one timed run of a phase. Safe to call from worker threads.
+    """
+    with _lock:
+        count, total = phase_totals.get(name, (0, 0.0))
+        phase_totals[name] = (count + 1, total + seconds)
+
+def summary() -> dict:
+    """
+        Returns the timings and event counts recorded since the last reset():
+        { "phases": { name: { "count", "seconds", "mean_ms" } }, "events": { kind: count } }.
+    """
+    with _lock:
+        totals = dict(phase_totals)
+        recorded = list(events)
+    phases = {}
+    for name in list(PHASES) + sorted(set(totals) - set(PHASES)):
+        count, seconds = totals.get(name, (0, 0.0))
+        phases[name] = {"count": count, "seconds": seconds,
+                        "mean_ms": seconds * 1000 / count if count else 0.0}
+    event_counts = {}
+    for record in recorded:
+        event_counts[record["event"]] = event_counts.get(record["event"], 0) + 1
+    return {"phases": phases, "events": event_counts}
+
+def format_summary(game_summary:dict) -> str:
+    """
+        Formats a summary() result as a small table.
+    """
+    lines = ["phase           calls    total ms   mean ms"]
+    for name, timing in game_summary["phases"].items():
+        lines.append(f"{name:<14}{timing['count']:>7}{timing['seconds'] * 1000:>12.2f}{timing['mean_ms']:>10.3f}")
+    if game_summary["events"]:
+        lines.append("events: " + ", ".join(f"{kind} {count}" for kind, count in sorted(game_summary["events"].items())))
+    return "\n".join(lines)
+
+def dump_summary(stream = None) -> None:
+    """
+        Writes the timing summary of the current game to stream (standard error by default).
+    """
+    if not enabled or not dump_game_summaries:
+        return
+    (stream or sys.stderr).write(format_summary(summary()) + "\n")
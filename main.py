@@ -2,10 +2,20 @@
 This module contains the main SOS game and GUI logic.
 """
 
+import argparse
+import sys
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox as msgbox
 from game_logic import SOSGameLogic, GUILogic, Tile
+from canvas_board import BoardCanvas
+import instrumentation
+import move_log
+from game_archive import GameArchive
+from tablebase import Tablebase
+import server
+
+SERVER_POLL_MS = 50
 
 # boilerplate from
 # https://stackoverflow.com/questions/17466561/what-is-the-best-way-to-structure-a-tkinter-application
@@ -27,10 +37,13 @@ class MainApplication(tk.Frame):
         self.game_logic.gui =   self.gui
         self.default_font = self.gui.default_font
         self.default_font_dict = self.gui.fonts
+        self.server_address_variable = tk.StringVar(value=f"127.0.0.1:{server.DEFAULT_PORT}")
+        self.server_table_variable = tk.IntVar(value=0)
 
         self.title_screen("SOS", self.__validate_and_start, [
             {"text": "Random size", "variable": self.game_logic.config_do_random_size },
-            {"text": "CLICKHOLD",   "variable": self.game_logic.config_do_clickhold   }
+            {"text": "CLICKHOLD",   "variable": self.game_logic.config_do_clickhold   },
+            {"text": "Canvas board (up to 100)", "variable": self.game_logic.config_use_canvas }
         ])
 
     def title_screen(self, title, start_button_function, game_options):
@@ -53,7 +66,7 @@ class MainApplication(tk.Frame):
         # Dimension / Size Change
         dimension_frame = tk.Frame(title_frame,padx=pad_size,pady=pad_size)
         ttk.Label(dimension_frame,
-                  text="Board size (3 to 15): ",
+                  text="Board size (3 to 15, 100 on canvas): ",
                   font=self.default_font_dict["Small_Default"],
                   anchor="w"
                   ).grid(row=0,column=0,sticky="W")
@@ -61,6 +74,33 @@ class MainApplication(tk.Frame):
                   textvariable=self.game_logic.game_board_dimension_variable,
                   font=self.default_font_dict["Small_Default"],
                   ).grid(row=0,column=1,sticky="EW")
+        ttk.Label(dimension_frame,
+                  text="Search depth (0 = no limit): ",
+                  font=self.default_font_dict["Small_Default"],
+                  anchor="w"
+                  ).grid(row=1,column=0,sticky="W")
+        ttk.Entry(dimension_frame,
+                  textvariable=self.game_logic.config_search_depth,
+                  font=self.default_font_dict["Small_Default"],
+                  ).grid(row=1,column=1,sticky="EW")
+        ttk.Label(dimension_frame,
+                  text="Search node limit (0 = none): ",
+                  font=self.default_font_dict["Small_Default"],
+                  anchor="w"
+                  ).grid(row=2,column=0,sticky="W")
+        ttk.Entry(dimension_frame,
+                  textvariable=self.game_logic.config_search_node_limit,
+                  font=self.default_font_dict["Small_Default"],
+                  ).grid(row=2,column=1,sticky="EW")
+        ttk.Label(dimension_frame,
+                  text="Move time budget (ms): ",
+                  font=self.default_font_dict["Small_Default"],
+                  anchor="w"
+                  ).grid(row=3,column=0,sticky="W")
+        ttk.Entry(dimension_frame,
+                  textvariable=self.game_logic.config_move_time_budget,
+                  font=self.default_font_dict["Small_Default"],
+                  ).grid(row=3,column=1,sticky="EW")
         dimension_frame.grid(row=3,column=0,columnspan=2,sticky="EW")
 
         # Checkbutton frame
@@ -76,13 +116,19 @@ class MainApplication(tk.Frame):
         # Radiobutton frame (Blue Player)
         self.gui.create_radio_button(title_frame, pad_size, "Blue Player", self.game_logic.config_blue_player_type, [
             {"text": "Human", "value": "Human"},
-            {"text": "Computer", "value": "Computer"}
+            {"text": "Computer", "value": "Computer"},
+            {"text": "Search", "value": "Search"},
+            {"text": "MCTS", "value": "MCTS"},
+            {"text": "Random", "value": "Random"}
         ]).grid(row=2,column=0,sticky="nsew")
 
         # Radiobutton frame (Red Player)
         self.gui.create_radio_button(title_frame, pad_size, "Red Player", self.game_logic.config_red_player_type, [
             {"text": "Human", "value": "Human"},
-            {"text": "Computer", "value": "Computer"}
+            {"text": "Computer", "value": "Computer"},
+            {"text": "Search", "value": "Search"},
+            {"text": "MCTS", "value": "MCTS"},
+            {"text": "Random", "value": "Random"}
         ]).grid(row=2,column=1,sticky="nsew")
 
         # Start button
@@ -91,6 +137,35 @@ class MainApplication(tk.Frame):
                    font=self.default_font_dict["Medium_Default"],
                    command=start_button_function
                    ).grid(row=4,column=0,columnspan=2,sticky="ew")
+
+        # Server frame
+        server_frame = tk.Frame(title_frame,padx=pad_size,pady=pad_size)
+        server_frame.columnconfigure([1],weight=1)
+        ttk.Label(server_frame,
+                  text="Server (host:port): ",
+                  font=self.default_font_dict["Small_Default"],
+                  anchor="w"
+                  ).grid(row=0,column=0,sticky="W")
+        ttk.Entry(server_frame,
+                  textvariable=self.server_address_variable,
+                  font=self.default_font_dict["Small_Default"],
+                  ).grid(row=0,column=1,sticky="EW")
+        ttk.Label(server_frame,
+                  text="Table to join (0 = new table): ",
+                  font=self.default_font_dict["Small_Default"],
+                  anchor="w"
+                  ).grid(row=1,column=0,sticky="W")
+        ttk.Entry(server_frame,
+                  textvariable=self.server_table_variable,
+                  font=self.default_font_dict["Small_Default"],
+                  ).grid(row=1,column=1,sticky="EW")
+        tk.Button(server_frame,
+                   text="Connect to server",
+                   font=self.default_font_dict["Small_Default"],
+                   command=lambda: self.connect_to_server(self.server_address_variable.get(),
+                                                          self.server_table_variable.get())
+                   ).grid(row=2,column=0,columnspan=2,sticky="ew")
+        server_frame.grid(row=5,column=0,columnspan=2,sticky="EW")
         title_frame.grid(row=0,column=0,sticky="nsew")
 
     def __validate_and_start(self):
@@ -101,6 +176,106 @@ class MainApplication(tk.Frame):
         else:
             msgbox.showerror("Invalid Dimension", "Please enter a valid board dimension.")
 
+    def replay_game(self, game:move_log.LoggedGame, delay_ms:int = 300) -> None:
+        """
+            Opens a board and replays a logged game on it, one move every delay_ms, checking
+            every move's points against the log.
+        """
+        self.game_logic.game_board_dimension_variable.set(game.board_dimension)
+        self.game_logic.config_use_canvas.set(game.board_dimension > 15)
+        self.game_logic.config_match_type.set(game.match_type)
+        self.game_logic.config_blue_player_type.set("Human")
+        self.game_logic.config_red_player_type.set("Human")
+        if not self.game_logic.dimension_validate():
+            msgbox.showerror("Invalid Dimension", "The logged board size is not supported.")
+            return
+        self.game_logic.create_players()
+        self.gui.master = self.game_board(game.board_dimension)
+        self.game_logic.reset_state()
+        replayer = move_log.MoveReplayer(self.game_logic, game)
+
+        def replay_next_move():
+            try:
+                moves_left = replayer.step()
+            except move_log.ReplayMismatch as error:
+                msgbox.showerror("Replay mismatch", str(error))
+                return
+            if moves_left:
+                self.gui.master.after(delay_ms, replay_next_move)
+        if game.moves:
+            self.gui.master.after(delay_ms, replay_next_move)
+
+    def connect_to_server(self, address:str, table_id:int = 0) -> None:
+        """
+            Connects to an SOS server and plays there: joins table_id, or creates a table with
+            the title screen's settings if it is 0 (the first human seat is ours). The board
+            opens once the server has seated us.
+        """
+        try:
+            host, port = server.parse_address(address)
+        except ValueError:
+            msgbox.showerror("Invalid Address", "Please enter the server address as host or host:port.")
+            return
+        if table_id <= 0 and not self.game_logic.dimension_validate():
+            msgbox.showerror("Invalid Dimension", "Please enter a valid board dimension.")
+            return
+        try:
+            connection = server.ServerConnection(host, port)
+        except OSError as error:
+            msgbox.showerror("Connection failed", f"Could not connect to {host}:{port}: {error}")
+            return
+        if table_id > 0:
+            connection.send({"type": "join", "table": table_id})
+        else:
+            connection.send({"type": "create", "size": self.game_logic.game_board_dimension_variable.get(),
+                             "match_type": self.game_logic.config_match_type.get(),
+                             "blue": self.game_logic.config_blue_player_type.get(),
+                             "red": self.game_logic.config_red_player_type.get()})
+        self.parent.after(SERVER_POLL_MS, lambda: self.__poll_server(connection))
+
+    def __poll_server(self, connection:server.ServerConnection) -> None:
+        for message in connection.messages():
+            self.__handle_server_message(connection, message)
+        if not connection.closed:
+            self.parent.after(SERVER_POLL_MS, lambda: self.__poll_server(connection))
+
+    def __handle_server_message(self, connection:server.ServerConnection, message:dict) -> None:
+        kind = message["type"]
+        if kind == "joined":
+            # Mirror the table locally with two human seats; the server decides every move.
+            connection.seat = message["seat"]
+            self.game_logic.game_board_dimension_variable.set(message["size"])
+            self.game_logic.config_use_canvas.set(message["size"] > 15)
+            self.game_logic.config_match_type.set(message["match_type"])
+            self.game_logic.config_blue_player_type.set("Human")
+            self.game_logic.config_red_player_type.set("Human")
+            self.game_logic.dimension_validate()
+            self.game_logic.create_players()
+            self.game_logic.remote = connection
+            self.gui.master = self.game_board(message["size"])
+            self.gui.master.title(f"{self.gui.master.title()} || table {message['table']}")
+            self.game_logic.reset_state()
+            for x, y, letter, _, _ in message["moves"]:
+                self.game_logic.play_move(x, y, letter)
+            if not message["started"]:
+                self.game_logic.thinking_variable.set("waiting for players…")
+        elif kind == "start":
+            self.game_logic.thinking_variable.set("")
+        elif kind == "move":
+            self.game_logic.play_move(message["x"], message["y"], message["letter"])
+        elif kind == "game_over":
+            # The local rules have ended the game as well and shown the result.
+            self.game_logic.remote = None
+            connection.close()
+        elif kind == "left":
+            msgbox.showinfo("Player left", f"{'Blue' if message['seat'] == 1 else 'Red'} has left the table.")
+        elif kind == "error":
+            msgbox.showerror("Server", message["message"])
+        elif kind == "disconnected" and not connection.closed:
+            self.game_logic.remote = None
+            connection.close()
+            msgbox.showerror("Server", "The connection to the server was lost.")
+
     def game_board(self, board_dimension:int):
         """
             Creates a game board with a given board size.
@@ -114,6 +289,7 @@ class MainApplication(tk.Frame):
         new_window.columnconfigure([1],weight=1)
         new_window.geometry(f"{board_side_length+300}x{(int) (board_side_length)}")
         new_window.resizable(False,False)
+        new_window.protocol("WM_DELETE_WINDOW", lambda: self.__close_game_board(new_window))
 
         self.__playing_field(new_window, board_dimension, board_side_length).grid(row=0,column=1,sticky="nsew",rowspan=2)
         self.__player_tab(new_window,1).grid(row=0,column=0,sticky="NSEW")
@@ -122,8 +298,21 @@ class MainApplication(tk.Frame):
 
         return new_window
 
+    def __close_game_board(self, window:tk.Toplevel):
+        self.gui.cancel_pending_work()
+        if self.game_logic.remote != None:
+            self.game_logic.remote.close()
+            self.game_logic.remote = None
+        if self.game_logic.move_log != None: self.game_logic.move_log.flush()
+        self.game_logic.close_players()
+        window.destroy()
+
     def __playing_field(self, master:tk.Frame, board_dimension, board_side_length):
+        if self.game_logic.config_use_canvas.get():
+            return self.__canvas_playing_field(master, board_dimension, board_side_length)
+        self.gui.board_canvas = None
         button_side_length = board_side_length // board_dimension
+        self.game_logic.reset_board(board_dimension)
         
         game_board_frame = tk.Frame(master, bg="white")
         game_board_frame.grid_propagate(False)
@@ -151,6 +340,19 @@ class MainApplication(tk.Frame):
             game_board_frame.rowconfigure(row_index,weight=1)
         return game_board_frame
 
+    def __canvas_playing_field(self, master:tk.Frame, board_dimension, board_side_length):
+        self.game_logic.reset_board(board_dimension)
+        tile_dict = self.game_logic.gameboard_tile_instance_dict
+        board_canvas = BoardCanvas(master, board_dimension, board_side_length, self.default_font,
+                                   lambda x, y: self.game_logic.on_tile_click(tile_dict[y][x]))
+        for row_index in range(board_dimension):
+            tile_dict[row_index] = {}
+            for column_index in range(board_dimension):
+                tile_dict[row_index][column_index] = Tile(board_canvas.cells[(column_index, row_index)],
+                                                          x_coord = column_index, y_coord = row_index)
+        self.gui.board_canvas = board_canvas
+        return board_canvas
+
     def __player_tab(self, master:tk.Frame, player_number:int):
         frame = tk.Frame(master=master, relief="raised", border=2, padx=15, pady=10, width=150)
         frame.grid_propagate(False)
@@ -189,6 +391,10 @@ class MainApplication(tk.Frame):
                   textvariable=self.game_logic.current_player_name_variable,
                   font=self.default_font_dict["Medium_Default"]
                   ).grid(row=1,column=0,sticky="NEW")
+        ttk.Label(master=frame,
+                  textvariable=self.game_logic.thinking_variable,
+                  font=self.default_font_dict["Small_Default"]
+                  ).grid(row=1,column=0,sticky="SEW")
         ttk.Label(master=frame,
                   text="LETTER",
                   font=self.default_font_dict["Small_Default"]
@@ -211,6 +417,17 @@ class MainApplication(tk.Frame):
                         indicatoron=False,
                         pady=32
                         ).grid(row=4,column=0,sticky="new")
+        ttk.Button(master=frame,
+                   text="Undo",
+                   command=self.game_logic.undo_turn
+                   ).grid(row=5,column=0,sticky="sew",pady=(10,0))
+        tk.Checkbutton(master=frame,
+                       text="Heatmap",
+                       variable=self.game_logic.config_show_heatmap,
+                       command=self.game_logic.refresh_heatmap,
+                       font=self.default_font_dict["Small_Default"],
+                       anchor="w"
+                       ).grid(row=6,column=0,sticky="sew")
         return frame
         
 
@@ -223,4 +440,32 @@ def initialize_application():
     return app
 
 if __name__ == "__main__":
-    initialize_application().mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="SOS game.")
+    parser.add_argument("--instrument", action="store_true",
+                        help="log game events to standard error and print phase timings after each game "
+                             "(also set by SOS_INSTRUMENT=1)")
+    parser.add_argument("--move-log", default=None, help="append every game played to this binary move log")
+    parser.add_argument("--archive", default=None, help="store every finished game in this game archive")
+    parser.add_argument("--tablebase", action="append", default=[],
+                        help="tablebase file search players play perfectly from (repeatable)")
+    parser.add_argument("--replay", default=None, help="replay a game from this move log")
+    parser.add_argument("--replay-game", type=int, default=0, help="which game of the log to replay (from 0)")
+    parser.add_argument("--replay-delay", type=int, default=300, help="milliseconds between replayed moves")
+    parser.add_argument("--connect", default=None, help="play on the SOS server at this host:port")
+    parser.add_argument("--table", type=int, default=0, help="table to join on the server (default: a new table)")
+    args = parser.parse_args()
+    if args.instrument:
+        instrumentation.enable(sys.stderr)
+    app = initialize_application()
+    if args.move_log != None:
+        app.game_logic.move_log = move_log.MoveLogWriter(args.move_log)
+    if args.archive != None:
+        app.game_logic.archive = GameArchive(args.archive)
+    for tablebase_path in args.tablebase:
+        app.game_logic.add_tablebase(Tablebase(tablebase_path))
+    if args.replay != None:
+        games = list(move_log.read_games(args.replay))
+        app.replay_game(games[args.replay_game], args.replay_delay)
+    if args.connect != None:
+        app.connect_to_server(args.connect, args.table)
+    app.mainloop()
\ No newline at end of file
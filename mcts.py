@@ -0,0 +1,281 @@
+"""
+    Monte Carlo Tree Search (UCT) for the SOS game. Each worker process grows its own tree from
+    the same root for the move's time budget (root parallelization), and the root statistics are
+    merged to pick the move.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from bitboard import BitBoard, iterate_bits
+
+class Playout:
+    """
+        A game position that can be played forward quickly: a BitBoard plus the scores, the player
+        to move and the match type. play() applies the same rules as
+        SOSGameLogic.process_turn_and_switch.
+    """
+    def __init__(self, board:BitBoard, scores:list[int], player_to_move:int, match_type:str):
+        self.board = board
+        self.scores = scores
+        self.player_to_move = player_to_move
+        self.match_type = match_type
+        self.game_over = board.empty_mask() == 0
+        self.empty_bits = list(iterate_bits(board.empty_mask()))
+
+    @classmethod
+    def from_snapshot(cls, snapshot:tuple) -> "Playout":
+        """
+            Rebuilds a position from snapshot(): (board_dimension, s_mask, o_mask, scores,
+            player_to_move, match_type).
+        """
+        board_dimension, s_mask, o_mask, scores, player_to_move, match_type = snapshot
+        board = BitBoard(board_dimension)
+        board.s_mask, board.o_mask = s_mask, o_mask
+        return cls(board, list(scores), player_to_move, match_type)
+
+    def snapshot(self) -> tuple:
+        """
+            Returns a small picklable tuple describing the position.
+        """
+        return (self.board.board_dimension, self.board.s_mask, self.board.o_mask,
+                tuple(self.scores), self.player_to_move, self.match_type)
+
+    def legal_moves(self) -> list[tuple[int,str]]:
+        """
+            Returns every (bit, letter) move.
+        """
+        return [(bit, letter) for bit in self.empty_bits for letter in ("S", "O")]
+
+    def play(self, bit:int, letter:str) -> int:
+        """
+            Places letter at bit for the player to move and returns the points gained.
+        """
+        points = self.board.count_sos_at(bit, letter)
+        self.board.place_bit(bit, letter)
+        if self.empty_bits[-1] == bit:
+            self.empty_bits.pop()
+        else:
+            self.empty_bits.remove(bit)
+        if points > 0:
+            self.scores[self.player_to_move - 1] += points
+        if (points > 0 and self.match_type == "Simple") or not self.empty_bits:
+            self.game_over = True
+        elif points == 0:
+            self.player_to_move = 2 if self.player_to_move == 1 else 1
+        return points
+
+    def winner(self) -> int:
+        """
+            Returns 1 or 2 for the player ahead on points, or 0 for a tie.
+        """
+        if self.scores[0] == self.scores[1]:
+            return 0
+        return 1 if self.scores[0] > self.scores[1] else 2
+
+    def play_out(self, rng:random.Random, greedy:bool) -> int:
+        """
+            Plays random moves (or, if greedy, the first scoring move found when there is one)
+            until the game ends. Returns the winner.
+        """
+        while not self.game_over:
+            move = self.__scoring_move(rng) if greedy else None
+            if move == None:
+                index = rng.randrange(len(self.empty_bits))
+                # Swap the chosen cell to the end so removing it in play() is O(1).
+                self.empty_bits[index], self.empty_bits[-1] = self.empty_bits[-1], self.empty_bits[index]
+                move = (self.empty_bits[-1], rng.choice("SO"))
+            self.play(*move)
+        return self.winner()
+
+    def __scoring_move(self, rng:random.Random):
+        for letter in rng.sample(("S", "O"), 2):
+            for mask in self.board.scoring_masks(letter):
+                if mask:
+                    bit = (mask & -mask).bit_length() - 1
+                    return bit, letter
+        return None
+
+class TreeNode:
+    """
+        One node of the search tree. wins are counted for player_just_moved, the player who made
+        the move leading here.
+    """
+    def __init__(self, move, parent, player_just_moved:int, untried_moves:list):
+        self.move = move
+        self.parent = parent
+        self.player_just_moved = player_just_moved
+        self.untried_moves = untried_moves
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration:float) -> "TreeNode":
+        """
+            Returns the child with the highest UCT value.
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits
+                   + exploration * math.sqrt(log_visits / child.visits))
+
+# How often a search polls its stop event: every STOP_CHECK_ROLLOUTS playouts in a tree, and
+# every STOP_POLL_SECONDS while waiting on the worker pool.
+STOP_CHECK_ROLLOUTS = 16
+STOP_POLL_SECONDS = 0.02
+
+def grow_tree(snapshot:tuple, time_budget:float, max_rollouts:int, seed:int,
+              greedy_playouts:bool, exploration:float = 1.4, stop_event = None) -> dict:
+    """
+        Runs UCT from snapshot until time_budget seconds pass or max_rollouts playouts are done
+        (whichever is set and comes first), or stop_event (a threading or multiprocessing Event)
+        is set.
+        \nReturns { "root": { move: (visits, wins) }, "rollouts": int, "tree_size": int }.
+    """
+    rng = random.Random(seed)
+    root_position = Playout.from_snapshot(snapshot)
+    root_moves = root_position.legal_moves()
+    rng.shuffle(root_moves)
+    root = TreeNode(None, None, 2 if root_position.player_to_move == 1 else 1, root_moves)
+    tree_size = 1
+    rollouts = 0
+    deadline = time.perf_counter() + time_budget if time_budget else None
+
+    # At least one playout always runs, so the root has a child to return.
+    while True:
+        node = root
+        position = Playout.from_snapshot(snapshot)
+
+        # Selection
+        while not node.untried_moves and node.children:
+            node = node.select_child(exploration)
+            position.play(*node.move)
+
+        # Expansion
+        if node.untried_moves and not position.game_over:
+            move = node.untried_moves.pop()
+            mover = position.player_to_move
+            position.play(*move)
+            child_moves = [] if position.game_over else position.legal_moves()
+            rng.shuffle(child_moves)
+            child = TreeNode(move, node, mover, child_moves)
+            node.children.append(child)
+            node = child
+            tree_size += 1
+
+        # Simulation
+        winner = position.play_out(rng, greedy_playouts)
+        rollouts += 1
+
+        # Backpropagation
+        while node != None:
+            node.visits += 1
+            if winner == node.player_just_moved:
+                node.wins += 1.0
+            elif winner == 0:
+                node.wins += 0.5
+            node = node.parent
+
+        if max_rollouts and rollouts >= max_rollouts:
+            break
+        if rollouts % STOP_CHECK_ROLLOUTS == 0 and stop_event != None and stop_event.is_set():
+            break
+        if deadline != None and time.perf_counter() >= deadline:
+            break
+        if not max_rollouts and deadline == None:
+            break
+
+    return {"root": {child.move: (child.visits, child.wins) for child in root.children},
+            "rollouts": rollouts, "tree_size": tree_size}
+
+_worker_stop_event = None # set in each pool worker by _init_worker
+
+def _init_worker(stop_event) -> None:
+    global _worker_stop_event
+    _worker_stop_event = stop_event
+
+def _grow_tree_in_worker(*arguments) -> dict:
+    return grow_tree(*arguments, stop_event=_worker_stop_event)
+
+class MonteCarloTreeSearch:
+    """
+        Root-parallel UCT. With more than one worker, each worker grows its own tree in a process
+        pool for the whole budget and the root visit counts are summed.
+        \nWorker i of move number m is seeded with seed + m * workers + i, so searches limited by
+        max_rollouts are reproducible.
+        \nIf stop_event (a threading.Event) is set, the trees stop growing and the search returns
+        the best move found so far. Pool workers learn of it through an Event shared with them
+        when the pool starts.
+    """
+    def __init__(self, time_budget:float = 1.0, max_rollouts:int = None, workers:int = None,
+                 greedy_playouts:bool = True, seed:int = 0):
+        self.time_budget = time_budget
+        self.max_rollouts = max_rollouts
+        self.workers = workers if workers != None else (os.cpu_count() or 1)
+        self.greedy_playouts = greedy_playouts
+        self.seed = seed
+        self.move_number = 0
+        self.last_stats = {}
+        self.stop_event = None
+        self.__pool = None
+        self.__worker_stop_event = None
+
+    def __get_pool(self):
+        # Daemonic processes (e.g. simulator workers) may not start children; search in-process.
+        if self.workers <= 1 or multiprocessing.current_process().daemon:
+            return None
+        if self.__pool == None:
+            self.__worker_stop_event = multiprocessing.Event()
+            self.__pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                              initargs=(self.__worker_stop_event,))
+        return self.__pool
+
+    def close(self) -> None:
+        """
+            Shuts down the worker pool, if one was started.
+        """
+        if self.__pool != None:
+            self.__pool.shutdown(cancel_futures=True)
+            self.__pool = None
+
+    def search(self, snapshot:tuple) -> tuple[int,str]:
+        """
+            Searches the position described by snapshot (see Playout.snapshot) and returns the
+            most visited root move as (bit, letter). Statistics are kept in last_stats.
+        """
+        start = time.perf_counter()
+        pool = self.__get_pool()
+        seeds = [self.seed + self.move_number * self.workers + index for index in range(max(1, self.workers))]
+        self.move_number += 1
+        arguments = (self.time_budget, self.max_rollouts)
+        if pool == None:
+            results = [grow_tree(snapshot, *arguments, seeds[0], self.greedy_playouts, stop_event=self.stop_event)]
+        else:
+            futures = [pool.submit(_grow_tree_in_worker, snapshot, *arguments, seed, self.greedy_playouts)
+                       for seed in seeds]
+            pending = futures
+            while pending:
+                if self.stop_event != None and self.stop_event.is_set():
+                    self.__worker_stop_event.set()
+                _, pending = wait(pending, timeout=STOP_POLL_SECONDS if self.stop_event != None else None)
+            self.__worker_stop_event.clear()
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+        merged = {}
+        for result in results:
+            for move, (visits, wins) in result["root"].items():
+                total_visits, total_wins = merged.get(move, (0, 0.0))
+                merged[move] = (total_visits + visits, total_wins + wins)
+        rollouts = sum(result["rollouts"] for result in results)
+        self.last_stats = {
+            "rollouts":             rollouts,
+            "rollouts_per_second":  rollouts / elapsed if elapsed > 0 else float("inf"),
+            "tree_size":            sum(result["tree_size"] for result in results),
+            "seconds":              elapsed,
+            "workers":              len(results),
+        }
+        # Most visits first, then the better win rate; sorted moves keep ties deterministic.
+        return max(sorted(merged), key=lambda move: (merged[move][0], merged[move][1] / max(1, merged[move][0])))
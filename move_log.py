@@ -0,0 +1,274 @@
+"""
+    Compact binary log of SOS games, and a replay engine that re-runs logged games through
+    SOSGameLogic and checks every move's points.
+    \nA log is a stream of games. Each game is an 8-byte header followed by one 3-byte record per
+    move, so games can be appended while they are played and thousands of them stay small.
+    \nUsage: python move_log.py games.soslog   (replays every game headlessly and reports)
+"""
+
+import argparse
+import mmap
+import struct
+import time
+
+# Header: marker, version, board dimension, match type, blue player type, red player type.
+HEADER = struct.Struct("<HBHBBB")
+# Record: cell index (y * board_dimension + x), then letter | player << 1 | points << 2.
+RECORD = struct.Struct("<HB")
+HEADER_MARKER = 0xFFFF  # never a cell index, so a header can follow any record
+VERSION = 1
+MATCH_TYPES = ("Simple", "General")
+PLAYER_TYPES = ("Human", "Computer", "Search", "MCTS", "Random")
+LETTERS = ("S", "O")
+
+class ReplayMismatch(Exception):
+    """
+        Raised when a logged move cannot be replayed or gains different points than logged.
+    """
+
+class LoggedGame:
+    """
+        One game read from a log. moves holds (x, y, letter, player number, points gained).
+    """
+    def __init__(self, board_dimension:int, match_type:str, player_types:tuple[str,str], moves:list[tuple]):
+        self.board_dimension = board_dimension
+        self.match_type = match_type
+        self.player_types = player_types
+        self.moves = moves
+
+    def scores(self) -> tuple[int,int]:
+        """
+            Returns the final (blue, red) score according to the logged points.
+        """
+        totals = [0, 0]
+        for _, _, _, player, points in self.moves:
+            totals[player - 1] += points
+        return totals[0], totals[1]
+
+    def winner(self) -> int:
+        """
+            Returns 1 or 2 for the player ahead on the logged points, or 0 for a tie.
+        """
+        blue_score, red_score = self.scores()
+        return 0 if blue_score == red_score else (1 if blue_score > red_score else 2)
+
+def encode_move(board_dimension:int, x:int, y:int, letter:str, player:int, points:int) -> bytes:
+    """
+        Returns the 3-byte record of one move.
+    """
+    return RECORD.pack(y * board_dimension + x, LETTERS.index(letter) | (player - 1) << 1 | points << 2)
+
+def decode_move(board_dimension:int, cell:int, packed:int) -> tuple:
+    """
+        Returns (x, y, letter, player, points) from the two fields of a record.
+    """
+    y, x = divmod(cell, board_dimension)
+    return x, y, LETTERS[packed & 1], (packed >> 1 & 1) + 1, packed >> 2
+
+def encode_moves(board_dimension:int, moves:list[tuple]) -> bytes:
+    """
+        Returns the records of a whole move list, without a header.
+    """
+    return b"".join(encode_move(board_dimension, *move) for move in moves)
+
+def decode_moves(board_dimension:int, data:bytes) -> list[tuple]:
+    """
+        Returns the move list held in records made by encode_moves.
+    """
+    return [decode_move(board_dimension, cell, packed) for cell, packed in RECORD.iter_unpack(data)]
+
+class MoveLogWriter:
+    """
+        Writes games to a binary stream: a file name (opened for appending) or any writable
+        binary file object. The header and every move are written and flushed as soon as they
+        are made, so a game cut short by a crash or a closed window keeps every move played.
+        Undoing a move truncates its record, which needs a seekable stream.
+        \nA file whose last header or record was torn by a kill is cut back to its last whole one
+        when opened, so games appended after it stay aligned.
+    """
+    def __init__(self, target):
+        self.file = open(target, "ab") if isinstance(target, str) else target
+        self.owns_file = isinstance(target, str)
+        self.board_dimension = 0
+        self.game_moves = 0
+        if self.owns_file:
+            self.__drop_torn_tail()
+
+    def __drop_torn_tail(self) -> None:
+        size = self.file.seek(0, 2)
+        if size == 0:
+            return
+        with open(self.file.name, "rb") as log_file:
+            with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                length = complete_length(data)
+        if length < size:
+            self.file.truncate(length)
+
+    def start_game(self, board_dimension:int, match_type:str, blue_player_type:str, red_player_type:str) -> None:
+        """
+            Writes the header of a new game.
+        """
+        self.board_dimension = board_dimension
+        self.game_moves = 0
+        self.__write(HEADER.pack(HEADER_MARKER, VERSION, board_dimension, MATCH_TYPES.index(match_type),
+                                 PLAYER_TYPES.index(blue_player_type), PLAYER_TYPES.index(red_player_type)))
+
+    def record(self, x:int, y:int, letter:str, player:int, points:int) -> None:
+        """
+            Writes one move of the current game.
+        """
+        self.__write(encode_move(self.board_dimension, x, y, letter, player, points))
+        self.game_moves += 1
+
+    def unrecord(self) -> None:
+        """
+            Removes the last move of the current game from the stream, when it is undone.
+        """
+        if self.game_moves == 0:
+            return
+        end = self.file.seek(0, 2) - RECORD.size
+        self.file.truncate(end)
+        self.file.seek(end)
+        self.file.flush()
+        self.game_moves -= 1
+
+    def __write(self, data:bytes) -> None:
+        self.file.write(data)
+        self.file.flush()
+
+    def flush(self) -> None:
+        """
+            Flushes the stream.
+        """
+        self.file.flush()
+
+    def close(self) -> None:
+        """
+            Flushes, and closes the file if this writer opened it.
+        """
+        self.flush()
+        if self.owns_file:
+            self.file.close()
+
+def complete_length(data:bytes) -> int:
+    """
+        Returns the length of data up to the end of its last whole header or record.
+    """
+    offset, end = 0, len(data)
+    while offset + RECORD.size <= end:
+        size = HEADER.size if RECORD.unpack_from(data, offset)[0] == HEADER_MARKER else RECORD.size
+        if offset + size > end:
+            break
+        offset += size
+    return offset
+
+def parse_games(data:bytes):
+    """
+        Yields every LoggedGame in a log's bytes. A game cut short (e.g. the program closed or
+        crashed mid-game) is yielded with every move made before it stopped, since the writer
+        writes each move as it is played. A header or record cut off by the end of the data (the
+        process killed in the middle of a write) is dropped.
+    """
+    view = memoryview(data)
+    offset, end = 0, len(data)
+    game = None
+    while offset + RECORD.size <= end:
+        if RECORD.unpack_from(view, offset)[0] == HEADER_MARKER:
+            if offset + HEADER.size > end:
+                break
+            if game != None:
+                yield game
+            _, version, board_dimension, match_type, blue_type, red_type = HEADER.unpack_from(view, offset)
+            if version != VERSION:
+                raise ValueError(f"unsupported move log version {version}")
+            game = LoggedGame(board_dimension, MATCH_TYPES[match_type],
+                              (PLAYER_TYPES[blue_type], PLAYER_TYPES[red_type]), [])
+            offset += HEADER.size
+            continue
+        if game == None:
+            raise ValueError("move log does not start with a game header")
+        game.moves.append(decode_move(game.board_dimension, *RECORD.unpack_from(view, offset)))
+        offset += RECORD.size
+    if game != None:
+        yield game
+
+def read_games(path:str):
+    """
+        Yields every LoggedGame in a log file. The file is memory-mapped, so only the game being
+        parsed is held in memory.
+    """
+    with open(path, "rb") as log_file:
+        if log_file.seek(0, 2) == 0:
+            return
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from parse_games(data)
+
+class MoveReplayer:
+    """
+        Plays a LoggedGame's moves into a SOSGameLogic whose players are both human (so nobody
+        moves on their own), one step() at a time, checking each move against the log.
+    """
+    def __init__(self, game_logic, game:LoggedGame):
+        self.game_logic = game_logic
+        self.game = game
+        self.move_number = 0
+
+    def step(self) -> bool:
+        """
+            Replays the next move. Returns whether moves are left.
+        """
+        game_logic = self.game_logic
+        x, y, letter, player, points = self.game.moves[self.move_number]
+        if game_logic.current_player_number_variable.get() != player:
+            raise ReplayMismatch(f"move {self.move_number}: logged for player {player}, "
+                                 f"but it is player {game_logic.current_player_number_variable.get()}'s turn")
+        if not game_logic.game_board.in_bounds(x, y) or not game_logic.game_board.is_empty(x, y):
+            raise ReplayMismatch(f"move {self.move_number}: cell {(x, y)} is not free")
+        score_before = game_logic.player_dict[player].score
+        tile = game_logic.gameboard_tile_instance_dict[y][x]
+        game_logic.player_dict[player].make_move(tile, letter)
+        game_logic.process_turn_and_switch(tile, letter)
+        gained = game_logic.player_dict[player].score - score_before
+        if gained != points:
+            raise ReplayMismatch(f"move {self.move_number}: {letter} at {(x, y)} gained {gained}, logged {points}")
+        self.move_number += 1
+        return self.move_number < len(self.game.moves)
+
+def replay_headless(game:LoggedGame, board_engine:str = "Bitboard") -> dict:
+    """
+        Replays a game without a display as fast as possible, raising ReplayMismatch at the
+        first move that does not match the log.
+        \nReturns { "scores": (blue, red), "moves": int }.
+    """
+    import headless
+    game_logic = headless.create_game(game.board_dimension, game.match_type, "Human", "Human", board_engine)
+    game_logic.reset_state()
+    replayer = MoveReplayer(game_logic, game)
+    while replayer.move_number < len(game.moves):
+        replayer.step()
+    return {"scores": (game_logic.player_dict[1].score, game_logic.player_dict[2].score),
+            "moves": replayer.move_number}
+
+def main(argv:list[str] = None) -> None:
+    """
+        Replays every game of a log headlessly and reports mismatches and speed.
+    """
+    parser = argparse.ArgumentParser(description="Replay and verify an SOS move log.")
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+
+    games = moves = mismatches = 0
+    start = time.perf_counter()
+    for game in read_games(args.path):
+        games += 1
+        try:
+            moves += replay_headless(game)["moves"]
+        except ReplayMismatch as error:
+            mismatches += 1
+            print(f"game {games}: {error}")
+    elapsed = time.perf_counter() - start
+    print(f"{games} games, {moves} moves replayed, {mismatches} mismatches, "
+          f"{moves / elapsed if elapsed > 0 else 0:.0f} moves/second")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+    Vectorized whole-board SOS scoring with NumPy. Requires numpy; import it guarded when the
+    rest of the game should still work without it.
+    \nscore_positions scores whole stacks of positions at once, e.g. for offline analysis or
+    training evaluation functions, without any Tile or board model.
+"""
+
+import functools
+from typing import NamedTuple
+import numpy as np
+from triple_index import S_DIRECTIONS, O_DIRECTIONS, get_triple_index
+
+EMPTY = 0
+S = 1
+O = 2
+LETTER_CODES = {"": EMPTY, "S": S, "O": O}
+SNAPSHOT_CODES = {".": EMPTY, "S": S, "O": O}
+
+class BatchScores(NamedTuple):
+    """
+        Scores of a stack of N positions, n x n each:
+        \ns_gain, o_gain:  (N, n, n) int8, the points an S or an O placed in each cell would score.
+        \nbest_cell:       (N,) int32, the cell y * n + x of a highest scoring move, -1 on a full board.
+        \nbest_letter:     (N,) int8, S or O for that move (EMPTY on a full board).
+        \nbest_points:     (N,) int8, the points that move scores.
+        \nnext_player:     (N,) int8, who moves after it: the side to move again if it scores.
+        \nTies go to S before O, then to the lowest cell.
+    """
+    s_gain: np.ndarray
+    o_gain: np.ndarray
+    best_cell: np.ndarray
+    best_letter: np.ndarray
+    best_points: np.ndarray
+    next_player: np.ndarray
+
+def board_to_array(board) -> np.ndarray:
+    """
+        Converts a board model (anything with a cells[y][x] grid of "", "S" and "O") into an
+        int8 array indexed [y, x]: 0 = empty, 1 = S, 2 = O.
+    """
+    return np.array([[LETTER_CODES[letter] for letter in row] for row in board.cells], dtype=np.int8)
+
+def snapshots_to_array(snapshots) -> tuple[np.ndarray, np.ndarray]:
+    """
+        Converts game_board.PositionSnapshots of one board size into the input of
+        score_positions: ((N, n, n) int8 positions, (N,) int8 side to move).
+    """
+    snapshots = list(snapshots)
+    board_dimension = snapshots[0].board_dimension if snapshots else 0
+    positions = np.array([[SNAPSHOT_CODES[letter] for letter in snapshot.cells] for snapshot in snapshots],
+                         dtype=np.int8).reshape(len(snapshots), board_dimension, board_dimension)
+    return positions, np.array([snapshot.current_player for snapshot in snapshots], dtype=np.int8)
+
+@functools.lru_cache(maxsize=None)
+def _window_cells(width:int, height:int) -> np.ndarray:
+    # (windows, 3) array of the (end, middle, end) cells of every window of the board's TripleIndex.
+    return np.array(get_triple_index(width, height).windows, dtype=np.int32).reshape(-1, 3)
+
+def count_windows(counters, board) -> None:
+    """
+        Fills a new triple_index.WindowCounters with the counts, threats and gains of a board
+        model, every window at once instead of one placement at a time.
+    """
+    index = counters.index
+    letters = [letter for row in board.cells for letter in row]
+    codes = np.array([LETTER_CODES[letter] for letter in letters], dtype=np.int8)
+    window_cells = _window_cells(index.width, index.height)
+    window_codes = codes[window_cells]
+    s_count = (window_codes == S).sum(axis=1)
+    o_count = (window_codes == O).sum(axis=1)
+    empty_count = 3 - s_count - o_count
+    first, middle, _ = window_codes.T
+    # Two S ends around an empty middle need an O there; an O middle with one S end needs an S
+    # at the empty end.
+    needs_o = (empty_count == 1) & (s_count == 2) & (middle == EMPTY)
+    needs_s = (empty_count == 1) & (s_count == 1) & (middle == O)
+    o_windows = np.flatnonzero(needs_o)
+    s_windows = np.flatnonzero(needs_s)
+    o_cells = window_cells[o_windows, 1]
+    s_cells = np.where(first[s_windows] == EMPTY, window_cells[s_windows, 0], window_cells[s_windows, 2])
+
+    counters.letters = letters
+    counters.s_count = s_count.tolist()
+    counters.o_count = o_count.tolist()
+    counters.empty_count = empty_count.tolist()
+    counters.threats = dict(zip(o_windows.tolist(), zip(o_cells.tolist(), ["O"] * len(o_cells))))
+    counters.threats.update(zip(s_windows.tolist(), zip(s_cells.tolist(), ["S"] * len(s_cells))))
+    counters.gains = {"S": np.bincount(s_cells, minlength=len(letters)).tolist(),
+                      "O": np.bincount(o_cells, minlength=len(letters)).tolist()}
+
+def _shifted(padded:np.ndarray, dx:int, dy:int, height:int, width:int) -> np.ndarray:
+    # View of the padded boards moved by (dx, dy), so result[..., y, x] is board[..., y+dy, x+dx].
+    return padded[..., 2+dy:2+dy+height, 2+dx:2+dx+width]
+
+def _gains(boards:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # score_all_moves for a (N, height, width) stack of boards.
+    height, width = boards.shape[-2:]
+    # Two cells of empty padding keep the shifted views from wrapping around the edges.
+    padded = np.pad(boards, ((0, 0), (2, 2), (2, 2)), constant_values=EMPTY)
+    is_s = padded == S
+    is_o = padded == O
+
+    s_gain = np.zeros(boards.shape, dtype=np.int8)
+    for dx, dy in S_DIRECTIONS:
+        s_gain += (_shifted(is_o, dx, dy, height, width)
+                   & _shifted(is_s, 2*dx, 2*dy, height, width))
+
+    o_gain = np.zeros(boards.shape, dtype=np.int8)
+    for dx, dy in O_DIRECTIONS:
+        o_gain += (_shifted(is_s, -dx, -dy, height, width)
+                   & _shifted(is_s, dx, dy, height, width))
+
+    empty = boards == EMPTY
+    return s_gain * empty, o_gain * empty
+
+def score_all_moves(board_array:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+        Computes, for every cell at once, how many SOS placing an S and placing an O there would
+        complete. Occupied cells score 0.
+        \nReturns a tuple of two int8 arrays shaped like board_array: (S gains, O gains).
+    """
+    s_gain, o_gain = _gains(board_array[None])
+    return s_gain[0], o_gain[0]
+
+def score_position_chunks(positions:np.ndarray, side_to_move, chunk_size:int = 4096):
+    """
+        Scores a stack of positions chunk_size at a time, so the temporaries never grow past
+        one chunk. positions is an (N, n, n) array of EMPTY, S and O (int8, or anything that
+        converts; a np.memmap is read a chunk at a time), side_to_move 1 or 2, for all
+        positions or as an (N,) array.
+        \nYields (start, BatchScores) for positions[start:start + chunk_size].
+    """
+    if positions.ndim != 3:
+        raise ValueError(f"positions must be an (N, n, n) array, not shaped {positions.shape}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    side_to_move = np.broadcast_to(np.asarray(side_to_move, dtype=np.int8), positions.shape[:1])
+    if not np.isin(side_to_move, (1, 2)).all():
+        raise ValueError("side_to_move must be 1 or 2")
+    cells = positions.shape[1] * positions.shape[2]
+    for start in range(0, len(positions), chunk_size):
+        boards = np.asarray(positions[start:start + chunk_size], dtype=np.int8)
+        s_gain, o_gain = _gains(boards)
+        # Every move of a position in one row, S moves first; occupied cells can never be best.
+        moves = np.concatenate((s_gain.reshape(len(boards), cells), o_gain.reshape(len(boards), cells)), axis=1)
+        moves[np.tile(boards.reshape(len(boards), cells) != EMPTY, 2)] = -1
+        best_move = moves.argmax(axis=1)
+        best_points = moves[np.arange(len(boards)), best_move]
+        full = best_points < 0
+        best_cell = np.where(full, -1, best_move % cells).astype(np.int32)
+        best_letter = np.where(full, EMPTY, np.where(best_move < cells, S, O)).astype(np.int8)
+        sides = side_to_move[start:start + chunk_size]
+        next_player = np.where(best_points > 0, sides, 3 - sides).astype(np.int8)
+        yield start, BatchScores(s_gain, o_gain, best_cell, best_letter, np.maximum(best_points, 0), next_player)
+
+def score_positions(positions:np.ndarray, side_to_move, chunk_size:int = 4096) -> BatchScores:
+    """
+        Scores a whole stack of positions (see score_position_chunks) into one BatchScores.
+        For stacks whose results do not fit in memory, iterate score_position_chunks instead.
+    """
+    count = len(positions)
+    shape = positions.shape
+    result = BatchScores(np.zeros(shape, dtype=np.int8), np.zeros(shape, dtype=np.int8),
+                         np.full(count, -1, dtype=np.int32), np.zeros(count, dtype=np.int8),
+                         np.zeros(count, dtype=np.int8), np.zeros(count, dtype=np.int8))
+    for start, chunk in score_position_chunks(positions, side_to_move, chunk_size):
+        for output, values in zip(result, chunk):
+            output[start:start + len(values)] = values
+    return result
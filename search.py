@@ -0,0 +1,240 @@
+"""
+    Negamax search with alpha-beta pruning for the SOS game, backed by a Zobrist-hashed
+    transposition table. Positions are BitBoards so they are cheap to copy and hash.
+"""
+
+import random
+import time
+from bitboard import BitBoard, iterate_bits
+from triple_index import WindowCounters
+
+class SearchAborted(Exception):
+    """
+        Raised inside the search when the node limit, the time budget or a stop request is hit.
+    """
+
+class ZobristHasher:
+    """
+        Random 64-bit keys for every (cell, letter) pair of one board layout. The hash of a
+        position is the XOR of the keys of its letters, so placing or removing a letter is one XOR.
+    """
+    def __init__(self, board:BitBoard, seed:int = 449):
+        rng = random.Random(seed)
+        size = (board.board_dimension + 4) * board.stride
+        self.keys = [rng.getrandbits(64) for _ in range(size * 2)]
+
+    def key(self, bit:int, letter:str) -> int:
+        """
+            Returns the key of letter at a bit index.
+        """
+        return self.keys[bit * 2 + (0 if letter == "S" else 1)]
+
+    def hash_board(self, board:BitBoard) -> int:
+        """
+            Returns the hash of a whole position.
+        """
+        value = 0
+        for bit in iterate_bits(board.s_mask):
+            value ^= self.key(bit, "S")
+        for bit in iterate_bits(board.o_mask):
+            value ^= self.key(bit, "O")
+        return value
+
+class TranspositionTable:
+    """
+        Fixed-size table of search results. Every slot holds two entries: one kept for the
+        deepest search stored there and one that is always replaced by the newest result, so deep
+        results survive while recent ones are still found.
+        \nEntries are (key, depth, value, flag, best_move).
+    """
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    def __init__(self, size_bits:int = 16):
+        self.mask = (1 << size_bits) - 1
+        self.deep_entries = [None] * (self.mask + 1)
+        self.recent_entries = [None] * (self.mask + 1)
+
+    def probe(self, key:int):
+        """
+            Returns the stored entry for key, or None.
+        """
+        slot = key & self.mask
+        entry = self.deep_entries[slot]
+        if entry != None and entry[0] == key:
+            return entry
+        entry = self.recent_entries[slot]
+        if entry != None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key:int, depth:int, value:int, flag:int, best_move) -> None:
+        """
+            Stores a search result, replacing according to the depth-preferred/always-replace policy.
+        """
+        slot = key & self.mask
+        entry = (key, depth, value, flag, best_move)
+        deep = self.deep_entries[slot]
+        if deep == None or deep[0] == key or depth >= deep[1]:
+            if deep != None and deep[0] != key:
+                self.recent_entries[slot] = deep
+            self.deep_entries[slot] = entry
+        else:
+            self.recent_entries[slot] = entry
+
+class AlphaBetaSearch:
+    """
+        Negamax search over BitBoard positions. The value of a position is the points the player to
+        move will still gain minus the points the opponent will still gain.
+        \nThe rules match SOSGameLogic.process_turn_and_switch: scoring keeps the turn (so the
+        child is searched for the same player, without negation), and in a Simple match the
+        first SOS ends the game.
+    """
+    def __init__(self, board_dimension:int, match_type:str = "General", max_depth:int = 2,
+                 max_nodes:int = None, table_size_bits:int = 16, rng = random):
+        self.board_dimension = board_dimension
+        self.match_type = match_type
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.rng = rng
+        self.stop_event = None
+        self.hasher = ZobristHasher(BitBoard(board_dimension))
+        self.table = TranspositionTable(table_size_bits)
+        self.board = None
+        self.counters = None
+        self.bit_cells = {}
+        self.hash = 0
+        self.nodes = 0
+        self.deadline = None
+        self.completed_depth = 0
+        self.__iteration_depth = 0
+
+    def search(self, board, time_budget:float = None) -> tuple[int, tuple]:
+        """
+            Searches a copy of board (any board model) with iterative deepening: depth 1, 2, ...
+            up to max_depth (0 means no limit). Each iteration searches the previous iteration's
+            best moves first.
+            \nThe search stops when time_budget seconds pass, the node limit is reached or
+            stop_event (a threading.Event) is set, and returns the best move of the deepest
+            completed iteration as (value, (x, y, letter)). Depth 1 is always completed.
+        """
+        self.board = BitBoard.from_board(board)
+        self.counters = WindowCounters.from_board(self.board)
+        index = self.counters.index
+        self.bit_cells = {self.board.bit_index(x, y): cell for cell, (x, y) in enumerate(index.coords)}
+        self.hash = self.hasher.hash_board(self.board)
+        self.nodes = 0
+        self.deadline = time.perf_counter() + time_budget if time_budget else None
+        self.completed_depth = 0
+        moves = self.__ordered_moves(None, shuffle=True)
+        if not moves:
+            return 0, None
+
+        empty_count = len(moves) // 2
+        max_depth = min(self.max_depth, empty_count) if self.max_depth else empty_count
+        best_value, best_move = 0, moves[0][0]
+        for depth in range(1, max_depth + 1):
+            self.__iteration_depth = depth
+            try:
+                best_value, best_move, values = self.__search_root(moves, depth)
+            except SearchAborted:
+                break
+            self.completed_depth = depth
+            moves.sort(key=lambda move: -values[move[0]])
+        bit, letter = best_move
+        x, y = self.board.coord(bit)
+        return best_value, (x, y, letter)
+
+    def __search_root(self, moves:list[tuple], depth:int) -> tuple:
+        best_value, best_move = None, None
+        values = {}
+        alpha, beta = -float("inf"), float("inf")
+        for move, points in moves:
+            value = self.__search_move(move, points, depth, alpha, beta)
+            values[move] = value
+            if best_value == None or value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+        return best_value, best_move, values
+
+    def __ordered_moves(self, first_move, shuffle:bool = False) -> list[tuple]:
+        # Scoring moves first, most points first; the transposition table's move before all.
+        # The window counters give every move's points without looking at its neighbours.
+        s_gains, o_gains = self.counters.gains["S"], self.counters.gains["O"]
+        bit_cells = self.bit_cells
+        moves = []
+        for bit in iterate_bits(self.board.empty_mask()):
+            cell = bit_cells[bit]
+            moves.append(((bit, "S"), s_gains[cell]))
+            moves.append(((bit, "O"), o_gains[cell]))
+        if shuffle:
+            self.rng.shuffle(moves)
+        moves.sort(key=lambda move: (move[0] != first_move, -move[1]))
+        return moves
+
+    def __search_move(self, move:tuple, points:int, depth:int, alpha, beta):
+        bit, letter = move
+        self.board.place_bit(bit, letter)
+        self.counters.place(self.bit_cells[bit], letter)
+        self.hash ^= self.hasher.key(bit, letter)
+        if points > 0 and self.match_type == "Simple":
+            value = points
+        elif points > 0:
+            # Scoring keeps the turn: the same player moves again.
+            value = points + self.__negamax(depth - 1, alpha - points, beta - points)
+        else:
+            value = -self.__negamax(depth - 1, -beta, -alpha)
+        self.board.clear_bit(bit)
+        self.counters.remove(self.bit_cells[bit])
+        self.hash ^= self.hasher.key(bit, letter)
+        return value
+
+    def __check_limits(self) -> None:
+        if self.max_nodes != None and self.nodes > self.max_nodes:
+            raise SearchAborted()
+        if self.nodes & 127 == 0:
+            if self.stop_event != None and self.stop_event.is_set():
+                raise SearchAborted()
+            if self.deadline != None and time.perf_counter() >= self.deadline:
+                raise SearchAborted()
+
+    def __negamax(self, depth:int, alpha, beta):
+        self.nodes += 1
+        if self.__iteration_depth > 1:
+            self.__check_limits()
+        if depth <= 0 or self.board.empty_mask() == 0:
+            return 0
+
+        original_alpha = alpha
+        entry = self.table.probe(self.hash)
+        first_move = None
+        if entry != None:
+            _, entry_depth, entry_value, entry_flag, first_move = entry
+            if entry_depth >= depth:
+                if entry_flag == TranspositionTable.EXACT:
+                    return entry_value
+                if entry_flag == TranspositionTable.LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value
+
+        best_value, best_move = -float("inf"), None
+        for move, points in self.__ordered_moves(first_move):
+            value = self.__search_move(move, points, depth, alpha, beta)
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            flag = TranspositionTable.UPPER_BOUND
+        elif best_value >= beta:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        self.table.store(self.hash, depth, best_value, flag, best_move)
+        return best_value
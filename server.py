@@ -0,0 +1,412 @@
+"""
+    Asyncio server hosting many concurrent SOS matches over TCP, and a blocking client for the
+    GUI. Messages are JSON objects, one per line, each with a "type".
+    \nClient to server:
+        { "type": "list" }
+        { "type": "create", "size": 8, "match_type": "General", "blue": "Human", "red": "Computer" }
+        { "type": "join", "table": 1 }     (takes a free human seat)
+        { "type": "watch", "table": 1 }
+        { "type": "move", "x": 3, "y": 4, "letter": "S" }
+        { "type": "leave" }
+    \nServer to client: "tables", "joined" (with the moves so far), "start" (every human seat is
+    taken), "move", "game_over", "left" (a player left the table) and "error".
+    \nEvery table runs the rules of a headless SOSGameLogic whose seats are both human, so only
+    the server moves. Computer seats pick their moves on a GameState of the position in a process
+    pool, so a long search never holds up the event loop or the other tables.
+    \nUsage: python server.py --host 0.0.0.0 --port 4490
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import queue
+import socket
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import headless
+from game_logic import MAX_CANVAS_BOARD_DIMENSION, ComputerPlayer, SearchPlayer, MCTSPlayer, RandomPlayer
+from game_board import GameState
+from bitboard import BitBoard
+
+DEFAULT_PORT = 4490
+SEAT_TYPES = ("Human", "Computer", "Search", "MCTS", "Random")
+COMPUTER_PLAYERS = {"Computer": ComputerPlayer, "Search": SearchPlayer, "MCTS": MCTSPlayer, "Random": RandomPlayer}
+MATCH_TYPES = ("Simple", "General")
+# A client that lets this much output pile up unread is dropped instead of buffered forever.
+MAX_PENDING_BYTES = 1 << 20
+
+class ProtocolError(Exception):
+    """
+        Raised for a request the server refuses; the message is sent back as an "error".
+    """
+
+def _computer_move(task:tuple) -> tuple[tuple[int,int], str]:
+    # Runs in a worker process: a player of the seat's type picks the move on a GameState of the
+    # position, without building a game around it.
+    seat_type, snapshot, move_time_budget_ms = task
+    state = GameState.from_snapshot(snapshot, BitBoard)
+    if seat_type == "MCTS":
+        # The server's pool already spreads tables over the cores, so MCTS searches in this
+        # worker instead of starting a pool of its own.
+        player = MCTSPlayer(seat_type, "", None, headless, workers=1)
+    else:
+        player = COMPUTER_PLAYERS[seat_type](seat_type, "", None, headless)
+    try:
+        return player.choose_state_move(state, move_time_budget_ms / 1000)
+    finally:
+        player.close()
+
+class Table:
+    """
+        One match: its rules, who sits in each seat and who is watching. The game starts once
+        every human seat is taken.
+    """
+    def __init__(self, table_id:int, board_dimension:int, match_type:str, seat_types:tuple[str,str]):
+        self.id = table_id
+        self.board_dimension = board_dimension
+        self.match_type = match_type
+        self.seat_types = {1: seat_types[0], 2: seat_types[1]}
+        self.seats = {}
+        self.spectators = set()
+        self.computer_task = None
+        self.game_logic = headless.create_game(board_dimension, match_type, "Human", "Human")
+        self.game_logic.reset_state()
+
+    @property
+    def started(self) -> bool:
+        return all(seat in self.seats for seat, seat_type in self.seat_types.items() if seat_type == "Human")
+
+    @property
+    def over(self) -> bool:
+        return self.game_logic.gui.master.destroyed
+
+    @property
+    def turn(self) -> int:
+        return self.game_logic.current_player_number_variable.get()
+
+    def free_seat(self):
+        """
+            Returns the first human seat nobody has taken, or None.
+        """
+        return next((seat for seat, seat_type in self.seat_types.items()
+                     if seat_type == "Human" and seat not in self.seats), None)
+
+    def clients(self) -> list:
+        return list(self.seats.values()) + list(self.spectators)
+
+    def describe(self) -> dict:
+        return {"table": self.id, "size": self.board_dimension, "match_type": self.match_type,
+                "players": [self.seat_types[1], self.seat_types[2]], "free_seat": self.free_seat(),
+                "started": self.started, "over": self.over}
+
+    def play(self, x:int, y:int, letter:str) -> dict:
+        """
+            Plays a move for the player whose turn it is. Returns the "move" message.
+        """
+        game_logic = self.game_logic
+        board = game_logic.game_board
+        if letter not in ("S", "O"):
+            raise ProtocolError("letter must be S or O")
+        if not board.in_bounds(x, y) or not board.is_empty(x, y):
+            raise ProtocolError(f"cell {(x, y)} is not free")
+        player = self.turn
+        score_before = game_logic.player_dict[player].score
+        game_logic.play_move(x, y, letter)
+        return {"type": "move", "table": self.id, "x": x, "y": y, "letter": letter, "player": player,
+                "points": game_logic.player_dict[player].score - score_before,
+                "sos": [list(map(list, line)) for line in board.find_sos(x, y, letter)],
+                "scores": self.scores(), "turn": self.turn}
+
+    def scores(self) -> list[int]:
+        return [self.game_logic.player_dict[1].score, self.game_logic.player_dict[2].score]
+
+    def computer_task_args(self) -> tuple:
+        """
+            Returns what _computer_move needs to pick the move of the computer whose turn it is.
+        """
+        return (self.seat_types[self.turn], self.game_logic.position_snapshot(),
+                self.game_logic.config_move_time_budget.get())
+
+class Client:
+    """
+        One connection. Output is written without waiting, so a slow reader only costs memory
+        until MAX_PENDING_BYTES, when it is disconnected.
+    """
+    def __init__(self, writer:asyncio.StreamWriter):
+        self.writer = writer
+        self.table = None
+        self.seat = None
+
+    def send(self, message:dict) -> None:
+        if self.writer.is_closing():
+            return
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        if self.writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+            self.writer.close()
+
+class SOSServer:
+    """
+        Serves any number of tables from one event loop. executor picks the computer moves; a
+        ProcessPoolExecutor with workers processes is created if none is given.
+    """
+    def __init__(self, host:str = "127.0.0.1", port:int = DEFAULT_PORT, workers:int = None,
+                 executor = None, move_time_budget_ms:int = 500):
+        self.host = host
+        self.port = port
+        self.executor = executor if executor != None else ProcessPoolExecutor(max_workers=workers)
+        self.move_time_budget_ms = move_time_budget_ms
+        self.tables = {}
+        self.table_ids = itertools.count(1)
+        self.server = None
+        self.handlers = set()
+
+    async def start(self) -> None:
+        """
+            Starts listening. With port 0 a free port is picked and stored in self.port.
+        """
+        self.server = await asyncio.start_server(self.__handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self.server == None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """
+            Stops listening, disconnects every client, cancels the computer moves in progress and
+            shuts the executor down.
+        """
+        if self.server != None:
+            self.server.close()
+        for handler in list(self.handlers):
+            handler.cancel()
+        if self.handlers:
+            await asyncio.wait(self.handlers)
+        if self.server != None:
+            await self.server.wait_closed()
+        for table in list(self.tables.values()):
+            if table.computer_task != None:
+                table.computer_task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __handle_connection(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        client = Client(writer)
+        handler = asyncio.current_task()
+        self.handlers.add(handler)
+        try:
+            while not writer.is_closing():
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                try:
+                    self.__dispatch(client, json.loads(line))
+                except ProtocolError as error:
+                    client.send({"type": "error", "message": str(error)})
+                except (ValueError, TypeError, KeyError) as error:
+                    client.send({"type": "error", "message": f"bad request: {error}"})
+        except asyncio.CancelledError:
+            pass # the server is closing
+        finally:
+            self.handlers.discard(handler)
+            self.__leave(client)
+            writer.close()
+
+    def __dispatch(self, client:Client, message:dict) -> None:
+        kind = message["type"]
+        if kind == "list":
+            client.send({"type": "tables", "tables": [table.describe() for table in self.tables.values()
+                                                      if not table.over]})
+        elif kind == "create":
+            self.__create(client, int(message.get("size", 8)), message.get("match_type", "Simple"),
+                          message.get("blue", "Human"), message.get("red", "Computer"))
+        elif kind in ("join", "watch"):
+            table = self.tables.get(int(message["table"]))
+            if table == None:
+                raise ProtocolError(f"no table {message['table']}")
+            seat = table.free_seat() if kind == "join" else None
+            if kind == "join" and seat == None:
+                raise ProtocolError(f"table {table.id} has no free seat")
+            self.__seat(client, table, seat)
+        elif kind == "move":
+            self.__move(client, int(message["x"]), int(message["y"]), message["letter"])
+        elif kind == "leave":
+            self.__leave(client)
+        else:
+            raise ProtocolError(f"unknown message type {kind}")
+
+    def __create(self, client:Client, board_dimension:int, match_type:str, blue:str, red:str) -> None:
+        if not 3 <= board_dimension <= MAX_CANVAS_BOARD_DIMENSION:
+            raise ProtocolError(f"size must be 3 to {MAX_CANVAS_BOARD_DIMENSION}")
+        if match_type not in MATCH_TYPES or blue not in SEAT_TYPES or red not in SEAT_TYPES:
+            raise ProtocolError("unknown match type or player type")
+        table = Table(next(self.table_ids), board_dimension, match_type, (blue, red))
+        table.game_logic.config_move_time_budget.set(self.move_time_budget_ms)
+        self.tables[table.id] = table
+        self.__seat(client, table, table.free_seat())
+
+    def __seat(self, client:Client, table:Table, seat) -> None:
+        self.__leave(client)
+        client.table, client.seat = table, seat
+        if seat == None:
+            table.spectators.add(client)
+        else:
+            table.seats[seat] = client
+        history = [list(move) for move in table.game_logic.move_history]
+        client.send(dict(table.describe(), type="joined", seat=seat, moves=history))
+        if seat != None and table.started:
+            self.__broadcast(table, {"type": "start", "table": table.id, "turn": table.turn})
+        self.__schedule_computer(table)
+
+    def __move(self, client:Client, x:int, y:int, letter:str) -> None:
+        table = client.table
+        if table == None or client.seat == None:
+            raise ProtocolError("not seated at a table")
+        if not table.started or table.over:
+            raise ProtocolError("the game is not running")
+        if table.turn != client.seat:
+            raise ProtocolError("not your turn")
+        self.__play(table, x, y, letter)
+
+    def __play(self, table:Table, x:int, y:int, letter:str) -> None:
+        self.__broadcast(table, table.play(x, y, letter))
+        if table.over:
+            result = table.game_logic.last_result
+            self.__broadcast(table, {"type": "game_over", "table": table.id, "winner": result["winner"],
+                                     "scores": list(result["scores"])})
+        else:
+            self.__schedule_computer(table)
+
+    def __schedule_computer(self, table:Table) -> None:
+        if (table.started and not table.over and table.seat_types[table.turn] != "Human"
+                and table.computer_task == None):
+            table.computer_task = asyncio.get_running_loop().create_task(self.__computer_turn(table))
+
+    async def __computer_turn(self, table:Table) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            (x, y), letter = await loop.run_in_executor(self.executor, _computer_move, table.computer_task_args())
+        except Exception as error:
+            self.__broadcast(table, {"type": "error", "message": f"computer player failed: {error!r}"})
+            return
+        finally:
+            table.computer_task = None
+        if self.tables.get(table.id) is table:
+            self.__play(table, x, y, letter)
+
+    def __broadcast(self, table:Table, message:dict) -> None:
+        for client in table.clients():
+            client.send(message)
+
+    def __leave(self, client:Client) -> None:
+        table = client.table
+        if table == None:
+            return
+        if client.seat != None:
+            del table.seats[client.seat]
+            self.__broadcast(table, {"type": "left", "table": table.id, "seat": client.seat})
+        else:
+            table.spectators.discard(client)
+        client.table, client.seat = None, None
+        if not table.clients():
+            # Nobody is left to play or watch: drop the table and any move being worked out.
+            del self.tables[table.id]
+            if table.computer_task != None:
+                table.computer_task.cancel()
+
+class ServerConnection:
+    """
+        Blocking client for the Tk GUI. A reader thread queues incoming messages; messages()
+        returns them without blocking, so the GUI can poll with after().
+    """
+    def __init__(self, host:str, port:int = DEFAULT_PORT, timeout:float = 5):
+        self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.socket.settimeout(None)
+        self.file = self.socket.makefile("rwb")
+        self.incoming = queue.Queue()
+        self.seat = None
+        self.closed = False
+        self.thread = threading.Thread(target=self.__read, name="sos-server-reader", daemon=True)
+        self.thread.start()
+
+    def __read(self) -> None:
+        try:
+            for line in self.file:
+                self.incoming.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.incoming.put({"type": "disconnected"})
+
+    def send(self, message:dict) -> None:
+        self.file.write(json.dumps(message).encode() + b"\n")
+        self.file.flush()
+
+    def send_move(self, x:int, y:int, letter:str) -> None:
+        self.send({"type": "move", "x": x, "y": y, "letter": letter})
+
+    def messages(self) -> list[dict]:
+        """
+            Returns every message received since the last call.
+        """
+        received = []
+        while True:
+            try:
+                received.append(self.incoming.get_nowait())
+            except queue.Empty:
+                return received
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
+
+def parse_address(address:str) -> tuple[str,int]:
+    """
+        Splits "host:port" (or just "host") into (host, port). Raises ValueError if the port is
+        not a number from 1 to 65535.
+    """
+    host, separator, port = address.rpartition(":")
+    if not separator:
+        host, port = address, ""
+    port = int(port) if port else DEFAULT_PORT
+    if not 0 < port < 65536:
+        raise ValueError(f"port {port} is out of range")
+    return host or "127.0.0.1", port
+
+def main(argv:list[str] = None) -> None:
+    """
+        Runs the server until interrupted.
+    """
+    parser = argparse.ArgumentParser(description="SOS game server.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (0.0.0.0 for the LAN)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="processes for computer moves (default: all cores)")
+    parser.add_argument("--time-budget-ms", type=int, default=500, help="per-move time budget for search players")
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = SOSServer(args.host, args.port, args.workers, move_time_budget_ms=args.time_budget_ms)
+        await server.start()
+        print(f"SOS server listening on {args.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
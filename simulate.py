@@ -0,0 +1,159 @@
+"""
+    Command-line self-play simulator. Plays many computer-vs-computer games without a Tk root,
+    spread across a process pool, and prints aggregate statistics.
+    \nExample: python simulate.py --games 1000 --size 8 --match-type General --seed 449
+"""
+
+import argparse
+import functools
+import io
+import multiprocessing
+import time
+import headless
+import instrumentation
+from move_log import MoveLogWriter, parse_games
+from game_archive import GameArchive
+from tablebase import Tablebase
+
+@functools.lru_cache(maxsize=None)
+def _load_tablebase(path:str) -> Tablebase:
+    # Each worker maps a tablebase file once and reuses it for all its games.
+    return Tablebase(path)
+
+def _play_game_task(task:tuple) -> dict:
+    (board_dimension, match_type, seed, board_engine, player_types, move_time_budget_ms, instrument, log_moves,
+     tablebase_paths) = task
+    if instrument:
+        instrumentation.enable(game_summaries=False)
+    # Each game is logged to memory and written by the parent, so games never interleave.
+    move_log = MoveLogWriter(io.BytesIO()) if log_moves else None
+    result = headless.play_game(board_dimension, match_type, seed, *player_types, board_engine=board_engine,
+                                move_time_budget_ms=move_time_budget_ms, move_log=move_log,
+                                tablebases=[_load_tablebase(path) for path in tablebase_paths])
+    if move_log != None:
+        move_log.flush()
+        result["move_log"] = move_log.file.getvalue()
+    return result
+
+def run_self_play(games:int, board_dimension:int, match_type:str, seed:int = 0,
+                  processes:int = None, board_engine:str = "Dict",
+                  player_types:tuple[str,str] = ("Computer", "Computer"),
+                  move_time_budget_ms:int = None, instrument:bool = False, move_log_path:str = None,
+                  archive_path:str = None, tablebase_paths:tuple[str] = ()) -> dict:
+    """
+        Plays games computer-vs-computer games across a process pool. Game i uses seed + i, so
+        a run is reproducible regardless of how the games are scheduled (as long as no player
+        is cut short by the move time budget).
+        \nReturns the aggregate statistics as a dict. With instrument, the workers record
+        instrumentation timings and the summary includes them, summed over all games. With
+        move_log_path, every game is appended to that move log; with archive_path, every game
+        is bulk-inserted into that game archive. Search players play perfectly from any of
+        the tablebase files in tablebase_paths that fits the game.
+    """
+    tasks = [(board_dimension, match_type, seed + index, board_engine, player_types, move_time_budget_ms, instrument,
+              move_log_path != None or archive_path != None, tuple(tablebase_paths)) for index in range(games)]
+    start = time.perf_counter()
+    results = []
+    finished_games = []
+    log_file = open(move_log_path, "ab") if move_log_path != None else None
+    archive = GameArchive(archive_path) if archive_path != None else None
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(_play_game_task, tasks, chunksize=max(1, games // 64)):
+                game_bytes = result.pop("move_log", b"")
+                if log_file != None:
+                    log_file.write(game_bytes)
+                if archive != None:
+                    finished_games.extend(parse_games(game_bytes))
+                    if len(finished_games) >= 5000:
+                        archive.add_games(finished_games)
+                        finished_games = []
+                results.append(result)
+        if archive != None:
+            archive.add_games(finished_games)
+    finally:
+        if log_file != None:
+            log_file.close()
+        if archive != None:
+            archive.close()
+    elapsed = time.perf_counter() - start
+    return summarize(results, elapsed)
+
+def summarize(results:list[dict], elapsed:float) -> dict:
+    """
+        Aggregates play_game results into win/tie rates, mean scores, mean length and throughput.
+    """
+    games = len(results)
+    if games == 0:
+        return {"games": 0}
+    summary = {
+        "games":            games,
+        "blue_win_rate":    sum(result["winner"] == 1 for result in results) / games,
+        "red_win_rate":     sum(result["winner"] == 2 for result in results) / games,
+        "tie_rate":         sum(result["winner"] == 0 for result in results) / games,
+        "mean_blue_score":  sum(result["scores"][0] for result in results) / games,
+        "mean_red_score":   sum(result["scores"][1] for result in results) / games,
+        "mean_game_length": sum(result["moves"] for result in results) / games,
+        "games_per_second": games / elapsed if elapsed > 0 else float("inf"),
+    }
+    if any("timings" in result for result in results):
+        summary["timings"] = merge_timings([result["timings"] for result in results if "timings" in result])
+    return summary
+
+def merge_timings(game_timings:list[dict]) -> dict:
+    """
+        Sums instrumentation.summary() results of several games into one of the same format.
+    """
+    phases, events = {}, {}
+    for timings in game_timings:
+        for name, timing in timings["phases"].items():
+            count, seconds = phases.get(name, (0, 0.0))
+            phases[name] = (count + timing["count"], seconds + timing["seconds"])
+        for kind, count in timings["events"].items():
+            events[kind] = events.get(kind, 0) + count
+    return {"phases": {name: {"count": count, "seconds": seconds,
+                              "mean_ms": seconds * 1000 / count if count else 0.0}
+                       for name, (count, seconds) in phases.items()},
+            "events": events}
+
+def main(argv:list[str] = None) -> None:
+    """
+        Parses the command line, runs the games and prints the summary.
+    """
+    parser = argparse.ArgumentParser(description="Headless SOS self-play simulator.")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--size", type=int, default=8, help="board dimension, 3 or more")
+    parser.add_argument("--match-type", choices=["Simple", "General"], default="Simple")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--engine", choices=["Dict", "Bitboard"], default="Dict", help="board model")
+    parser.add_argument("--blue", choices=["Computer", "Search", "MCTS", "Random"], default="Computer", help="blue player type")
+    parser.add_argument("--red", choices=["Computer", "Search", "MCTS", "Random"], default="Computer", help="red player type")
+    parser.add_argument("--time-budget-ms", type=int, default=None,
+                        help="per-move time budget for search players (default: the game's setting)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time the game phases and print the totals (also set by SOS_INSTRUMENT=1)")
+    parser.add_argument("--move-log", default=None, help="append every game to this binary move log")
+    parser.add_argument("--archive", default=None, help="add every game to this game archive")
+    parser.add_argument("--tablebase", action="append", default=[],
+                        help="tablebase file search players play perfectly from (repeatable)")
+    args = parser.parse_args(argv)
+    if args.size < 3:
+        parser.error("--size must be at least 3")
+
+    summary = run_self_play(args.games, args.size, args.match_type, args.seed, args.processes, args.engine,
+                            (args.blue, args.red), args.time_budget_ms,
+                            args.instrument or instrumentation.enabled, args.move_log, args.archive,
+                            args.tablebase)
+    print(f"{summary['games']} games, {args.size}x{args.size} {args.match_type}, {args.blue} vs {args.red}")
+    if summary["games"] == 0:
+        return
+    print(f"  blue wins: {summary['blue_win_rate']:.1%}  red wins: {summary['red_win_rate']:.1%}  ties: {summary['tie_rate']:.1%}")
+    print(f"  mean score: blue {summary['mean_blue_score']:.2f}, red {summary['mean_red_score']:.2f}")
+    print(f"  mean game length: {summary['mean_game_length']:.1f} moves")
+    print(f"  throughput: {summary['games_per_second']:.1f} games/second")
+    if "timings" in summary:
+        print(instrumentation.format_summary(summary["timings"]))
+
+if __name__ == "__main__":
+    main()
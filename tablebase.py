@@ -0,0 +1,255 @@
+"""
+    Exhaustive solver and tablebase for small SOS boards (3x3 and 4x4, both match types).
+    \nThe value of a position is the points the player to move will still gain minus the points
+    the opponent will still gain under perfect play, with the rules of
+    SOSGameLogic.process_turn_and_switch: scoring keeps the turn, and in a Simple match the first
+    SOS ends the game. Since the rules are the same for both players and for every rotation and
+    reflection of the board, a value depends only on the letters, up to symmetry.
+    \nThe solver works backwards from full boards, one layer of filled-cell counts at a time,
+    spreading every layer over a process pool. The tablebase file stores the value of every
+    canonical position (the symmetric variant with the lowest code) and is memory-mapped when
+    probed. numpy is required.
+    \nUsage: python tablebase.py --size 4 --match-type General --output sos_4x4_General.tb
+"""
+
+import argparse
+import multiprocessing
+import os
+import struct
+import tempfile
+import time
+from triple_index import get_triple_index
+
+# 5x5 needs 3^25 (~8.5e11) positions, far beyond a dense table even for Simple matches.
+MAX_SOLVABLE_DIMENSION = 4
+HEADER = struct.Struct("<4sBBBxQ")
+MAGIC = b"SOST"
+VERSION = 1
+MATCH_TYPES = ("Simple", "General")
+LETTER_CODES = {"": 0, "S": 1, "O": 2}
+LETTERS = ("S", "O")
+
+def symmetries(board_dimension:int) -> list[list[int]]:
+    """
+        Returns the 8 rotations and reflections of the board, each as a list mapping cell
+        y * board_dimension + x to the cell it is moved to.
+    """
+    last = board_dimension - 1
+    transforms = (lambda x, y: (x, y), lambda x, y: (last - y, x), lambda x, y: (last - x, last - y),
+                  lambda x, y: (y, last - x), lambda x, y: (last - x, y), lambda x, y: (x, last - y),
+                  lambda x, y: (y, x), lambda x, y: (last - y, last - x))
+    permutations = []
+    for transform in transforms:
+        permutation = []
+        for cell in range(board_dimension * board_dimension):
+            new_x, new_y = transform(cell % board_dimension, cell // board_dimension)
+            permutation.append(new_y * board_dimension + new_x)
+        permutations.append(permutation)
+    return permutations
+
+def scoring_lines(board_dimension:int) -> tuple[list, list]:
+    """
+        Returns, per cell, the (middle, far end) cell pairs that score with an S placed there and
+        the (end, end) cell pairs that score with an O placed there.
+    """
+    index = get_triple_index(board_dimension)
+    return ([[(middle, far) for _, middle, far in lines] for lines in index.s_lines],
+            [[(first, last) for _, first, last in lines] for lines in index.o_lines])
+
+def position_code(board) -> int:
+    """
+        Returns the base-3 code of a board model's letters: the sum of letter code * 3^cell.
+    """
+    code = 0
+    board_dimension = board.board_dimension
+    for y in range(board_dimension - 1, -1, -1):
+        for x in range(board_dimension - 1, -1, -1):
+            code = code * 3 + LETTER_CODES[board.get_letter(x, y)]
+    return code
+
+def _solve_chunk(task:tuple) -> None:
+    # Works out the values of one chunk of a layer; every child is one layer up and already known.
+    import numpy as np
+    values_path, board_dimension, general, positions = task
+    cells = board_dimension * board_dimension
+    values = np.memmap(values_path, dtype=np.int8, mode="r+", shape=(3 ** cells,))
+    powers = 3 ** np.arange(cells, dtype=np.int64)
+    digits = ((positions[:, None] // powers[None, :]) % 3).astype(np.int8)
+    s_lines, o_lines = scoring_lines(board_dimension)
+    best = np.full(len(positions), -128, dtype=np.int16)
+    for cell in range(cells):
+        empty = np.flatnonzero(digits[:, cell] == 0)
+        if len(empty) == 0:
+            continue
+        rows = digits[empty]
+        for letter_code, lines in ((1, s_lines[cell]), (2, o_lines[cell])):
+            gain = np.zeros(len(empty), dtype=np.int16)
+            for first, second in lines:
+                if letter_code == 1:
+                    gain += (rows[:, first] == 2) & (rows[:, second] == 1)
+                else:
+                    gain += (rows[:, first] == 1) & (rows[:, second] == 1)
+            child_values = values[positions[empty] + letter_code * powers[cell]].astype(np.int16)
+            if general:
+                move_values = np.where(gain > 0, gain + child_values, -child_values)
+            else:
+                move_values = np.where(gain > 0, gain, -child_values)
+            best[empty] = np.maximum(best[empty], move_values)
+    values[positions] = best.astype(np.int8)
+    values.flush()
+
+def solve(board_dimension:int, match_type:str, output_path:str, processes:int = None,
+          chunk_size:int = 1 << 18) -> dict:
+    """
+        Solves every position of a board_dimension x board_dimension board and writes the
+        tablebase to output_path. Returns { "positions", "canonical_positions", "seconds" }.
+    """
+    import numpy as np
+    if not 3 <= board_dimension <= MAX_SOLVABLE_DIMENSION:
+        raise ValueError(f"only boards from 3x3 to {MAX_SOLVABLE_DIMENSION}x{MAX_SOLVABLE_DIMENSION} can be solved")
+    start = time.perf_counter()
+    cells = board_dimension * board_dimension
+    size = 3 ** cells
+    codes = np.arange(size, dtype=np.int64)
+    filled = np.zeros(size, dtype=np.int8)
+    remaining = codes.copy()
+    for _ in range(cells):
+        filled += (remaining % 3 != 0)
+        remaining //= 3
+    del remaining
+
+    handle, values_path = tempfile.mkstemp(suffix=".values", dir=os.path.dirname(os.path.abspath(output_path)))
+    os.close(handle)
+    try:
+        values = np.memmap(values_path, dtype=np.int8, mode="w+", shape=(size,))
+        values[:] = 0 # full boards are worth nothing more
+        values.flush()
+        general = match_type == "General"
+        with multiprocessing.Pool(processes) as pool:
+            for layer in range(cells - 1, -1, -1):
+                positions = np.flatnonzero(filled == layer)
+                tasks = [(values_path, board_dimension, general, positions[index:index + chunk_size])
+                         for index in range(0, len(positions), chunk_size)]
+                list(pool.imap_unordered(_solve_chunk, tasks))
+        del filled
+        values = np.memmap(values_path, dtype=np.int8, mode="r", shape=(size,))
+        keys, key_values = _canonical_entries(board_dimension, values, codes, chunk_size)
+        with open(output_path, "wb") as output_file:
+            output_file.write(HEADER.pack(MAGIC, VERSION, board_dimension, MATCH_TYPES.index(match_type), len(keys)))
+            output_file.write(keys.astype("<u4").tobytes())
+            output_file.write(key_values.astype(np.int8).tobytes())
+        del values
+    finally:
+        os.remove(values_path)
+    return {"positions": size, "canonical_positions": len(keys), "seconds": time.perf_counter() - start}
+
+def _canonical_entries(board_dimension:int, values, codes, chunk_size:int) -> tuple:
+    # Keeps the positions that are their own canonical form, in increasing code order.
+    import numpy as np
+    cells = board_dimension * board_dimension
+    powers = 3 ** np.arange(cells, dtype=np.int64)
+    permutations = symmetries(board_dimension)
+    keys, key_values = [], []
+    for index in range(0, len(codes), chunk_size):
+        chunk = codes[index:index + chunk_size]
+        digits = (chunk[:, None] // powers[None, :]) % 3
+        canonical = chunk.copy()
+        for permutation in permutations[1:]:
+            moved = np.zeros(len(chunk), dtype=np.int64)
+            for cell, new_cell in enumerate(permutation):
+                moved += digits[:, cell] * powers[new_cell]
+            np.minimum(canonical, moved, out=canonical)
+        own = chunk[canonical == chunk]
+        keys.append(own)
+        key_values.append(np.asarray(values[own]))
+    return np.concatenate(keys), np.concatenate(key_values)
+
+class Tablebase:
+    """
+        A solved tablebase file, memory-mapped. Probing canonicalizes the position and
+        binary-searches the sorted keys, so it is instant and the file is never read whole.
+    """
+    def __init__(self, path:str):
+        import numpy as np
+        with open(path, "rb") as tablebase_file:
+            magic, version, board_dimension, match_type, count = HEADER.unpack(tablebase_file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} SOS tablebase")
+        self.path = path
+        self.board_dimension = board_dimension
+        self.match_type = MATCH_TYPES[match_type]
+        self.keys = np.memmap(path, dtype="<u4", mode="r", offset=HEADER.size, shape=(count,))
+        self.values = np.memmap(path, dtype=np.int8, mode="r", offset=HEADER.size + 4 * count, shape=(count,))
+        self.powers = [3 ** cell for cell in range(board_dimension * board_dimension)]
+        self.permutations = symmetries(board_dimension)
+
+    def canonical_code(self, code:int) -> int:
+        """
+            Returns the lowest code among the symmetric variants of a position code.
+        """
+        digits = []
+        for _ in range(len(self.powers)):
+            code, digit = divmod(code, 3)
+            digits.append(digit)
+        return min(sum(digit * self.powers[new_cell] for digit, new_cell in zip(digits, permutation) if digit)
+                   for permutation in self.permutations)
+
+    def value_of_code(self, code:int) -> int:
+        """
+            Returns the value of the position with the given code, for the player to move.
+        """
+        canonical = self.canonical_code(code)
+        index = int(self.keys.searchsorted(self.keys.dtype.type(canonical)))
+        if index >= len(self.keys) or int(self.keys[index]) != canonical:
+            raise KeyError(f"position {code} is not in the tablebase")
+        return int(self.values[index])
+
+    def value(self, board) -> int:
+        """
+            Returns the value of a board model's position for the player to move.
+        """
+        return self.value_of_code(position_code(board))
+
+    def move_values(self, board) -> dict[tuple, int]:
+        """
+            Returns the perfect-play value of every move: { ((x, y), letter): value }.
+        """
+        code = position_code(board)
+        result = {}
+        for x, y in board.empty_cells():
+            power = self.powers[y * self.board_dimension + x]
+            for letter in LETTERS:
+                points = board.count_sos(x, y, letter)
+                if points > 0 and self.match_type == "Simple":
+                    result[((x, y), letter)] = points
+                    continue
+                child_value = self.value_of_code(code + LETTER_CODES[letter] * power)
+                result[((x, y), letter)] = points + child_value if points > 0 else -child_value
+        return result
+
+    def best_move(self, board) -> tuple[tuple[int,int], str]:
+        """
+            Returns a move with the best perfect-play value as ((x, y), letter).
+        """
+        move_values = self.move_values(board)
+        return max(sorted(move_values), key=lambda move: move_values[move])
+
+def main(argv:list[str] = None) -> None:
+    """
+        Solves one board size and match type from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Solve small SOS boards into a tablebase.")
+    parser.add_argument("--size", type=int, choices=range(3, MAX_SOLVABLE_DIMENSION + 1), required=True)
+    parser.add_argument("--match-type", choices=MATCH_TYPES, required=True)
+    parser.add_argument("--output", default=None, help="tablebase file (default: sos_<size>x<size>_<match type>.tb)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    output_path = args.output or f"sos_{args.size}x{args.size}_{args.match_type}.tb"
+
+    result = solve(args.size, args.match_type, output_path, args.processes)
+    tablebase = Tablebase(output_path)
+    print(f"{output_path}: {result['positions']} positions, {result['canonical_positions']} canonical, "
+          f"solved in {result['seconds']:.1f} s; value of the empty board: {tablebase.value_of_code(0)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+    Headless tournament between computer player types, rated with Glicko and Elo.
+    \nEvery pairing plays each board size and match type twice, once with each colour. Games run
+    across a process pool and each finished game is appended to a games file at once, so an
+    interrupted tournament picks up where it stopped when run again with the same arguments.
+    \nExample: python tournament.py --players Random Computer Search --sizes 5 8 --rounds 2
+               --games-file games.csv --output ratings.csv
+"""
+
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import time
+import zlib
+import headless
+
+ROSTER = ("Random", "Computer", "Search", "MCTS")
+MATCH_TYPES = ("Simple", "General")
+FORMATS = ("round-robin", "swiss")
+GAME_FIELDS = ("game_id", "round", "board_dimension", "match_type", "blue", "red", "winner",
+               "blue_score", "red_score", "moves", "seconds")
+RATING_FIELDS = ("player", "games", "wins", "draws", "losses", "score", "rating", "rd", "ci_low", "ci_high", "elo")
+
+# Glicko: every player starts at 1500 with the largest uncertainty. Strengths do not drift
+# within a tournament, so the deviation only shrinks.
+INITIAL_RATING = 1500.0
+INITIAL_RD = 350.0
+GLICKO_Q = math.log(10) / 400
+CONFIDENCE_Z = 1.96 # 95 % interval
+ELO_K = 16
+
+def blue_points(game:dict) -> float:
+    """
+        Returns what a game was worth to blue: 1 for a win, 0.5 for a tie, 0 for a loss.
+    """
+    return {1: 1.0, 2: 0.0, 0: 0.5}[int(game["winner"])]
+
+def game_id(round_number:int, board_dimension:int, match_type:str, blue:str, red:str) -> str:
+    """
+        Returns the id of one scheduled game. Ids identify finished games when resuming.
+    """
+    return f"{round_number}:{board_dimension}:{match_type}:{blue}:{red}"
+
+def pairing_games(round_number:int, first:str, second:str, sizes:list[int], match_types:list[str]) -> list[dict]:
+    """
+        Returns the games of one pairing: every size and match type, once with each colour.
+    """
+    games = []
+    for board_dimension in sizes:
+        for match_type in match_types:
+            for blue, red in ((first, second), (second, first)):
+                games.append({"game_id": game_id(round_number, board_dimension, match_type, blue, red),
+                              "round": round_number, "board_dimension": board_dimension,
+                              "match_type": match_type, "blue": blue, "red": red})
+    return games
+
+def round_robin_pairings(roster:list[str]) -> list[tuple[str,str]]:
+    """
+        Returns every pair of players once, in roster order.
+    """
+    return [(first, second) for index, first in enumerate(roster) for second in roster[index + 1:]]
+
+def swiss_pairings(roster:list[str], finished:list[dict]) -> list[tuple[str,str]]:
+    """
+        Pairs the players by standing after the finished games: the best player with the best
+        one it has not met yet, and so on down. Ties keep roster order, so a round's pairings
+        only depend on the games before it. With an odd roster the lowest player sits out.
+    """
+    points = {player: 0.0 for player in roster}
+    met = set()
+    for game in finished:
+        points[game["blue"]] += blue_points(game)
+        points[game["red"]] += 1 - blue_points(game)
+        met.add(frozenset((game["blue"], game["red"])))
+    waiting = sorted(roster, key=lambda player: (-points[player], roster.index(player)))
+    pairings = []
+    while len(waiting) > 1:
+        first = waiting.pop(0)
+        # Rematches are allowed only when every remaining opponent has been met already.
+        second = next((player for player in waiting if frozenset((first, player)) not in met), waiting[0])
+        waiting.remove(second)
+        pairings.append((first, second))
+    return pairings
+
+def _play_tournament_game(task:tuple) -> dict:
+    game, seed, move_time_budget_ms = task
+    result = headless.play_game(game["board_dimension"], game["match_type"], seed, game["blue"], game["red"],
+                                board_engine="Bitboard", move_time_budget_ms=move_time_budget_ms)
+    return dict(game, winner=result["winner"], blue_score=result["scores"][0], red_score=result["scores"][1],
+                moves=result["moves"], seconds=round(result["seconds"], 4))
+
+def read_games(path:str) -> list[dict]:
+    """
+        Returns the finished games recorded in a games file, or [] if it does not exist yet.
+        A row with empty or missing fields (the last one, if a run was killed while writing it)
+        is skipped.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as games_file:
+        return [row for row in csv.DictReader(games_file) if all(row.get(field) for field in GAME_FIELDS)]
+
+def _drop_torn_row(path:str) -> None:
+    # Cuts a last row without its line end, so the next game appended starts on a line of its own.
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as games_file:
+        data = games_file.read()
+        if data and not data.endswith(b"\n"):
+            games_file.truncate(data.rfind(b"\n") + 1)
+
+def run_tournament(roster:list[str], sizes:list[int], match_types:list[str] = MATCH_TYPES,
+                   tournament_format:str = "round-robin", rounds:int = 1, games_file:str = "tournament_games.csv",
+                   seed:int = 0, processes:int = None, move_time_budget_ms:int = 100,
+                   progress = None) -> list[dict]:
+    """
+        Plays the tournament, skipping the games already in games_file and appending every new
+        one to it as soon as it finishes. A game's seed comes from seed and its id, so a resumed
+        tournament plays the same games it would have played in one go (search players cut
+        short by the time budget aside).
+        \nprogress, if given, is called with every newly finished game. Returns all finished games
+        between players of the roster.
+    """
+    if tournament_format not in FORMATS:
+        raise ValueError(f"unknown tournament format {tournament_format}")
+    _drop_torn_row(games_file)
+    finished = [game for game in read_games(games_file) if game["blue"] in roster and game["red"] in roster]
+    done = {game["game_id"] for game in finished}
+    new_file = not os.path.exists(games_file) or os.path.getsize(games_file) == 0
+    with open(games_file, "a", newline="") as output_file, multiprocessing.Pool(processes) as pool:
+        writer = csv.DictWriter(output_file, fieldnames=GAME_FIELDS)
+        if new_file:
+            writer.writeheader()
+        for round_number in range(1, rounds + 1):
+            if tournament_format == "swiss":
+                previous = [game for game in finished if int(game["round"]) < round_number]
+                pairings = swiss_pairings(roster, previous)
+            else:
+                pairings = round_robin_pairings(roster)
+            games = [game for first, second in pairings
+                     for game in pairing_games(round_number, first, second, sizes, match_types)
+                     if game["game_id"] not in done]
+            tasks = [(game, seed + zlib.crc32(game["game_id"].encode()), move_time_budget_ms) for game in games]
+            for result in pool.imap_unordered(_play_tournament_game, tasks):
+                writer.writerow(result)
+                output_file.flush()
+                # Read back as text, like the games loaded from the file.
+                result = {key: str(value) for key, value in result.items()}
+                finished.append(result)
+                done.add(result["game_id"])
+                if progress != None:
+                    progress(result)
+    return finished
+
+def glicko_ratings(roster:list[str], games:list[dict]) -> dict[str,tuple[float,float]]:
+    """
+        Rates the players with Glicko, one rating period per round.
+        \nReturns { player: (rating, rating deviation) }.
+    """
+    ratings = {player: (INITIAL_RATING, INITIAL_RD) for player in roster}
+    g = lambda rd: 1 / math.sqrt(1 + 3 * GLICKO_Q**2 * rd**2 / math.pi**2)
+    for round_number in sorted({int(game["round"]) for game in games}):
+        outcomes = {player: [] for player in roster}
+        for game in games:
+            if int(game["round"]) != round_number:
+                continue
+            outcomes[game["blue"]].append((game["red"], blue_points(game)))
+            outcomes[game["red"]].append((game["blue"], 1 - blue_points(game)))
+        updated = {}
+        for player, (rating, rd) in ratings.items():
+            if not outcomes[player]:
+                updated[player] = (rating, rd)
+                continue
+            variance_sum = improvement = 0.0
+            for opponent, points in outcomes[player]:
+                opponent_rating, opponent_rd = ratings[opponent]
+                g_opponent = g(opponent_rd)
+                expected = 1 / (1 + 10 ** (-g_opponent * (rating - opponent_rating) / 400))
+                variance_sum += g_opponent**2 * expected * (1 - expected)
+                improvement += g_opponent * (points - expected)
+            inverse_d_squared = GLICKO_Q**2 * variance_sum
+            new_variance = 1 / (1 / rd**2 + inverse_d_squared)
+            updated[player] = (rating + GLICKO_Q * new_variance * improvement, math.sqrt(new_variance))
+        ratings = updated
+    return ratings
+
+def elo_ratings(roster:list[str], games:list[dict]) -> dict[str,float]:
+    """
+        Rates the players with plain Elo, updating after every game in game id order so the
+        result does not depend on which game finished first.
+    """
+    ratings = {player: INITIAL_RATING for player in roster}
+    for game in sorted(games, key=lambda game: (int(game["round"]), game["game_id"])):
+        blue, red = game["blue"], game["red"]
+        change = ELO_K * (blue_points(game) - 1 / (1 + 10 ** ((ratings[red] - ratings[blue]) / 400)))
+        ratings[blue] += change
+        ratings[red] -= change
+    return ratings
+
+def rating_table(roster:list[str], games:list[dict]) -> list[dict]:
+    """
+        Returns one row per player (fields RATING_FIELDS), best Glicko rating first. The
+        confidence interval is the 95 % interval of the Glicko rating.
+    """
+    glicko = glicko_ratings(roster, games)
+    elo = elo_ratings(roster, games)
+    rows = []
+    for player in roster:
+        wins = draws = losses = 0
+        for game in games:
+            if player not in (game["blue"], game["red"]):
+                continue
+            colour = 1 if game["blue"] == player else 2
+            winner = int(game["winner"])
+            wins += winner == colour
+            draws += winner == 0
+            losses += winner not in (0, colour)
+        played = wins + draws + losses
+        rating, rd = glicko[player]
+        rows.append({"player": player, "games": played, "wins": wins, "draws": draws, "losses": losses,
+                     "score": round((wins + draws / 2) / played, 4) if played else 0.0,
+                     "rating": round(rating, 1), "rd": round(rd, 1),
+                     "ci_low": round(rating - CONFIDENCE_Z * rd, 1), "ci_high": round(rating + CONFIDENCE_Z * rd, 1),
+                     "elo": round(elo[player], 1)})
+    return sorted(rows, key=lambda row: -row["rating"])
+
+def write_ratings(path:str, rows:list[dict]) -> None:
+    """
+        Writes rating_table rows to a CSV file.
+    """
+    with open(path, "w", newline="") as output_file:
+        writer = csv.DictWriter(output_file, fieldnames=RATING_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv:list[str] = None) -> None:
+    """
+        Parses the command line, plays (or resumes) the tournament and writes the ratings.
+    """
+    parser = argparse.ArgumentParser(description="Headless SOS tournament between computer players.")
+    parser.add_argument("--players", nargs="+", choices=ROSTER, default=["Random", "Computer", "Search"],
+                        help="player types taking part")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[5, 8], help="board dimensions, 3 or more")
+    parser.add_argument("--match-types", nargs="+", choices=MATCH_TYPES, default=list(MATCH_TYPES))
+    parser.add_argument("--format", choices=FORMATS, default="round-robin")
+    parser.add_argument("--rounds", type=int, default=1, help="round-robin cycles or Swiss rounds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--time-budget-ms", type=int, default=100, help="per-move time budget for search players")
+    parser.add_argument("--games-file", default="tournament_games.csv",
+                        help="finished games are appended here; rerun with the same file to resume")
+    parser.add_argument("--output", default="tournament_ratings.csv", help="ratings CSV to write")
+    args = parser.parse_args(argv)
+    if min(args.sizes) < 3:
+        parser.error("--sizes must be at least 3")
+    if len(set(args.players)) < 2:
+        parser.error("--players needs at least two different player types")
+    roster = list(dict.fromkeys(args.players))
+
+    start = time.perf_counter()
+    already = sum(game["blue"] in roster and game["red"] in roster for game in read_games(args.games_file))
+    games = run_tournament(roster, args.sizes, args.match_types, args.format, args.rounds, args.games_file,
+                           args.seed, args.processes, args.time_budget_ms)
+    rows = rating_table(roster, games)
+    write_ratings(args.output, rows)
+    print(f"{len(games) - already} games played, {already} resumed, {time.perf_counter() - start:.1f} s")
+    for row in rows:
+        print(f"  {row['player']:<10}{row['rating']:>8.1f} ± {CONFIDENCE_Z * row['rd']:>6.1f}  elo {row['elo']:>7.1f}"
+              f"  {row['wins']}-{row['draws']}-{row['losses']}")
+
+if __name__ == "__main__":
+    main()
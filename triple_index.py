@@ -0,0 +1,178 @@
+"""
+    Precomputed index of every three-in-a-line window of a board, so scoring code walks a cell's
+    windows instead of checking directions and board edges by hand. Indexes are built once per
+    board size and cached; boards do not have to be square.
+"""
+
+import functools
+
+# Directions checked when an S is placed. The placed S is one end of the SOS, so the O sits
+# one step away and the other S two steps away. Order matches the original hand-coded checks.
+S_DIRECTIONS = ((0,-1), (-1,-1), (-1,0), (-1,1), (0,1), (1,1), (1,0), (1,-1))
+
+# Axes checked when an O is placed. The placed O is the middle, so the S tiles sit one step
+# away on either side.
+O_DIRECTIONS = ((0,1), (1,1), (1,0), (-1,1))
+
+# Boards at least this wide have their WindowCounters built with numpy_scoring when numpy is
+# installed. Below it, building the arrays costs more than placing the letters one by one.
+VECTORIZE_THRESHOLD = 16
+
+# Position of a cell inside a window.
+END = 0
+MIDDLE = 1
+
+class TripleIndex:
+    """
+        Every three-in-a-line window of a width x height board. Cells are numbered
+        y * width + x; coords maps a number back to (x, y).
+        \nwindows:       (end, middle, end) cells of every window.
+        \ncell_windows:  per cell, (window, END or MIDDLE) for every window holding the cell.
+        \ns_lines:       per cell, (window, middle, far end) for every window the cell ends, in
+                         S_DIRECTIONS order: an S here scores if middle is O and far end is S.
+        \no_lines:       per cell, (window, end, end) for every window the cell is the middle of,
+                         in O_DIRECTIONS order: an O here scores if both ends are S.
+        \nneighbours:    per cell, the other cells sharing a window with it, direction by direction.
+    """
+    def __init__(self, width:int, height:int):
+        self.width = width
+        self.height = height
+        self.coords = tuple((cell % width, cell // width) for cell in range(width * height))
+        inside = lambda x, y: 0 <= x < width and 0 <= y < height
+
+        window_ids = {}
+        windows = []
+        for cell, (x, y) in enumerate(self.coords):
+            for dx, dy in O_DIRECTIONS:
+                if inside(x - dx, y - dy) and inside(x + dx, y + dy):
+                    window_ids[(cell, dx, dy)] = len(windows)
+                    windows.append(((y-dy) * width + x-dx, cell, (y+dy) * width + x+dx))
+        self.windows = tuple(windows)
+
+        cell_windows = [[] for _ in self.coords]
+        for window, (first, middle, last) in enumerate(self.windows):
+            cell_windows[first].append((window, END))
+            cell_windows[middle].append((window, MIDDLE))
+            cell_windows[last].append((window, END))
+        self.cell_windows = tuple(tuple(entries) for entries in cell_windows)
+
+        s_lines, o_lines, neighbours = [], [], []
+        for cell, (x, y) in enumerate(self.coords):
+            cell_s_lines = []
+            for dx, dy in S_DIRECTIONS:
+                if inside(x + 2*dx, y + 2*dy):
+                    middle = (y+dy) * width + x+dx
+                    # Each window is stored once, under its middle cell and the axis pointing away
+                    # from it; flip the direction if this cell's window was stored the other way.
+                    window = window_ids.get((middle, dx, dy), window_ids.get((middle, -dx, -dy)))
+                    cell_s_lines.append((window, middle, (y+2*dy) * width + x+2*dx))
+            s_lines.append(tuple(cell_s_lines))
+            o_lines.append(tuple((window_ids[(cell, dx, dy)], (y-dy) * width + x-dx, (y+dy) * width + x+dx)
+                                 for dx, dy in O_DIRECTIONS if (cell, dx, dy) in window_ids))
+            neighbours.append(tuple((y+step*dy) * width + x+step*dx for dx, dy in S_DIRECTIONS for step in (1, 2)
+                                    if inside(x + step*dx, y + step*dy)))
+        self.s_lines = tuple(s_lines)
+        self.o_lines = tuple(o_lines)
+        self.neighbours = tuple(neighbours)
+
+    def cell(self, x:int, y:int) -> int:
+        """
+            Returns the number of cell (x, y).
+        """
+        return y * self.width + x
+
+def get_triple_index(width:int, height:int = None) -> TripleIndex:
+    """
+        Returns the cached TripleIndex of a width x height board (square if height is omitted).
+    """
+    return _cached_index(width, width if height == None else height)
+
+@functools.lru_cache(maxsize=None)
+def _cached_index(width:int, height:int) -> TripleIndex:
+    return TripleIndex(width, height)
+
+class WindowCounters:
+    """
+        Counts of S, O and empty cells in every window of a TripleIndex, updated on every
+        placement, so the points of any move are a lookup instead of a scan of its neighbours.
+        \nA window one move from an SOS is a threat: two S ends around an empty middle, or an O
+        middle with one S end and one empty end. threats maps each such window to the move that
+        completes it, (cell, letter), and gains[letter][cell] counts the threats a move completes,
+        which is exactly the points it would score.
+    """
+    def __init__(self, index:TripleIndex):
+        self.index = index
+        window_count = len(index.windows)
+        self.letters = [""] * len(index.coords)
+        self.s_count = [0] * window_count
+        self.o_count = [0] * window_count
+        self.empty_count = [3] * window_count
+        self.threats = {}
+        self.gains = {"S": [0] * len(index.coords), "O": [0] * len(index.coords)}
+
+    @classmethod
+    def from_board(cls, board) -> "WindowCounters":
+        """
+            Builds the counters of any board model with a triple_index and a cells[y][x] grid.
+            Boards at least VECTORIZE_THRESHOLD wide are counted all at once by numpy_scoring
+            when numpy is installed.
+        """
+        counters = cls(board.triple_index)
+        if counters.index.width >= VECTORIZE_THRESHOLD:
+            try:
+                import numpy_scoring
+            except ImportError:
+                numpy_scoring = None
+            if numpy_scoring != None:
+                numpy_scoring.count_windows(counters, board)
+                return counters
+        for y, row in enumerate(board.cells):
+            for x, letter in enumerate(row):
+                if letter != "":
+                    counters.place(counters.index.cell(x, y), letter)
+        return counters
+
+    def gain(self, cell:int, letter:str) -> int:
+        """
+            Returns how many SOS placing letter in the (empty) cell would complete.
+        """
+        return self.gains[letter][cell]
+
+    def place(self, cell:int, letter:str) -> None:
+        """
+            Records letter placed in the empty cell.
+        """
+        self.letters[cell] = letter
+        counts = self.s_count if letter == "S" else self.o_count
+        for window, _ in self.index.cell_windows[cell]:
+            counts[window] += 1
+            self.empty_count[window] -= 1
+            self.__refresh(window)
+
+    def remove(self, cell:int) -> None:
+        """
+            Records the cell emptied again, undoing place.
+        """
+        counts = self.s_count if self.letters[cell] == "S" else self.o_count
+        self.letters[cell] = ""
+        for window, _ in self.index.cell_windows[cell]:
+            counts[window] -= 1
+            self.empty_count[window] += 1
+            self.__refresh(window)
+
+    def __refresh(self, window:int) -> None:
+        old = self.threats.pop(window, None)
+        if old != None:
+            self.gains[old[1]][old[0]] -= 1
+        if self.empty_count[window] != 1:
+            return
+        first, middle, last = self.index.windows[window]
+        letters = self.letters
+        if self.s_count[window] == 2 and letters[middle] == "":
+            threat = (middle, "O")
+        elif self.s_count[window] == 1 and letters[middle] == "O":
+            threat = (first if letters[first] == "" else last, "S")
+        else:
+            return
+        self.threats[window] = threat
+        self.gains[threat[1]][threat[0]] += 1